@@ -0,0 +1,86 @@
+import os
+import pygame
+from constants import FALLBACK_IMAGE_COLOR, IMAGE_FOLDER, SOUNDS_FOLDER
+from utils import load_scaled_image, load_sound
+
+# Process-wide caches: every asset is read from disk once per (filename, size) and shared.
+# Callers get the cached Surface/Sound itself, so they must copy before drawing onto it.
+_exists = {} # (folder, filename) -> bool
+_images = {} # (filename, size, flip) -> Surface
+_sequences = {} # (filenames, size, flip) -> (frames, broken filename or None)
+_sounds = {} # filename -> Sound or None
+
+
+def asset_exists(folder, filename):
+    key = (folder, filename)
+    exists = _exists.get(key)
+    if exists is None: exists = _exists[key] = os.path.exists(os.path.join(folder, filename))
+    return exists
+
+
+def is_fallback(image):
+    """True for the placeholder load_scaled_image() returns when a file is missing or broken."""
+    return image.get_at((0, 0)) == pygame.Color(FALLBACK_IMAGE_COLOR)
+
+
+def get_image(filename, size, flip=False):
+    """load_scaled_image(filename, size), loaded once; flip=True gives the horizontally mirrored copy."""
+    key = (filename, size, flip)
+    image = _images.get(key)
+    if image is None:
+        image = pygame.transform.flip(get_image(filename, size), True, False) if flip else load_scaled_image(filename, size)
+        _images[key] = image
+    return image
+
+
+def get_frame_sequence(filenames, size, flip=False):
+    """
+    The leading run of `filenames` that exist and load, scaled to `size` and packed side by side
+    into one atlas. Returns (frames, broken): frames are subsurfaces of the atlas, broken is the
+    file that exists but failed to load (which ended the run) or None.
+    """
+    filenames = tuple(filenames)
+    key = (filenames, size, flip)
+    cached = _sequences.get(key)
+    if cached is not None: return cached
+    if flip:
+        frames, broken = get_frame_sequence(filenames, size)
+        if frames:
+            width = frames[0].get_width()
+            atlas = pygame.transform.flip(frames[0].get_parent(), True, False)
+            last = atlas.get_width() - width
+            frames = [atlas.subsurface((last - i * width, 0, width, atlas.get_height())) for i in range(len(frames))]
+        cached = _sequences[key] = (frames, broken)
+        return cached
+
+    images, broken = [], None
+    for filename in filenames:
+        if not asset_exists(IMAGE_FOLDER, filename): break
+        image = load_scaled_image(filename, size)
+        if is_fallback(image):
+            broken = filename
+            break
+        images.append(image)
+    frames = []
+    if images:
+        width, height = images[0].get_size()
+        atlas = pygame.Surface((width * len(images), height), pygame.SRCALPHA)
+        for i, image in enumerate(images):
+            atlas.blit(image, (i * width, 0), special_flags=pygame.BLEND_RGBA_MAX) # Copy, not blend, onto the clear atlas
+        if pygame.display.get_surface() is not None: atlas = atlas.convert_alpha()
+        frames = [atlas.subsurface((i * width, 0, width, height)) for i in range(len(images))]
+    cached = _sequences[key] = (frames, broken)
+    return cached
+
+
+def get_sound(filename):
+    """load_sound(filename), loaded once. Nothing is cached while the mixer is down."""
+    if filename in _sounds: return _sounds[filename]
+    if not pygame.mixer.get_init(): return None
+    sound = _sounds[filename] = load_sound(filename)
+    return sound
+
+
+def get_music_path(filename):
+    """Path of a music track for pygame.mixer.music, or None if it is missing (checked once)."""
+    return os.path.join(SOUNDS_FOLDER, filename) if asset_exists(SOUNDS_FOLDER, filename) else None
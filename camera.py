@@ -0,0 +1,109 @@
+import pygame
+from constants import CAMERA_ZOOM_CELL_SIZES, CAMERA_FOLLOW_RATE
+
+
+class Camera:
+    """
+    A view_width x view_height pixel window onto a maze of world_width x world_height cells.
+    Zoom picks one of `zoom_levels` cell sizes; (x, y) is the window's top-left corner in pixels
+    of the current zoom. Mazes smaller than the window stay anchored at the top-left corner.
+    Everything that draws the maze asks the camera where a cell lands and what is visible.
+    """
+    def __init__(self, view_width, view_height, cell_size, zoom_levels=CAMERA_ZOOM_CELL_SIZES):
+        self.view_width = view_width
+        self.view_height = view_height
+        self.zoom_levels = sorted(set(zoom_levels) | {cell_size})
+        self.zoom_index = self.zoom_levels.index(cell_size)
+        self.world_width = self.world_height = 0
+        self.x = self.y = 0.0
+        self._sprites = {} # (id(image), cell_size) -> (image, scaled image)
+
+    @classmethod
+    def whole_maze(cls, maze):
+        """Fixed camera showing all of `maze` at its own cell size (what draw() without a camera uses)."""
+        camera = cls(maze.width * maze.cell_size, maze.height * maze.cell_size, maze.cell_size, ())
+        camera.set_world(maze.width, maze.height)
+        return camera
+
+    @property
+    def cell_size(self):
+        return self.zoom_levels[self.zoom_index]
+
+    @property
+    def offset(self):
+        return int(self.x), int(self.y)
+
+    def set_world(self, width, height):
+        if (width, height) != (self.world_width, self.world_height):
+            self.world_width, self.world_height = width, height
+            self._clamp()
+
+    def _clamp(self):
+        max_x = max(0, self.world_width * self.cell_size - self.view_width)
+        max_y = max(0, self.world_height * self.cell_size - self.view_height)
+        self.x = min(max(self.x, 0.0), max_x)
+        self.y = min(max(self.y, 0.0), max_y)
+
+    def follow(self, pos, dt=None):
+        """Moves toward centring cell `pos`; dt=None jumps there at once."""
+        cell_size = self.cell_size
+        target_x = (pos[0] + 0.5) * cell_size - self.view_width / 2
+        target_y = (pos[1] + 0.5) * cell_size - self.view_height / 2
+        blend = 1.0 if dt is None else min(1.0, dt * CAMERA_FOLLOW_RATE)
+        self.x += (target_x - self.x) * blend
+        self.y += (target_y - self.y) * blend
+        self._clamp()
+
+    def zoom(self, steps, anchor=None):
+        """Zooms in (steps > 0) or out keeping the pixel `anchor` of the view (default: its centre) still."""
+        zoom_index = min(max(self.zoom_index + steps, 0), len(self.zoom_levels) - 1)
+        if zoom_index == self.zoom_index: return False
+        anchor_x, anchor_y = anchor if anchor is not None else (self.view_width / 2, self.view_height / 2)
+        scale = self.zoom_levels[zoom_index] / self.cell_size
+        self.zoom_index = zoom_index
+        self.x = (self.x + anchor_x) * scale - anchor_x
+        self.y = (self.y + anchor_y) * scale - anchor_y
+        self._clamp()
+        return True
+
+    def visible_cells(self):
+        """(x0, y0, x1, y1): the cells at least partly in view, end-exclusive and clipped to the maze."""
+        cell_size = self.cell_size
+        ox, oy = self.offset
+        return (ox // cell_size, oy // cell_size,
+                min(self.world_width, -(-(ox + self.view_width) // cell_size)),
+                min(self.world_height, -(-(oy + self.view_height) // cell_size)))
+
+    def is_visible(self, pos):
+        x0, y0, x1, y1 = self.visible_cells()
+        return x0 <= pos[0] < x1 and y0 <= pos[1] < y1
+
+    def cell_to_view(self, x, y):
+        """Top-left pixel of cell (x, y) in view coordinates."""
+        ox, oy = self.offset
+        return x * self.cell_size - ox, y * self.cell_size - oy
+
+    def cell_rect(self, x, y):
+        return pygame.Rect(*self.cell_to_view(x, y), self.cell_size, self.cell_size)
+
+    def cell_center(self, pos):
+        ox, oy = self.offset
+        cell_size = self.cell_size
+        return pos[0] * cell_size + cell_size // 2 - ox, pos[1] * cell_size + cell_size // 2 - oy
+
+    def view_to_cell(self, px, py):
+        ox, oy = self.offset
+        return int((px + ox) // self.cell_size), int((py + oy) // self.cell_size)
+
+    def scaled_sprite(self, image, base_cell_size):
+        """`image`, drawn for cells of base_cell_size, scaled to the current zoom (cached per zoom level)."""
+        cell_size = self.cell_size
+        if cell_size == base_cell_size: return image
+        key = (id(image), cell_size)
+        cached = self._sprites.get(key)
+        if cached is None or cached[0] is not image:
+            if len(self._sprites) > 256: self._sprites.clear() # Sprites of finished runs
+            width, height = image.get_size()
+            size = (max(1, width * cell_size // base_cell_size), max(1, height * cell_size // base_cell_size))
+            cached = self._sprites[key] = (image, pygame.transform.smoothscale(image, size))
+        return cached[1]
@@ -1,4 +1,3 @@
-import pygame
 
 # --- Screen & Maze Dimensions ---
 SCREEN_WIDTH = 1280
@@ -12,6 +11,12 @@ MAZE_AREA_HEIGHT = SCREEN_HEIGHT - CONTROLS_AREA_HEIGHT
 CELL_SIZE = 28
 MAZE_WIDTH = MAZE_AREA_WIDTH // CELL_SIZE - 1
 MAZE_HEIGHT = MAZE_AREA_HEIGHT // CELL_SIZE 
+# Mazes are independent of the window: the view (MAZE_WIDTH x MAZE_HEIGHT cells at CELL_SIZE) scrolls and zooms
+MAZE_SIZE_PRESETS = ((MAZE_WIDTH, MAZE_HEIGHT), (101, 101), (251, 251), (501, 501))
+CAMERA_ZOOM_CELL_SIZES = (4, 6, 10, 16, 22, 28, 40) # Cell sizes (px) the maze view zooms between
+CAMERA_FOLLOW_RATE = 8.0 # How quickly the view catches up with the player / agent (1/s)
+RENDER_CHUNK_PIXELS = 512 # Side of a pre-rendered background chunk
+RENDER_CHUNK_CACHE_CHUNKS = 48 # Background chunks a renderer keeps (LRU), at least twice what is on screen
 
 
 # --- Dark Modern Green Theme Colors ---
@@ -61,6 +66,13 @@ PLAYER_MUD_MULTIPLIER = 5
 
 # --- Maze Settings ---
 MAZE_LOOP_CHANCE = 0.15
+MAZE_FAST_GENERATION_MIN_CELLS = 250000 # Mazes this large draw their randomness with NumPy in bulk (different RNG stream)
+MAZE_JOURNAL_MAX_ENTRIES = 4096 # Maze mutations remembered for Maze.changes_since(); older ones force a full rebuild
+TILED_MAZE_TILE_SIZE = 256 # Cells per tile side in tiled maze files
+TILED_MAZE_CACHE_TILES = 64 # Hot tiles a TiledMaze keeps in memory (64 KB each at the default size)
+ENDLESS_BAND_ROWS = 4 # Grid rows an endless maze generates at a time (even)
+ENDLESS_PREFETCH_BANDS = 8 # Bands the background worker keeps ready ahead of the agent
+ENDLESS_MUD_CHANCE = 0.03 # Chance for each open cell of a new band to be mud
 DEFAULT_NUM_KEYS = 0
 MIN_NUM_KEYS_CONFIG = 0
 MAX_NUM_KEYS_CONFIG = 5
@@ -88,15 +100,20 @@ SLIDE_CELL_COST_ALGO = 1
 # --- Algorithm Settings ---
 ALGORITHM_THINK_TIME_PER_NODE = 0.001 # Time per node for "thinking" phase visualization
 ALGORITHM_MOVE_SPEED = PLAYER_MOVE_SPEED # Algorithm "player" moves at same base speed
+KEY_ORDER_EXACT_MAX_KEYS = 12 # Held-Karp up to this many keys (2^k * k^2 steps); nearest neighbour + 2-opt above
 
 # --- Algorithm Visualization Colors (Themed RGBA for transparency) ---
 VISITED_NODE_COLOR_ALGO = (70, 90, 85, 100)
 FRONTIER_NODE_COLOR_ALGO = (60, 130, 150, 90)
 FINAL_PATH_COLOR_ALGO = (*DMG_PRIMARY_GREEN, 220) # Brighter and more opaque for final path
 NO_PATH_FOUND_COLOR = (*DMG_WARN_TEXT, 200)
+# Expansion heatmap (H): colour ramp from the least to the most expanded cell, log scaled
+HEATMAP_COLOR_STOPS = ((40, 60, 200), (0, 200, 220), (240, 230, 40), (230, 40, 30))
+HEATMAP_ALPHA = 170
 
 # --- Game Settings ---
 FPS = 60
+IDLE_FPS = 10 # Loop rate while nothing animates; input still wakes it at once
 WIN_DELAY = 2.5 # Seconds before returning to config from outcome screen
 FADE_SPEED = 10 # Alpha change per frame for screen transitions
 
@@ -130,6 +147,7 @@ UI_FONT_SIZE_LARGE = 48
 UI_FONT_SIZE_NORMAL = 28
 UI_FONT_SIZE_SMALL = 24
 UI_FONT_SIZE_XSMALL = 20
+TEXT_CACHE_MAX_ENTRIES = 512 # Rendered text surfaces kept by utils.render_text() (LRU)
 
 # Slider specific
 UI_SLIDER_TRACK_HEIGHT = 8
@@ -139,4 +157,14 @@ DMG_SLIDER_KNOB_COLOR = DMG_PRIMARY_GREEN
 DMG_SLIDER_KNOB_OUTLINE = DMG_LIGHT_TEXT
 
 # --- Reporting ---
-REPORT_FILENAME = "maze_run_reports.txt"
\ No newline at end of file
+REPORT_FILENAME = "maze_run_reports.txt"
+# --- Frame Profiler (F3) ---
+PROFILER_HISTORY_FRAMES = 240 # Frames the HUD graphs and takes percentiles over (also the graph width in px)
+PROFILER_MAX_RECORDED_FRAMES = 108000 # Samples kept for export, about 30 minutes at FPS
+PROFILER_GRAPH_HEIGHT = 90
+PROFILER_GRAPH_MAX_MS = 2000.0 / FPS # Frame time at the top of the graph (two frame budgets)
+PROFILER_TEXT_REFRESH = 0.5 # Seconds between HUD text updates, so numbers stay readable
+PROFILER_EXPORT_FILENAMES = ("frame_profile.csv", "frame_profile.json") # Written on exit if F3 was used
+PROFILER_SECTION_COLORS = [(0, 204, 102), (60, 130, 150), (230, 180, 60), (200, 90, 200),
+                           (255, 100, 100), (120, 200, 255), (180, 180, 120), (150, 110, 80),
+                           (140, 160, 150), (255, 150, 200), (90, 90, 220), (210, 230, 220)]
@@ -0,0 +1,115 @@
+from array import array
+
+
+class CorridorGraph:
+    """
+    A maze's move graph with corridors contracted. A cell is folded into an edge when it is not
+    pinned (start, exit, keys) and its only moves are back and forth between the same two cells,
+    so it can only ever be walked straight through. Every other open cell is a node; each node
+    keeps its cheapest edge to every node it reaches, CSR-style like TransitionTable: edges
+    offsets[n] .. offsets[n + 1] - 1 of node ordinal n, with the flat index of the cell reached,
+    the summed move cost and, in via[via_offsets[e]:via_offsets[e + 1]], the cells walked through.
+    """
+    def __init__(self, width, node_ordinals, offsets, targets, costs, via_offsets, via):
+        self.width = width
+        self.node_ordinals = node_ordinals # Flat cell index -> node ordinal, -1 inside corridors and walls
+        self.offsets = offsets
+        self.targets = targets
+        self.costs = costs
+        self.via_offsets = via_offsets
+        self.via = via
+        self.num_nodes = len(offsets) - 1
+        self._predecessors = None # Node ordinal -> [(source cell index, cost)], built by the first predecessors() call
+
+    def num_edges(self):
+        return len(self.targets)
+
+    def is_node(self, pos):
+        return self.node_ordinals[pos[1] * self.width + pos[0]] != -1
+
+    def successors(self, pos):
+        """[((target_x, target_y), cost), ...] for every edge out of the node at pos."""
+        width = self.width
+        n = self.node_ordinals[pos[1] * width + pos[0]]
+        start, end = self.offsets[n], self.offsets[n + 1]
+        return [((t % width, t // width), c) for t, c in zip(self.targets[start:end], self.costs[start:end])]
+
+    def predecessors(self, pos):
+        """[((source_x, source_y), cost), ...] for every edge into the node at pos."""
+        width = self.width
+        if self._predecessors is None:
+            self._predecessors = [[] for _ in range(self.num_nodes)]
+            ordinals, targets, costs = self.node_ordinals, self.targets, self.costs
+            for source, n in enumerate(ordinals):
+                if n == -1: continue
+                for e in range(self.offsets[n], self.offsets[n + 1]):
+                    self._predecessors[ordinals[targets[e]]].append((source, costs[e]))
+        return [((s % width, s // width), c) for s, c in self._predecessors[self.node_ordinals[pos[1] * width + pos[0]]]]
+
+    def expand_path(self, node_path):
+        """The full cell path of a path through nodes ([] if two consecutive nodes are not linked)."""
+        if not node_path: return []
+        width = self.width
+        path = [node_path[0]]
+        for (ux, uy), (vx, vy) in zip(node_path, node_path[1:]):
+            n, v = self.node_ordinals[uy * width + ux], vy * width + vx
+            for e in range(self.offsets[n], self.offsets[n + 1]):
+                if self.targets[e] == v: break
+            else:
+                return []
+            path.extend((c % width, c // width) for c in self.via[self.via_offsets[e]:self.via_offsets[e + 1]])
+            path.append((vx, vy))
+        return path
+
+
+def build_corridor_graph(maze, pinned=()):
+    """Contracts maze.get_transition_table(); cells in `pinned` always stay nodes."""
+    table = maze.get_transition_table()
+    width = table.width
+    num_cells = width * table.height
+    offsets, targets, costs = table.offsets, table.targets, table.costs
+
+    in_degree = array('i', [0]) * num_cells
+    for t in targets: in_degree[t] += 1
+
+    def out_targets(i):
+        return targets[offsets[i]:offsets[i + 1]]
+
+    # Corridor cell: two moves to two distinct other cells, and the only moves in come back from those two
+    interior = bytearray(num_cells)
+    for i in range(num_cells):
+        if offsets[i + 1] - offsets[i] != 2 or in_degree[i] != 2: continue
+        a, b = out_targets(i)
+        if a != b and i != a and i != b and i in out_targets(a) and i in out_targets(b): interior[i] = 1
+    for x, y in pinned: interior[y * width + x] = 0
+
+    node_ordinals = array('i', [-1]) * num_cells
+    nodes = []
+    for i in range(num_cells):
+        if offsets[i + 1] > offsets[i] or in_degree[i]: # Open cells; walls have no moves either way
+            if not interior[i]:
+                node_ordinals[i] = len(nodes)
+                nodes.append(i)
+
+    node_offsets = array('i', [0])
+    edge_targets, edge_costs = array('i'), array('i')
+    via_offsets, via = array('i', [0]), array('i')
+    for u in nodes:
+        best = {} # Target node -> (cost, corridor cells); the cheapest of parallel corridors wins
+        for e in range(offsets[u], offsets[u + 1]):
+            prev, current, cost = u, targets[e], costs[e]
+            cells = []
+            while interior[current]:
+                cells.append(current)
+                a, b = out_targets(current)
+                step = offsets[current] + (1 if a == prev else 0)
+                prev, current, cost = current, targets[step], cost + costs[step]
+            if current != u and (current not in best or cost < best[current][0]): best[current] = (cost, cells)
+        for v, (cost, cells) in best.items():
+            edge_targets.append(v)
+            edge_costs.append(cost)
+            via.extend(cells)
+            via_offsets.append(len(via))
+        node_offsets.append(len(edge_targets))
+
+    return CorridorGraph(width, node_ordinals, node_offsets, edge_targets, edge_costs, via_offsets, via)
@@ -0,0 +1,37 @@
+from collections import deque
+from maze_grid import CELL_WALL
+
+
+def fill_dead_ends(maze, pinned=()):
+    """
+    Dead-end filling over maze.get_transition_table(). Cells are linked by moves in either direction,
+    with slides and portals already resolved, so a slide's landing cell or a portal's far side counts
+    as a neighbour of where the move started. An open cell with at most one neighbour left that is not
+    in `pinned` is filled, and filling repeats until none is left. No route between pinned cells can
+    pass through a filled cell. Returns a bytearray with 1 at the flat index of every filled cell.
+    """
+    table = maze.get_transition_table()
+    num_cells = table.width * table.height
+    offsets, targets = table.offsets, table.targets
+    flags = maze.grid.flags
+
+    neighbours = [set() for _ in range(num_cells)]
+    for i in range(num_cells):
+        for t in targets[offsets[i]:offsets[i + 1]]:
+            if t != i:
+                neighbours[i].add(t)
+                neighbours[t].add(i)
+    keep = bytearray(num_cells)
+    for x, y in pinned: keep[y * table.width + x] = 1
+
+    filled = bytearray(num_cells)
+    queue = deque(i for i in range(num_cells) if not flags[i] & CELL_WALL and not keep[i] and len(neighbours[i]) <= 1)
+    while queue:
+        i = queue.popleft()
+        if filled[i]: continue
+        filled[i] = 1
+        for n in neighbours[i]:
+            links = neighbours[n]
+            links.discard(i)
+            if not filled[n] and not keep[n] and len(links) <= 1: queue.append(n)
+    return filled
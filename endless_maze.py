@@ -0,0 +1,119 @@
+import random
+import queue
+import threading
+from collections import deque
+from constants import ENDLESS_BAND_ROWS, ENDLESS_PREFETCH_BANDS, ENDLESS_MUD_CHANCE, MAZE_LOOP_CHANCE
+from maze import Maze
+from maze_grid import MazeGrid, CELL_WALL, CELL_MUD
+from maze_generator import EllerRowGenerator
+
+
+class EndlessMaze(Maze):
+    """
+    A window of `height` rows onto an endless maze streamed by EllerRowGenerator. A background
+    thread keeps up to ENDLESS_PREFETCH_BANDS bands ready; advance() drops every band but the
+    last, appends fresh ones and moves start/exit, so memory stays constant however far the
+    agent gets. Within the window it is a regular Maze (no keys, slides or portals; some mud).
+    """
+    def __init__(self, width, height, cell_size, loop_chance=MAZE_LOOP_CHANCE, seed=None,
+                 band_rows=ENDLESS_BAND_ROWS, prefetch_bands=ENDLESS_PREFETCH_BANDS, mud_chance=ENDLESS_MUD_CHANCE):
+        if seed is None: seed = random.getrandbits(32)
+        width -= 1 - width % 2 # Eller rows need an odd width
+        self.band_rows = band_rows + band_rows % 2 # Even, so every band starts on the same kind of row
+        self.num_bands = max(2, height // self.band_rows)
+        self.mud_chance = mud_chance
+        self.legs = 0 # Times the window moved on
+        self.row_origin = 0 # Global row of the window's first row
+
+        # The generator (and its rng) is only touched by the worker once that starts
+        self._generator = EllerRowGenerator(width, random.Random(seed), loop_chance)
+        flags = bytearray()
+        for _ in range(self.num_bands): flags += self._next_band()
+        grid = MazeGrid(width, self.num_bands * self.band_rows, flags)
+        self._init_from_grid(grid, cell_size, (1, 1), (1, 1), loop_chance=loop_chance, seed=seed)
+        self.exit_pos = self._pick_exit()
+
+        self._bands = queue.Queue(maxsize=max(1, prefetch_bands))
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._generate_ahead, name="EndlessMazeWorker", daemon=True)
+        self._worker.start()
+
+    def _next_band(self):
+        band = self._generator.next_rows(self.band_rows)
+        rng = self._generator.rng
+        if self.mud_chance > 0:
+            for i in range(len(band)):
+                if band[i] == 0 and rng.random() < self.mud_chance: band[i] = CELL_MUD
+        return band
+
+    def _generate_ahead(self):
+        while not self._stop.is_set():
+            band = self._next_band()
+            while not self._stop.is_set():
+                try:
+                    self._bands.put(band, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def _pick_exit(self):
+        """
+        A random cell on the bottom row reachable from start_pos inside the window. Eller only
+        promises that cells of one set meet somewhere in the whole maze, possibly above the window,
+        so when the flood stalls one separator wall under its deepest cell row is opened (a loop).
+        """
+        flags, width = self.grid.flags, self.width
+        last_row = self.height - 1
+        start = self.start_pos[1] * width + self.start_pos[0]
+        seen = {start}
+        frontier = deque([start])
+        deepest_row, deepest = -1, []
+        while True:
+            while frontier:
+                i = frontier.popleft()
+                row = i // width
+                if row > deepest_row: deepest_row, deepest = row, [i]
+                elif row == deepest_row: deepest.append(i)
+                for n in (i - width, i + width, i - 1, i + 1):
+                    if 0 <= n < len(flags) and n not in seen and flags[n] & CELL_WALL == 0:
+                        seen.add(n)
+                        frontier.append(n)
+            if deepest_row >= last_row: break
+            wall = self.rng.choice(deepest) + width # Deepest reachable row is always a cell row
+            flags[wall] = 0
+            seen.add(wall)
+            frontier.append(wall)
+        return self.grid.pos(self.rng.choice(deepest))
+
+    def advance(self):
+        """
+        Moves the window down once the exit is reached: keeps the band holding the exit (which
+        becomes the new start) and appends fresh bands. Returns how many rows positions shift up.
+        """
+        shift = (self.num_bands - 1) * self.band_rows
+        flags = self.grid.flags
+        kept = flags[shift * self.width:]
+        for _ in range(self.num_bands - 1): kept += self._bands.get() # Blocks only if the worker fell behind
+        flags[:] = kept
+        self.row_origin += shift
+        self.legs += 1
+
+        self.start_pos = (self.exit_pos[0], self.exit_pos[1] - shift)
+        self.exit_pos = self._pick_exit()
+        flags_view, _ = self.grid.as_numpy()
+        self.mud_puddles = set(self.grid.pos(int(i)) for i in (flags_view.reshape(-1) & CELL_MUD).nonzero()[0])
+        self.actual_num_puddles = len(self.mud_puddles)
+
+        # Everything changed: an emptied journal makes changes_since() ask for a full rebuild
+        self.version += 1
+        self.journal.clear()
+        self._transition_table = None
+        self._reachability = None
+        self._corridor_graph = None
+        self._dead_end_mask = None
+        self._maze_data = None
+        self._fingerprint = None
+        return shift
+
+    def close(self):
+        self._stop.set()
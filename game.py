@@ -9,7 +9,11 @@ import traceback
 
 from constants import * 
 from maze import Maze
+from endless_maze import EndlessMaze
 from player import Player 
+from search_overlay import SearchOverlay, ExpansionHeatmap
+from camera import Camera
+from profiler import FrameProfiler
 from solvers.bfs_solver import BFSSolver
 from solvers.greedy_solver import GreedySolver
 from solvers.simulated_annealing_solver import SimulatedAnnealingSolver
@@ -19,7 +23,12 @@ from solvers.csp_backtracking_fc_solver import CSPBacktrackingFCSolver
 from solvers.q_learning_solver import QLearningSolver
 import solvers 
 
-from utils import load_sound, draw_rounded_rect, draw_text, load_scaled_image
+from utils import draw_rounded_rect, draw_text, get_font, render_text
+from assets import get_image, get_frame_sequence, get_sound, get_music_path, asset_exists, is_fallback
+
+SOLVER_CLASSES = {"BFS": BFSSolver, "Greedy": GreedySolver, "A*": solvers.a_star_solver.AStarSolver, "SA": SimulatedAnnealingSolver, "LBS": LocalBeamSearchSolver, "SPO": SPOSolver, "CSP_FC": CSPBacktrackingFCSolver, "Q-Learn": QLearningSolver,}
+KEY_ORDER_SOLVERS = ("BFS", "Greedy", "A*") # Take optimal_key_order=True
+BIDIRECTIONAL_SOLVERS = ("BFS", "A*") # Take bidirectional=True
 
 class AlgorithmRunner:
     def __init__(self, solver_instance, maze_instance, game_speed_ref: list[float]):
@@ -39,11 +48,14 @@ class AlgorithmRunner:
         self.start_time_solve = 0
         self.visualize_search = True
         self.visualization_complete = False
-        self.key_pickup_sound = load_sound(KEY_PICKUP_SOUND)
+        self.key_pickup_sound = get_sound(KEY_PICKUP_SOUND)
         self.keys_sound_played_for = set()
         self.game_speed_ref = game_speed_ref
 
         self.cell_size = CELL_SIZE
+        self.search_overlay = SearchOverlay(maze_instance.width, maze_instance.height, CELL_SIZE)
+        self.show_heatmap = False # Count expansions per cell and draw them instead of the visited/frontier overlay
+        self.heatmap = None
         self._load_sprites()
         self.direction = 'right'
         self.is_moving_for_animation = False
@@ -52,33 +64,31 @@ class AlgorithmRunner:
         self.current_image = self.idle_img_right
 
     def _load_sprites(self):
-        self.idle_img_right = load_scaled_image(PLAYER_IDLE_IMAGE, self.cell_size)
-        if self.idle_img_right.get_at((0,0)) == pygame.Color(FALLBACK_IMAGE_COLOR) and not os.path.exists(os.path.join(IMAGE_FOLDER,PLAYER_IDLE_IMAGE)):
+        # Shared with Player through the asset cache: starting a run does no file I/O after the first
+        self.idle_img_right = get_image(PLAYER_IDLE_IMAGE, self.cell_size)
+        self.idle_img_left = get_image(PLAYER_IDLE_IMAGE, self.cell_size, flip=True)
+        if is_fallback(self.idle_img_right) and not asset_exists(IMAGE_FOLDER, PLAYER_IDLE_IMAGE):
             print(f"W: Algo Player idle image '{PLAYER_IDLE_IMAGE}' not found. Using fallback.", file=sys.stderr)
             self.idle_img_right = pygame.Surface((self.cell_size, self.cell_size), pygame.SRCALPHA)
             self.idle_img_right.fill(DMG_PRIMARY_GREEN)
             pygame.draw.circle(self.idle_img_right, DMG_LIGHT_TEXT, (self.cell_size//2, self.cell_size//2), self.cell_size//3)
-        self.idle_img_left = pygame.transform.flip(self.idle_img_right, True, False)
+            self.idle_img_left = pygame.transform.flip(self.idle_img_right, True, False)
 
-        self.walk_frames_right = []
         MAX_ALGO_WALK_FRAMES = 8
-        for i in range(MAX_ALGO_WALK_FRAMES):
-            filename = f"{PLAYER_WALK_PREFIX}{i}.png"
-            image_path = os.path.join(IMAGE_FOLDER, filename)
-            if not os.path.exists(image_path):
-                if i == 0:
-                    print(f"W: Algo Player walk frame '{filename}' (start of sequence) not found. Walk animation may be missing.", file=sys.stderr)
-                break
-            frame = load_scaled_image(filename, self.cell_size)
-            if frame.get_at((0,0)) == pygame.Color(FALLBACK_IMAGE_COLOR):
-                print(f"W: Error loading Algo Player walk frame '{filename}' (file exists but failed to load). Stopping sequence.", file=sys.stderr)
-                break
-            self.walk_frames_right.append(frame)
-
-        if not self.walk_frames_right:
+        walk_filenames = [f"{PLAYER_WALK_PREFIX}{i}.png" for i in range(MAX_ALGO_WALK_FRAMES)]
+        frames, broken = get_frame_sequence(walk_filenames, self.cell_size)
+        if not frames and not broken:
+            print(f"W: Algo Player walk frame '{walk_filenames[0]}' (start of sequence) not found. Walk animation may be missing.", file=sys.stderr)
+        if broken:
+            print(f"W: Error loading Algo Player walk frame '{broken}' (file exists but failed to load). Stopping sequence.", file=sys.stderr)
+
+        if frames:
+            self.walk_frames_right = list(frames)
+            self.walk_frames_left = list(get_frame_sequence(walk_filenames, self.cell_size, flip=True)[0])
+        else:
             print(f"W: No Algo Player walk frames. Using idle image for walking.", file=sys.stderr)
-            self.walk_frames_right.append(self.idle_img_right)
-        self.walk_frames_left = [pygame.transform.flip(img, True, False) for img in self.walk_frames_right]
+            self.walk_frames_right = [self.idle_img_right]
+            self.walk_frames_left = [self.idle_img_left]
 
 
     def _update_animation(self, dt: float):
@@ -131,6 +141,7 @@ class AlgorithmRunner:
             pass
 
         self.start_time_solve = time.time()
+        self.solver.track_expansions(self.show_heatmap)
         self.solver.solve_all_stages() 
         self.results = self.solver.get_solver_results()
 
@@ -157,6 +168,8 @@ class AlgorithmRunner:
             if hasattr(self.solver, 'viz_frontier'):
                 if isinstance(self.solver.viz_frontier, deque): self.solver.viz_frontier.clear()
             if hasattr(self.solver, 'viz_frontier_heap'): self.solver.viz_frontier_heap = []
+            if self.solver.viz_log is not None: del self.solver.viz_log[:]
+            self.search_overlay.reset()
 
             if isinstance(self.solver, QLearningSolver):
                  self.solver._training_complete = False 
@@ -235,30 +248,21 @@ class AlgorithmRunner:
         elif dx < 0: self.direction = 'left'
         self._update_animation(dt)
 
-    def draw(self, surface):
+    def draw(self, surface, camera=None):
+        if camera is None: camera = Camera.whole_maze(self.maze)
+        heatmap_counts = self.solver.expansion_counts if self.show_heatmap and self.state != "IDLE" else None
+        if heatmap_counts is not None:
+            if self.heatmap is None or self.heatmap.surface.get_size() != (self.maze.width, self.maze.height):
+                self.heatmap = ExpansionHeatmap(self.maze.width, self.maze.height, CELL_SIZE)
+            self.heatmap.sync(heatmap_counts)
+            self.heatmap.draw(surface, camera)
         if self.state == "THINKING" and self.visualize_search and not self.visualization_complete:
-            if hasattr(self.solver, 'viz_visited_nodes') and self.solver.viz_visited_nodes:
-                for pos_v in self.solver.viz_visited_nodes:
-                    rect_v = pygame.Rect(pos_v[0] * CELL_SIZE, pos_v[1] * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                    s_v = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
-                    s_v.fill(VISITED_NODE_COLOR_ALGO)
-                    surface.blit(s_v, rect_v.topleft)
-            current_visual_frontier_nodes = []
-            if hasattr(self.solver, 'viz_frontier') and self.solver.viz_frontier:
-                 if isinstance(self.solver.viz_frontier, deque):
-                    current_visual_frontier_nodes = list(self.solver.viz_frontier)
-            elif hasattr(self.solver, 'viz_frontier_heap') and self.solver.viz_frontier_heap:
-                 current_visual_frontier_nodes = [item[2] for item in self.solver.viz_frontier_heap if len(item) > 2 and isinstance(item[2], tuple)]
-            for pos_f in current_visual_frontier_nodes:
-                if isinstance(pos_f, tuple) and len(pos_f) == 2: 
-                    rect_f = pygame.Rect(pos_f[0] * CELL_SIZE, pos_f[1] * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                    s_f = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
-                    s_f.fill(FRONTIER_NODE_COLOR_ALGO)
-                    surface.blit(s_f, rect_f.topleft)
+            self.search_overlay.sync(self.solver) # Drains viz_log even while the heatmap is shown
+            if heatmap_counts is None: self.search_overlay.draw(surface, camera)
             if hasattr(self.solver, 'path') and self.solver.path and len(self.solver.path) > 1:
                  try:
                     pygame.draw.lines(surface, FINAL_PATH_COLOR_ALGO[:3], False,
-                                     [(p[0]*CELL_SIZE+CELL_SIZE//2, p[1]*CELL_SIZE+CELL_SIZE//2) for p in self.solver.path], 2)
+                                     [camera.cell_center(p) for p in self.solver.path], 2)
                  except Exception: pass 
         path_list_final = []
         if self.results and self.results.get("path_found"):
@@ -267,15 +271,12 @@ class AlgorithmRunner:
            ((self.state == "THINKING" and self.visualization_complete) or self.state in ["MOVING", "FINISHED"]):
             try:
                 pygame.draw.lines(surface, FINAL_PATH_COLOR_ALGO[:3], False,
-                                 [(p[0]*CELL_SIZE+CELL_SIZE//2, p[1]*CELL_SIZE+CELL_SIZE//2) for p in path_list_final], 3)
+                                 [camera.cell_center(p) for p in path_list_final], 3)
             except Exception: pass
         if self.state != "IDLE":
-            draw_x = self.algo_player_pos[0] * self.cell_size
-            draw_y = self.algo_player_pos[1] * self.cell_size
-            surface.blit(self.current_image, (draw_x, draw_y))
+            surface.blit(camera.scaled_sprite(self.current_image, self.cell_size), camera.cell_to_view(*self.algo_player_pos))
         if self.state == "FAILED":
-            font = pygame.font.SysFont(None, UI_FONT_SIZE_LARGE)
-            text_surf = font.render(f"{self.name}: No Path Found", True, NO_PATH_FOUND_COLOR[:3])
+            text_surf = render_text(get_font(UI_FONT_SIZE_LARGE), f"{self.name}: No Path Found", NO_PATH_FOUND_COLOR[:3])
             game_surface_width = surface.get_width()
             game_surface_height = surface.get_height()
             text_rect = text_surf.get_rect(center=(game_surface_width // 2, game_surface_height // 2))
@@ -331,18 +332,27 @@ class Game:
         self.info_area_rect = pygame.Rect(self.maze_area_rect.right + UI_PADDING, UI_PADDING, INFO_AREA_WIDTH - UI_PADDING, MAZE_AREA_HEIGHT - 2 * UI_PADDING)
         self.controls_area_rect = pygame.Rect(UI_PADDING, self.maze_area_rect.bottom + UI_PADDING, SCREEN_WIDTH - 2 * UI_PADDING, CONTROLS_AREA_HEIGHT - UI_PADDING)
         self.maze_render_surface = pygame.Surface((MAZE_WIDTH * CELL_SIZE, MAZE_HEIGHT * CELL_SIZE))
+        self.camera = Camera(self.maze_render_surface.get_width(), self.maze_render_surface.get_height(), CELL_SIZE)
+        self.maze_size_index = 0 # Into MAZE_SIZE_PRESETS
+        self.profiler = FrameProfiler()
+        self.font_profiler = get_font(UI_FONT_SIZE_XSMALL, "consolas,dejavusansmono,couriernew,monospace")
         self.game_state = "IDLE_CONFIG"
         self.maze = None
         self.player = None
         self.algorithm_runner = None
-        self.font_xl = pygame.font.SysFont(None, UI_FONT_SIZE_XLARGE)
-        self.font_l = pygame.font.SysFont(None, UI_FONT_SIZE_LARGE)
-        self.font_m = pygame.font.SysFont(None, UI_FONT_SIZE_NORMAL)
-        self.font_s = pygame.font.SysFont(None, UI_FONT_SIZE_SMALL)
-        self.font_xs = pygame.font.SysFont(None, UI_FONT_SIZE_XSMALL)
-        self.solver_classes = {"Player": None, "BFS": BFSSolver, "Greedy": GreedySolver, "A*": solvers.a_star_solver.AStarSolver, "SA": SimulatedAnnealingSolver, "LBS": LocalBeamSearchSolver, "SPO": SPOSolver, "CSP_FC": CSPBacktrackingFCSolver, "Q-Learn": QLearningSolver,}
+        self.font_xl = get_font(UI_FONT_SIZE_XLARGE)
+        self.font_l = get_font(UI_FONT_SIZE_LARGE)
+        self.font_m = get_font(UI_FONT_SIZE_NORMAL)
+        self.font_s = get_font(UI_FONT_SIZE_SMALL)
+        self.font_xs = get_font(UI_FONT_SIZE_XSMALL)
+        self.solver_classes = {"Player": None, **SOLVER_CLASSES}
         self.selected_algo_name = "Player"
         self.num_keys_setting = DEFAULT_NUM_KEYS
+        self.endless_mode = False
+        self.heatmap_mode = False
+        self.optimal_key_order = False
+        self.prune_dead_ends = False
+        self.bidirectional = False
         self.game_speed_multiplier = [1.0]
         self.speed_slider_options = [0.25, 0.5, 1.0, 2.0, 4.0, 8.0]
         self.current_speed_option_idx = self.speed_slider_options.index(1.0)
@@ -355,12 +365,20 @@ class Game:
         self.game_reports = []
         self.current_required_keys = self.num_keys_setting
         self.current_maze_run_history = []
+        self._compare_screen_cache = None
+        self._compare_screen_cache_key = None
         self.transition_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
         self.transition_surface.fill(DMG_DARK_BG)
         self.transition_alpha = 0
         self.fading_out = False
         self.fading_in = False
         self.next_game_state_after_fade = ""
+        # What the screen last showed: partial frames only repaint regions whose inputs moved on from these
+        self._needs_full_redraw = True
+        self._drawn_state = None
+        self._drawn_status_message = None
+        self._drawn_maze_view = None
+        self._maze_animated = False # Portal frame advanced since the last draw
         
         self.gameplay_music_file = GAMEPLAY_MUSIC
         self.menu_music_file = MENU_MUSIC
@@ -390,7 +408,7 @@ class Game:
         self.config_section_label_pos = (config_section_x_start, self.controls_area_rect.top + UI_PADDING //2)
         self.key_selector_elements = {}
         key_label_text = "Keys:"
-        key_label_surf = self.font_s.render(key_label_text, True, DMG_LIGHT_TEXT)
+        key_label_surf = render_text(self.font_s, key_label_text, DMG_LIGHT_TEXT)
         key_label_rect = key_label_surf.get_rect(left=config_section_x_start, centery=base_y + element_height // 2)
         self.key_selector_elements["label_surf"] = key_label_surf
         self.key_selector_elements["label_rect"] = key_label_rect
@@ -403,7 +421,7 @@ class Game:
         speed_section_x_start = self.key_selector_elements["plus_rect"].right + UI_ELEMENT_PADDING * 2
         self.speed_slider_elements = {}
         speed_label_text = "Speed:"
-        speed_label_surf = self.font_s.render(speed_label_text, True, DMG_LIGHT_TEXT)
+        speed_label_surf = render_text(self.font_s, speed_label_text, DMG_LIGHT_TEXT)
         speed_label_rect = speed_label_surf.get_rect(left=speed_section_x_start, centery=base_y + element_height // 2)
         self.speed_slider_elements["label_surf"] = speed_label_surf
         self.speed_slider_elements["label_rect"] = speed_label_rect
@@ -450,9 +468,9 @@ class Game:
             return 
 
         try:
-            music_path = os.path.join(SOUNDS_FOLDER, target_file_name)
-            if not os.path.exists(music_path):
-                print(f"W: Music file not found: {music_path}", file=sys.stderr)
+            music_path = get_music_path(target_file_name)
+            if music_path is None:
+                print(f"W: Music file not found: {os.path.join(SOUNDS_FOLDER, target_file_name)}", file=sys.stderr)
                 pygame.mixer.music.stop()
                 self.current_music_playing = None
                 return
@@ -511,7 +529,8 @@ class Game:
         effective_num_keys = max(0, num_keys)
         count_from_keys = base + per_key_factor * (effective_num_keys - (MIN_NUM_KEYS_CONFIG if MIN_NUM_KEYS_CONFIG >=0 else 0))
         count = max(base, count_from_keys)
-        path_area_estimate = (MAZE_WIDTH - 2) * (MAZE_HEIGHT - 2) * 0.45
+        maze_width, maze_height = MAZE_SIZE_PRESETS[self.maze_size_index]
+        path_area_estimate = (maze_width - 2) * (maze_height - 2) * 0.45
         max_allowed_by_density = int(path_area_estimate * max_density_ratio)
         return max(0, min(int(count), max_allowed_by_density))
 
@@ -526,7 +545,10 @@ class Game:
         num_portal_pairs_calc = keys_requested // 2 if keys_requested > 0 else 0
         num_portal_pairs = min(num_portal_pairs_calc, MAX_PORTAL_PAIRS if MAX_PORTAL_PAIRS >=0 else 0)
         try:
-            self.maze = Maze(MAZE_WIDTH, MAZE_HEIGHT, CELL_SIZE, keys_requested, num_puddles, num_slides, num_portal_pairs, MAZE_LOOP_CHANCE)
+            maze_width, maze_height = MAZE_SIZE_PRESETS[self.maze_size_index]
+            if self.endless_mode: self.maze = EndlessMaze(maze_width, maze_height, CELL_SIZE, MAZE_LOOP_CHANCE) # No keys: every leg ends at the exit
+            else: self.maze = Maze(maze_width, maze_height, CELL_SIZE, keys_requested, num_puddles, num_slides, num_portal_pairs, MAZE_LOOP_CHANCE)
+            self.camera.set_world(self.maze.width, self.maze.height); self.camera.follow(self.maze.start_pos)
             self.current_required_keys = self.maze.get_total_keys_placed()
             self.controls_status_message = f"Maze Generated! Keys: {self.current_required_keys}. Select mode."
             print(f"Maze generated. Actual Keys: {self.current_required_keys}, Puddles: {getattr(self.maze, 'actual_num_puddles', 'N/A')}, Slides: {getattr(self.maze, 'actual_num_slides', 'N/A')}, Portals: {getattr(self.maze, 'actual_num_portal_pairs', 'N/A')} pairs")
@@ -550,8 +572,9 @@ class Game:
             SolverClass = self.solver_classes.get(self.selected_algo_name)
             if SolverClass:
                 try:
-                    solver_instance = SolverClass(self.maze)
+                    solver_instance = self._create_solver()
                     self.algorithm_runner = AlgorithmRunner(solver_instance, self.maze, self.game_speed_multiplier)
+                    self.algorithm_runner.show_heatmap = self.heatmap_mode
                     self.algorithm_runner.start_solving_process()
                     self._initiate_fade_to_state("PLAYING_ALGORITHM")
                 except Exception as e:
@@ -564,8 +587,19 @@ class Game:
                 self._initiate_fade_to_state("IDLE_CONFIG"); return
         self.outcome_display_timer = 0.0
 
+    def _create_solver(self):
+        SolverClass = self.solver_classes[self.selected_algo_name]
+        options = {}
+        if self.optimal_key_order and self.selected_algo_name in KEY_ORDER_SOLVERS: options['optimal_key_order'] = True
+        if self.bidirectional and self.selected_algo_name in BIDIRECTIONAL_SOLVERS: options['bidirectional'] = True
+        solver = SolverClass(self.maze, **options)
+        solver.prune_dead_ends = self.prune_dead_ends and solver.supports_dead_end_view
+        return solver
+
     def _reset_game_specific_state(self, reset_maze=False):
-        if reset_maze: self.maze = None; self.current_maze_run_history = []
+        if reset_maze:
+            if isinstance(self.maze, EndlessMaze): self.maze.close()
+            self.maze = None; self.current_maze_run_history = []
         self.player = None; self.algorithm_runner = None
         self.show_missing_keys_msg = False; self.missing_keys_msg_text = ""
         self.outcome_display_timer = 0.0
@@ -574,7 +608,9 @@ class Game:
     def _handle_input(self):
         mouse_pos = pygame.mouse.get_pos()
         mouse_pressed = pygame.mouse.get_pressed()
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        if events: self._needs_full_redraw = True # Hover, clicks and keys can change any part of the UI
+        for event in events:
             if event.type == pygame.QUIT: self.running = False
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
@@ -596,6 +632,32 @@ class Game:
                             self.selected_algo_name = self.algo_names_list[current_selected_algo_idx_in_list + 1]
                             if current_selected_algo_idx_in_list + 1 >= self.current_algo_scroll_idx + self.num_algos_to_display: self.current_algo_scroll_idx = min(len(self.algo_names_list) - self.num_algos_to_display, current_selected_algo_idx_in_list + 1 - self.num_algos_to_display + 1); self.current_algo_scroll_idx = max(0, self.current_algo_scroll_idx)
                         elif (self.current_algo_scroll_idx + self.num_algos_to_display) < len(self.algo_names_list): self.current_algo_scroll_idx +=1
+                    elif event.key == pygame.K_e and self.game_state == "IDLE_CONFIG":
+                        self.endless_mode = not self.endless_mode
+                        self.controls_status_message = f"Endless mode {'on' if self.endless_mode else 'off'}. Regenerate to apply."
+                    elif event.key == pygame.K_o and self.game_state == "IDLE_CONFIG":
+                        self.optimal_key_order = not self.optimal_key_order
+                        self.controls_status_message = f"Key order: {'optimal (BFS, Greedy, A*)' if self.optimal_key_order else 'nearest first'}."
+                    elif event.key == pygame.K_d and self.game_state == "IDLE_CONFIG":
+                        self.prune_dead_ends = not self.prune_dead_ends
+                        self.controls_status_message = f"Dead ends {'filled before solving' if self.prune_dead_ends else 'searched'}."
+                    elif event.key == pygame.K_b and self.game_state == "IDLE_CONFIG":
+                        self.bidirectional = not self.bidirectional
+                        self.controls_status_message = f"Search: {'bidirectional (BFS, A*)' if self.bidirectional else 'forward only'}."
+                    elif event.key == pygame.K_m and self.game_state == "IDLE_CONFIG":
+                        self.maze_size_index = (self.maze_size_index + 1) % len(MAZE_SIZE_PRESETS)
+                        self.controls_status_message = "Maze size {}x{}. Regenerate to apply.".format(*MAZE_SIZE_PRESETS[self.maze_size_index])
+                if event.key == pygame.K_F3: self.profiler.toggle()
+                elif event.key == pygame.K_h:
+                    self.heatmap_mode = not self.heatmap_mode
+                    self.controls_status_message = f"Expansion heatmap {'on' if self.heatmap_mode else 'off'}."
+                    if self.algorithm_runner:
+                        self.algorithm_runner.show_heatmap = self.heatmap_mode
+                        if self.heatmap_mode and self.algorithm_runner.solver.expansion_counts is None: self.controls_status_message = "Expansion heatmap on from the next run."
+                elif event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS): self.camera.zoom(1)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS): self.camera.zoom(-1)
+            if event.type == pygame.MOUSEWHEEL and self.maze_area_rect.collidepoint(mouse_pos):
+                self.camera.zoom(event.y, (mouse_pos[0] - self.maze_area_rect.left, mouse_pos[1] - self.maze_area_rect.top))
             if self.fading_in or self.fading_out: continue
             speed_bar_rect = self.speed_slider_elements["bar_rect"]
             if speed_bar_rect.collidepoint(mouse_pos) and mouse_pressed[0]:
@@ -637,7 +699,11 @@ class Game:
         if not self.player or not self.maze: return
         keys_pressed = pygame.key.get_pressed(); self.player.update(keys_pressed, self.maze, dt)
         player_pos = self.player.get_pos()
-        if player_pos == self.maze.exit_pos:
+        if player_pos == self.maze.exit_pos and isinstance(self.maze, EndlessMaze):
+            self.player.y -= self.maze.advance() # Exit band becomes the top of the new window
+            self.camera.follow(self.player.get_pos())
+            self.controls_status_message = f"Leg {self.maze.legs} cleared! Keep going."
+        elif player_pos == self.maze.exit_pos:
             if self.player.get_keys_collected() >= self.current_required_keys:
                 time_taken = time.time() - self.player_start_time
                 report = {"name": "Player", "path_found": True, "time_taken_seconds": f"{time_taken:.2f}", "steps": self.player.move_count, "cost": "N/A (Player)"}
@@ -648,7 +714,12 @@ class Game:
     def _update_algorithm_gameplay(self, dt):
         if not self.algorithm_runner or not self.maze: return
         self.algorithm_runner.update(dt)
-        if self.algorithm_runner.is_done():
+        if self.algorithm_runner.state == "FINISHED" and isinstance(self.maze, EndlessMaze):
+            self.maze.advance(); self.camera.follow(self.maze.start_pos)
+            self.algorithm_runner.solver = self._create_solver()
+            self.algorithm_runner.start_solving_process()
+            self.controls_status_message = f"Leg {self.maze.legs} cleared by {self.algorithm_runner.name}."
+        elif self.algorithm_runner.is_done():
             final_results = self.algorithm_runner.get_final_results()
             if final_results: self.game_reports.append(final_results); self._append_report_to_file(final_results); self.current_maze_run_history.append(final_results)
             if self.algorithm_runner.state == "FINISHED": self._initiate_fade_to_state("OUTCOME_ALGORITHM_WIN")
@@ -661,20 +732,29 @@ class Game:
     def _main_update_loop(self, dt):
         self._update_fades(dt)
         if self.fading_in or self.fading_out: return
-        if self.maze and hasattr(self.maze, 'update'): self.maze.update(dt * self.game_speed_multiplier[0])
+        if self.maze and hasattr(self.maze, 'update') and self.maze.update(dt * self.game_speed_multiplier[0]): self._maze_animated = True
         if self.game_state == "PLAYING_PLAYER": self._update_player_gameplay(dt)
         elif self.game_state == "PLAYING_ALGORITHM": self._update_algorithm_gameplay(dt)
         elif self.game_state.startswith("OUTCOME_"): self._update_outcome_screens(dt)
+        self._update_camera(dt)
+
+    def _update_camera(self, dt):
+        if not self.maze: return
+        self.camera.set_world(self.maze.width, self.maze.height)
+        if self.game_state == "PLAYING_PLAYER" and self.player: self.camera.follow(self.player.get_pos(), dt)
+        elif self.game_state == "PLAYING_ALGORITHM" and self.algorithm_runner: self.camera.follow(self.algorithm_runner.algo_player_pos, dt)
 
     def _draw_maze_area(self):
         draw_rounded_rect(self.screen, DMG_SECONDARY_BG, self.maze_area_rect.inflate(4,4), UI_ROUND_RECT_RADIUS, 2, DMG_UI_BORDER)
         self.maze_render_surface.fill(DMG_DARK_BG)
         if self.maze:
-            self.maze.draw(self.maze_render_surface)
-            if self.game_state == "PLAYING_PLAYER" and self.player: self.player.draw(self.maze_render_surface)
-            elif self.game_state == "PLAYING_ALGORITHM" and self.algorithm_runner: self.algorithm_runner.draw(self.maze_render_surface)
+            self.camera.set_world(self.maze.width, self.maze.height)
+            self.maze.draw(self.maze_render_surface, self.camera)
+            if self.game_state == "PLAYING_PLAYER" and self.player: self.player.draw(self.maze_render_surface, self.camera)
+            elif self.game_state == "PLAYING_ALGORITHM" and self.algorithm_runner:
+                with self.profiler.section("search"): self.algorithm_runner.draw(self.maze_render_surface, self.camera)
             if self.game_state == "PLAYING_PLAYER" and self.show_missing_keys_msg:
-                exit_center_x_on_maze_surf = self.maze.exit_pos[0] * CELL_SIZE + CELL_SIZE // 2; exit_top_y_on_maze_surf = self.maze.exit_pos[1] * CELL_SIZE
+                exit_center_x_on_maze_surf, exit_top_y_on_maze_surf = self.camera.cell_center(self.maze.exit_pos); exit_top_y_on_maze_surf -= self.camera.cell_size // 2
                 draw_text(self.maze_render_surface, self.missing_keys_msg_text, self.font_s, MISSING_KEY_TEXT_COLOR, (exit_center_x_on_maze_surf, exit_top_y_on_maze_surf - self.font_s.get_height()), background_color=(*DMG_DARK_BG, 200), padding=5)
         else: draw_text(self.maze_render_surface, "Regenerate Maze to Start", self.font_l, DMG_DIM_TEXT, self.maze_render_surface.get_rect().center)
         self.screen.blit(self.maze_render_surface, self.maze_area_rect.topleft)
@@ -691,7 +771,7 @@ class Game:
         title_rect = draw_text(self.screen, title_text, self.font_m, DMG_PRIMARY_GREEN, (self.info_area_rect.centerx, current_y + self.font_m.get_height()//2))
         current_y = title_rect.bottom + UI_PADDING
         def draw_info_line(key, value, key_font, val_font, key_color, val_color, y_pos):
-            key_surf = key_font.render(key, True, key_color); val_surf = val_font.render(str(value), True, val_color)
+            key_surf = render_text(key_font, key, key_color); val_surf = render_text(val_font, str(value), val_color)
             key_rect = self.screen.blit(key_surf, (self.info_area_rect.left + padding_x, y_pos))
             self.screen.blit(val_surf, (key_rect.right + 5, y_pos + (key_rect.height - val_surf.get_height()) // 2 )); return key_rect.height + UI_ELEMENT_PADDING // 2
         if self.game_state == "IDLE_CONFIG":
@@ -699,21 +779,29 @@ class Game:
             keys_val = self.num_keys_setting if self.selected_algo_name != "SPO" else "0 (SPO)"
             current_y += draw_info_line("Keys Set:", keys_val, self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
             current_y += draw_info_line("Speed:", f"{self.game_speed_multiplier[0]:.2f}x", self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
+            current_y += draw_info_line("Endless (E):", "On" if self.endless_mode else "Off", self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
+            current_y += draw_info_line("Size (M):", "{}x{}".format(*MAZE_SIZE_PRESETS[self.maze_size_index]), self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
+            current_y += draw_info_line("Zoom (+/-):", f"{self.camera.cell_size}px", self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
+            current_y += draw_info_line("Key Order (O):", "Optimal" if self.optimal_key_order else "Nearest", self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
+            current_y += draw_info_line("Dead Ends (D):", "Filled" if self.prune_dead_ends else "Kept", self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
+            current_y += draw_info_line("Search (B):", "Both Ends" if self.bidirectional else "Forward", self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
+            current_y += draw_info_line("Heatmap (H):", "On" if self.heatmap_mode else "Off", self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
             if self.maze:
-                current_y += UI_PADDING; current_y += draw_info_line("Maze Size:", f"{MAZE_WIDTH}x{MAZE_HEIGHT}", self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
+                current_y += UI_PADDING; current_y += draw_info_line("Maze Size:", f"{self.maze.width}x{self.maze.height}", self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
                 current_y += draw_info_line("Keys Req.:", self.current_required_keys, self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
                 current_y += draw_info_line("Puddles:", getattr(self.maze, 'actual_num_puddles', 'N/A'), self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
                 current_y += draw_info_line("Slides:", getattr(self.maze, 'actual_num_slides', 'N/A'), self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
                 current_y += draw_info_line("Portals:", f"{getattr(self.maze, 'actual_num_portal_pairs', 'N/A')} pairs", self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
                 current_y += UI_PADDING; current_y += draw_info_line("Runs on Maze:", len(self.current_maze_run_history), self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
-            else: info_sf = self.font_s.render("No maze generated.", True, DMG_DIM_TEXT); self.screen.blit(info_sf, (self.info_area_rect.left + padding_x, current_y)); current_y += info_sf.get_height() + UI_ELEMENT_PADDING
+            else: info_sf = render_text(self.font_s, "No maze generated.", DMG_DIM_TEXT); self.screen.blit(info_sf, (self.info_area_rect.left + padding_x, current_y)); current_y += info_sf.get_height() + UI_ELEMENT_PADDING
         elif self.game_state == "PLAYING_PLAYER" and self.player and self.maze:
             current_y += draw_info_line("Keys:", f"{self.player.get_keys_collected()} / {self.current_required_keys}", self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_ACCENT_GREEN, current_y)
             current_y += draw_info_line("Moves:", self.player.move_count, self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
+            if isinstance(self.maze, EndlessMaze): current_y += draw_info_line("Legs:", self.maze.legs, self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_ACCENT_GREEN, current_y)
             time_elapsed = time.time() - self.player_start_time; current_y += draw_info_line("Time:", f"{time_elapsed:.1f}s", self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
             current_y += draw_info_line("Speed:", f"{self.game_speed_multiplier[0]:.2f}x", self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
         elif self.game_state == "PLAYING_ALGORITHM" and self.algorithm_runner:
-            status_text_sf = self.font_s.render(self.algorithm_runner.get_status_text(), True, DMG_LIGHT_TEXT); self.screen.blit(status_text_sf, (self.info_area_rect.left + padding_x, current_y)); current_y += status_text_sf.get_height() + UI_PADDING
+            status_text_sf = render_text(self.font_s, self.algorithm_runner.get_status_text(), DMG_LIGHT_TEXT); self.screen.blit(status_text_sf, (self.info_area_rect.left + padding_x, current_y)); current_y += status_text_sf.get_height() + UI_PADDING
             if self.algorithm_runner.results:
                 res = self.algorithm_runner.results; found_color = DMG_ACCENT_GREEN if res.get('path_found') else DMG_WARN_TEXT
                 current_y += draw_info_line("Path Found:", "Yes" if res.get('path_found') else "No", self.font_s, self.font_s, DMG_LIGHT_TEXT, found_color, current_y)
@@ -731,23 +819,25 @@ class Game:
                     current_y += draw_info_line("Path Found:", "Yes" if report_to_show.get('path_found') else "No", self.font_s, self.font_s, DMG_LIGHT_TEXT, found_color, current_y)
                     if report_to_show.get('path_found'): current_y += draw_info_line("Cost:", report_to_show.get('cost', 'N/A'), self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y); current_y += draw_info_line("Steps:", report_to_show.get('steps', 'N/A'), self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
                     current_y += draw_info_line("Nodes:", report_to_show.get('nodes_expanded', 'N/A'), self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
-            else: info_sf = self.font_s.render("No report data.", True, DMG_DIM_TEXT); self.screen.blit(info_sf, (self.info_area_rect.left + padding_x, current_y)); current_y += info_sf.get_height() + UI_ELEMENT_PADDING
+                    if report_to_show.get('cells_pruned'): current_y += draw_info_line("Pruned:", report_to_show['cells_pruned'], self.font_s, self.font_s, DMG_LIGHT_TEXT, DMG_LIGHT_TEXT, current_y)
+            else: info_sf = render_text(self.font_s, "No report data.", DMG_DIM_TEXT); self.screen.blit(info_sf, (self.info_area_rect.left + padding_x, current_y)); current_y += info_sf.get_height() + UI_ELEMENT_PADDING
         # Removed the COMPARING_RESULTS block from here as it's now handled by the full-screen overlay
         if self.game_state == "PLAYING_ALGORITHM" and self.algorithm_runner and isinstance(self.algorithm_runner.solver, SPOSolver) and hasattr(self.algorithm_runner.solver, 'draw_belief_map'):
-            map_title_sf = self.font_s.render("SPO Belief Map:", True, DMG_PRIMARY_GREEN); map_title_rect = self.screen.blit(map_title_sf, (self.info_area_rect.left + padding_x, current_y)); current_y = map_title_rect.bottom + UI_ELEMENT_PADDING // 2
+            map_title_sf = render_text(self.font_s, "SPO Belief Map:", DMG_PRIMARY_GREEN); map_title_rect = self.screen.blit(map_title_sf, (self.info_area_rect.left + padding_x, current_y)); current_y = map_title_rect.bottom + UI_ELEMENT_PADDING // 2
             belief_map_available_height = self.info_area_rect.bottom - current_y - UI_PADDING
             if self.maze and belief_map_available_height > 50 :
                 max_map_width = self.info_area_rect.width - 2 * padding_x; belief_cell_size = min(max_map_width // self.maze.width, belief_map_available_height // self.maze.height); belief_cell_size = max(1, belief_cell_size)
                 belief_map_width = self.maze.width * belief_cell_size; belief_map_height = self.maze.height * belief_cell_size
                 belief_map_x = self.info_area_rect.left + (self.info_area_rect.width - belief_map_width) // 2; belief_map_y = current_y
-                if belief_map_width > 0 and belief_map_height > 0: temp_belief_surface = pygame.Surface((belief_map_width, belief_map_height)); self.algorithm_runner.solver.draw_belief_map(temp_belief_surface, belief_cell_size); self.screen.blit(temp_belief_surface, (belief_map_x, belief_map_y))
+                if belief_map_width > 0 and belief_map_height > 0:
+                    with self.profiler.section("spo_map"): self.algorithm_runner.solver.draw_belief_map(self.screen, belief_cell_size, (belief_map_x, belief_map_y))
 
     def _draw_controls_area(self):
         draw_rounded_rect(self.screen, DMG_SECONDARY_BG, self.controls_area_rect, UI_ROUND_RECT_RADIUS, 2, DMG_UI_BORDER); mouse_pos = pygame.mouse.get_pos()
         label_y_offset_algo = self.algo_section_label_pos[1]; label_y_offset_config = self.config_section_label_pos[1]; label_y_offset_action = self.action_section_label_pos[1]
-        self.screen.blit(self.algo_section_label["font"].render(self.algo_section_label["text"], True, self.algo_section_label["color"]), (self.algo_section_label_pos[0], label_y_offset_algo))
-        self.screen.blit(self.config_section_label["font"].render(self.config_section_label["text"], True, self.config_section_label["color"]), (self.config_section_label_pos[0], label_y_offset_config))
-        self.screen.blit(self.action_section_label["font"].render(self.action_section_label["text"], True, self.action_section_label["color"]), (self.action_section_label_pos[0], label_y_offset_action))
+        self.screen.blit(render_text(self.algo_section_label["font"], self.algo_section_label["text"], self.algo_section_label["color"]), (self.algo_section_label_pos[0], label_y_offset_algo))
+        self.screen.blit(render_text(self.config_section_label["font"], self.config_section_label["text"], self.config_section_label["color"]), (self.config_section_label_pos[0], label_y_offset_config))
+        self.screen.blit(render_text(self.action_section_label["font"], self.action_section_label["text"], self.action_section_label["color"]), (self.action_section_label_pos[0], label_y_offset_action))
         base_y_algo = self.algo_scroll_left_arrow_rect.y; arrow_color_active = DMG_LIGHT_TEXT; arrow_color_inactive = DMG_DIM_TEXT
         can_scroll_left = self.current_algo_scroll_idx > 0
         draw_rounded_rect(self.screen, DMG_UI_BUTTON_HOVER if self.algo_scroll_left_arrow_rect.collidepoint(mouse_pos) and can_scroll_left else DMG_UI_BUTTON, self.algo_scroll_left_arrow_rect, UI_ROUND_RECT_RADIUS // 2, 0)
@@ -792,6 +882,17 @@ class Game:
         draw_text(self.screen, self.controls_status_message, self.font_xs, DMG_DIM_TEXT, self.controls_status_rect.center, background_color=DMG_PANEL_SECTION_BG, padding=UI_ELEMENT_PADDING//2)
     
     def _draw_compare_results_screen(self):
+        # The screen only depends on the run history (the frame under it is a plain fill), so it is
+        # laid out and rendered once per history change and blitted as a whole afterwards
+        cache_key = (tuple(map(id, self.current_maze_run_history)), self.screen.get_size()) # Reports also live on in game_reports, so ids stay unique
+        if self._compare_screen_cache_key != cache_key:
+            self._render_compare_results_screen()
+            self._compare_screen_cache = self.screen.copy()
+            self._compare_screen_cache_key = cache_key
+        else:
+            self.screen.blit(self._compare_screen_cache, (0, 0))
+
+    def _render_compare_results_screen(self):
         overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
         overlay.fill((*DMG_DARK_BG, 245)) 
         self.screen.blit(overlay, (0,0))
@@ -880,7 +981,7 @@ class Game:
                 align_center_x = cell_rect.centerx
                 if i == 0: 
                     align_center_x = cell_rect.left + UI_PADDING
-                    text_surf = font_to_use.render(value, True, text_color)
+                    text_surf = render_text(font_to_use, value, text_color)
                     self.screen.blit(text_surf, text_surf.get_rect(midleft=(align_center_x, cell_rect.centery)))
                 else:
                     draw_text(self.screen, value, font_to_use, text_color, cell_rect.center)
@@ -955,7 +1056,7 @@ class Game:
         summary_value_color_val = DMG_LIGHT_TEXT
 
         panel_title_text = "Optimal Performers"
-        panel_title_surf = summary_panel_title_font.render(panel_title_text, True, DMG_PRIMARY_GREEN)
+        panel_title_surf = render_text(summary_panel_title_font, panel_title_text, DMG_PRIMARY_GREEN)
         panel_title_rect = panel_title_surf.get_rect(midtop=(summary_x_start_abs + summary_width_abs / 2, summary_y_current_draw))
         self.screen.blit(panel_title_surf, panel_title_rect)
         summary_y_current_draw = panel_title_rect.bottom + UI_PADDING
@@ -967,12 +1068,12 @@ class Game:
         ]
         
         for label_str, value_str in summary_items_to_draw:
-            label_surface = summary_line_font.render(label_str, True, summary_label_color_val)
+            label_surface = render_text(summary_line_font, label_str, summary_label_color_val)
             label_draw_rect = label_surface.get_rect(topleft=(summary_x_start_abs + summary_padding_horiz_val, summary_y_current_draw))
             self.screen.blit(label_surface, label_draw_rect)
             summary_y_current_draw += label_surface.get_height() * 0.9 
 
-            value_surface = summary_line_font.render(value_str, True, summary_value_color_val)
+            value_surface = render_text(summary_line_font, value_str, summary_value_color_val)
             max_value_width = summary_width_abs - (summary_padding_horiz_val * 2) - 15 
             
             if value_surface.get_width() > max_value_width:
@@ -989,7 +1090,7 @@ class Game:
                 if current_line_text: lines_to_render.append(current_line_text)
 
                 for i, line_text_to_render in enumerate(lines_to_render):
-                    line_surf = summary_line_font.render(line_text_to_render, True, summary_value_color_val)
+                    line_surf = render_text(summary_line_font, line_text_to_render, summary_value_color_val)
                     indent_val = summary_padding_horiz_val + 15
                     self.screen.blit(line_surf, (summary_x_start_abs + indent_val, summary_y_current_draw))
                     summary_y_current_draw += line_surf.get_height() * 0.95 
@@ -1019,34 +1120,86 @@ class Game:
                 found_color = DMG_ACCENT_GREEN if report_to_show.get('path_found') else DMG_WARN_TEXT; lines.append((f"Path Found:", "Yes" if report_to_show.get('path_found') else "No", found_color))
                 if report_to_show.get('path_found'): lines.append((f"Cost:", report_to_show.get('cost', 'N/A'), DMG_LIGHT_TEXT)); lines.append((f"Steps:", report_to_show.get('steps', 'N/A'), DMG_LIGHT_TEXT))
                 lines.append((f"Nodes Explored:", report_to_show.get('nodes_expanded', 'N/A'), DMG_LIGHT_TEXT))
+                if report_to_show.get('cells_pruned'): lines.append((f"Dead-End Cells Pruned:", report_to_show['cells_pruned'], DMG_LIGHT_TEXT))
             for key_text, val_text, val_color in lines:
-                key_surf = self.font_m.render(key_text, True, DMG_LIGHT_TEXT); val_surf = self.font_m.render(str(val_text), True, val_color); total_width = key_surf.get_width() + val_surf.get_width() + UI_ELEMENT_PADDING; start_x = (self.screen.get_width() - total_width) // 2
+                key_surf = render_text(self.font_m, key_text, DMG_LIGHT_TEXT); val_surf = render_text(self.font_m, str(val_text), val_color); total_width = key_surf.get_width() + val_surf.get_width() + UI_ELEMENT_PADDING; start_x = (self.screen.get_width() - total_width) // 2
                 self.screen.blit(key_surf, (start_x, current_y_report)); self.screen.blit(val_surf, (start_x + key_surf.get_width() + UI_ELEMENT_PADDING, current_y_report)); current_y_report += self.font_m.get_height() + UI_ELEMENT_PADDING // 2
         draw_text(self.screen, "Press ENTER or SPACE to Continue", self.font_s, DMG_DIM_TEXT, (self.screen.get_width()//2, self.screen.get_height() - UI_PADDING * 3))
 
+    def _is_idle(self):
+        """True when frames only change in response to input: the config and compare screens with nothing in motion."""
+        return self.game_state in ("IDLE_CONFIG", "COMPARING_RESULTS") and not (self.fading_in or self.fading_out or self.profiler.visible)
+
+    def _maze_view(self):
+        return (id(self.maze), getattr(self.maze, 'version', None), self.camera.offset, self.camera.cell_size)
+
     def _main_draw_call(self):
+        full = (self._needs_full_redraw or self.game_state != self._drawn_state or self.controls_status_message != self._drawn_status_message
+                or self.fading_in or self.fading_out or self.profiler.visible or self.game_state.startswith("OUTCOME_"))
+        if full: self._draw_full_frame()
+        else: self._draw_changed_regions()
+        self._needs_full_redraw = False
+        self._drawn_state = self.game_state
+        self._drawn_status_message = self.controls_status_message
+        self._drawn_maze_view = self._maze_view()
+        self._maze_animated = False
+
+    def _draw_changed_regions(self):
+        """
+        Repaints just the panels that can change without input (the maze view and, while playing, the
+        stats) and pushes those rectangles to the display. Panels are cleared to the screen background
+        and layered as in a full frame, so the result matches a full redraw.
+        """
+        section = self.profiler.section
+        playing = self.game_state.startswith("PLAYING_")
+        dirty = []
+        if self.game_state != "COMPARING_RESULTS" and (playing or self._maze_animated or self._maze_view() != self._drawn_maze_view):
+            # The render surface can reach past the panel border into the controls panel, which full frames draw on top of it
+            rect = self.maze_area_rect.inflate(4,4).union(self.maze_render_surface.get_rect(topleft=self.maze_area_rect.topleft)); self.screen.fill(DMG_DARK_BG, rect)
+            with section("maze"): self._draw_maze_area()
+            dirty.append(rect)
+            if rect.colliderect(self.controls_area_rect):
+                with section("controls"): self._draw_controls_area()
+                dirty.append(self.controls_area_rect)
+        if playing:
+            self.screen.fill(DMG_DARK_BG, self.info_area_rect)
+            with section("info"): self._draw_info_area()
+            dirty.append(self.info_area_rect)
+        if dirty:
+            with section("flip"): pygame.display.update(dirty)
+
+    def _draw_full_frame(self):
+        section = self.profiler.section
         self.screen.fill(DMG_DARK_BG)
         if self.game_state != "COMPARING_RESULTS":
-            self._draw_maze_area()
-            self._draw_info_area()
-            self._draw_controls_area()
+            with section("maze"): self._draw_maze_area()
+            with section("info"): self._draw_info_area()
+            with section("controls"): self._draw_controls_area()
 
         if self.game_state == "COMPARING_RESULTS": 
-            self._draw_compare_results_screen()
+            with section("compare"): self._draw_compare_results_screen()
         elif self.game_state == "OUTCOME_PLAYER_WIN": 
-            self._draw_outcome_screen("Player Escaped!", DMG_ACCENT_GREEN)
+            with section("outcome"): self._draw_outcome_screen("Player Escaped!", DMG_ACCENT_GREEN)
         elif self.game_state == "OUTCOME_ALGORITHM_WIN": 
             algo_name_disp = self.algorithm_runner.name if self.algorithm_runner else 'Algorithm'
-            self._draw_outcome_screen(f"{algo_name_disp} Found Exit!", DMG_ACCENT_GREEN)
+            with section("outcome"): self._draw_outcome_screen(f"{algo_name_disp} Found Exit!", DMG_ACCENT_GREEN)
         elif self.game_state == "OUTCOME_ALGORITHM_FAIL": 
             algo_name_disp = self.algorithm_runner.name if self.algorithm_runner else 'Algorithm'
-            self._draw_outcome_screen(f"{algo_name_disp} Failed!", DMG_WARN_TEXT)
+            with section("outcome"): self._draw_outcome_screen(f"{algo_name_disp} Failed!", DMG_WARN_TEXT)
         
         if self.fading_out or self.fading_in: 
-            self.transition_surface.set_alpha(self.transition_alpha)
-            self.screen.blit(self.transition_surface, (0,0))
-        
-        pygame.display.flip()
+            with section("fade"):
+                self.transition_surface.set_alpha(self.transition_alpha)
+                self.screen.blit(self.transition_surface, (0,0))
+
+        with section("hud"): self.profiler.draw(self.screen, (self.maze_area_rect.left + UI_PADDING, self.maze_area_rect.top + UI_PADDING), self.font_profiler)
+        with section("flip"): pygame.display.flip()
+
+    def _export_profile(self):
+        for filename in PROFILER_EXPORT_FILENAMES:
+            try:
+                self.profiler.export(filename); print(f"Frame profile written to {filename} ({len(self.profiler.recorded)} frames).")
+            except OSError as e: print(f"Error writing frame profile '{filename}': {e}", file=sys.stderr)
 
     def _append_report_to_file(self, report_data_dict):
         if not report_data_dict: return
@@ -1060,6 +1213,7 @@ class Game:
                     found = 'Yes' if report_data_dict.get('path_found') else 'No'; f.write(f"    Path Found: {found}\n")
                     if report_data_dict.get('path_found'): f.write(f"    Path Cost: {report_data_dict.get('cost', 'N/A')}\n    Path Steps: {report_data_dict.get('steps', 'N/A')}\n")
                     f.write(f"    Nodes Expanded: {report_data_dict.get('nodes_expanded', 'N/A')}\n")
+                    if report_data_dict.get('cells_pruned'): f.write(f"    Dead-End Cells Pruned: {report_data_dict['cells_pruned']}\n")
                 f.write(f"--- End Run Entry ---\n")
         except Exception as e: print(f"Error writing report: {e}", file=sys.stderr); traceback.print_exc()
 
@@ -1070,12 +1224,19 @@ class Game:
         self._manage_music_transition(self.game_state, None)
 
         while self.running:
+            if self._is_idle():
+                # Sleep until input arrives (or IDLE_FPS allows a look at portal animations), then put the event back for _handle_input
+                event = pygame.event.wait(1000 // IDLE_FPS)
+                if event.type != pygame.NOEVENT: pygame.event.post(event)
             dt = self.clock.tick(FPS) / 1000.0
-            self._handle_input()
-            self._main_update_loop(dt)
+            self.profiler.begin_frame()
+            with self.profiler.section("input"): self._handle_input()
+            with self.profiler.section("update"): self._main_update_loop(dt)
             self._main_draw_call()
+            self.profiler.end_frame()
             
         print("Exiting game gracefully...");
+        if self.profiler.recording: self._export_profile()
         if pygame.mixer.get_init():
             pygame.mixer.music.stop() #
             pygame.mixer.quit()
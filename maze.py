@@ -1,25 +1,40 @@
-import pygame
 import random
-import os
-import sys
+import hashlib
+import struct
+from collections import deque
 from constants import (
-    WALL_COLOR, PATH_COLOR, EXIT_COLOR, KEY_COLOR, MUD_COLOR, WATER_COLOR, PORTAL_COLORS_FALLBACK,
-    CELL_SIZE, FALLBACK_IMAGE_COLOR, IMAGE_FOLDER, 
-    EXIT_IMAGE_FILENAME, KEY_IMAGE_FILENAME, MUD_IMAGE_FILENAME, WATER_IMAGE_FILENAME,
-    PATH_IMAGE_FILENAME, PORTAL_IMAGE_PREFIX,
+    PORTAL_COLORS_FALLBACK,
     MIN_SLIDE_LENGTH, MAX_SLIDE_LENGTH, MAX_PORTAL_PAIRS,
-    MUD_COST_ALGO, PORTAL_COST_ALGO, SLIDE_CELL_COST_ALGO,
-    PORTAL_ANIMATION_SPEED, MAX_PORTAL_ANIMATION_FRAMES,
-    DMG_PRIMARY_GREEN, DMG_DARK_BG, DMG_ACCENT_GREEN # Theme colors for fallbacks
+    MUD_COST_ALGO, PORTAL_COST_ALGO, SLIDE_CELL_COST_ALGO, MAZE_JOURNAL_MAX_ENTRIES,
 )
-from utils import load_scaled_image
+from maze_grid import MazeGrid, FreeCellIndex, CELL_WALL, CELL_MUD, CELL_WATER, CELL_PORTAL, CELL_KEY
+from transitions import build_transition_table
+from reachability import build_reachability
+from corridors import build_corridor_graph
+from dead_ends import fill_dead_ends
+from maze_generator import carve_maze
+
+# Kinds of Maze journal entries: (version, kind, (x, y))
+CHANGE_KEY_REMOVED = 'key_removed'
+CHANGE_WALL = 'wall'
+CHANGE_MUD = 'mud'
+CHANGE_WATER = 'water'
 
 class Maze:
-    def __init__(self, width, height, cell_size, num_keys, num_puddles, num_slides, num_portal_pairs, loop_chance=0.1):
+    """
+    Pure grid/terrain model: generation, feature placement and the queries solvers and the player use.
+    Everything pygame lives in maze_renderer.MazeRenderer, created (and textures loaded) on the first draw().
+    """
+    def __init__(self, width, height, cell_size, num_keys, num_puddles, num_slides, num_portal_pairs, loop_chance=0.1, seed=None):
         self.width = width
         self.height = height
         self.cell_size = cell_size
         self.loop_chance = loop_chance
+        # Every generation/placement draw comes from self.rng; without a seed one is drawn from the
+        # global `random` so the maze can still be reproduced from self.seed
+        if seed is None: seed = random.getrandbits(32)
+        self.seed = seed
+        self.rng = random.Random(seed)
         self.num_keys_target = num_keys
         self.num_puddles_target = num_puddles
         self.num_slides_target = num_slides
@@ -34,7 +49,9 @@ class Maze:
             if self.start_pos == self.exit_pos: # Still same? Try moving Y
                  self.exit_pos = (self.exit_pos[0], max(1, exit_y - 2 if exit_y - 2 > 0 else exit_y + (0 if exit_y > 1 else 1)))
 
-        self.maze_data = self._generate_maze()
+        self.grid = MazeGrid(width, height)
+        self._maze_data = None # List-of-lists snapshot, materialized on demand by the maze_data property
+        self._generate_maze()
 
         self.keys = []
         self.mud_puddles = set()
@@ -42,154 +59,130 @@ class Maze:
         self.portals = {} 
         self.portal_locations = set()
 
-        self.portal_pair_frames = {} 
-        self.portal_pair_use_texture = {} 
-        self.portal_animation_timer = 0.0
-        self.portal_current_frame_index = 0
-        self.min_loaded_portal_frames = 0 
-
         self.MUD_COST_FOR_ALGORITHM = MUD_COST_ALGO
         self.PORTAL_COST_FOR_ALGORITHM = PORTAL_COST_ALGO
         self.SLIDE_CELL_COST_FOR_ALGORITHM = SLIDE_CELL_COST_ALGO
 
+        # Inner path cells still free for features; every placement below removes what it takes
+        self.free_cells = FreeCellIndex.from_grid(self.grid, exclude=(self.start_pos, self.exit_pos))
+        self._transition_table = None # Built on first use by get_transition_table()
+        self._reachability = None # Built on first use by get_reachability()
+        self._corridor_graph = None # Built on first use by get_corridor_graph()
+        self._dead_end_mask = None # Built on first use by get_dead_end_mask()
         self.actual_num_slides = self._place_slides(self.num_slides_target)
         self.actual_num_portal_pairs = self._place_portals(self.num_portal_pairs_target)
-        self._load_portal_animations() 
+        # Terrain flags that back is_wall/is_mud/is_water/is_portal/is_key; slides and portals go
+        # first since they are all that decides where the agent can go
+        self.grid.add_features(water_cells=self.water_cells, portals=self.portals)
+        self._keep_exit_reachable()
         self.actual_num_keys = self._place_keys(self.num_keys_target)
         self.actual_num_puddles = self._place_puddles(self.num_puddles_target)
+        self.free_cells = None # Only needed during placement
+        self.grid.add_features(self.keys, self.mud_puddles)
+        if self._transition_table is not None: # Built for placement; only mud changed costs since
+            for x, y in self.mud_puddles: self._transition_table.add_entry_cost(x, y, self.MUD_COST_FOR_ALGORITHM - 1)
+        self._fingerprint = None
+        # Bumped by every mutation; consumers remember the version they built from and ask changes_since()
+        self.version = 0
+        self.journal = deque(maxlen=MAZE_JOURNAL_MAX_ENTRIES)
+
+        self._renderer = None # maze_renderer.MazeRenderer, created by the first draw()
+
+    @classmethod
+    def from_grid(cls, grid, cell_size, start_pos, exit_pos, keys=(), portal_pairs=(),
+                  num_slides=0, loop_chance=0.1, seed=None, targets=None):
+        """
+        Builds a Maze around an existing MazeGrid (e.g. one loaded by maze_io) without generating anything.
+        Mud and water come from the grid flags; keys keep the given order; portal_pairs[i] is
+        ((x1, y1), (x2, y2)) for pair_id i. targets optionally restores the requested
+        (keys, puddles, slides, portal pairs) counts.
+        """
+        maze = cls.__new__(cls)
+        maze._init_from_grid(grid, cell_size, start_pos, exit_pos, keys, portal_pairs, num_slides, loop_chance, seed, targets)
+        return maze
+
+    def _init_from_grid(self, grid, cell_size, start_pos, exit_pos, keys=(), portal_pairs=(),
+                        num_slides=0, loop_chance=0.1, seed=None, targets=None):
+        self.width, self.height = grid.width, grid.height
+        self.cell_size = cell_size
+        self.loop_chance = loop_chance
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.start_pos = tuple(start_pos)
+        self.exit_pos = tuple(exit_pos)
+        self.grid = grid
+        self._maze_data = None
+
+        flags_view, _ = grid.as_numpy()
+        self.mud_puddles = set(grid.pos(int(i)) for i in (flags_view.reshape(-1) & CELL_MUD).nonzero()[0])
+        self.water_cells = set(grid.pos(int(i)) for i in (flags_view.reshape(-1) & CELL_WATER).nonzero()[0])
+        self.keys = [tuple(pos) for pos in keys]
+        self.portals = {}
+        self.portal_locations = set()
+        for pair_id, (pos1, pos2) in enumerate(portal_pairs):
+            pos1, pos2 = tuple(pos1), tuple(pos2)
+            portal_data = {'pair_id': pair_id, 'color': PORTAL_COLORS_FALLBACK[pair_id % len(PORTAL_COLORS_FALLBACK)]}
+            self.portals[pos1] = {**portal_data, 'target': pos2}
+            self.portals[pos2] = {**portal_data, 'target': pos1}
+            self.portal_locations.update((pos1, pos2))
+        grid.add_features(keys=self.keys, portals=self.portals)
+
+        self.MUD_COST_FOR_ALGORITHM = MUD_COST_ALGO
+        self.PORTAL_COST_FOR_ALGORITHM = PORTAL_COST_ALGO
+        self.SLIDE_CELL_COST_FOR_ALGORITHM = SLIDE_CELL_COST_ALGO
+
+        self.actual_num_keys = len(self.keys)
+        self.actual_num_puddles = len(self.mud_puddles)
+        self.actual_num_slides = num_slides
+        self.actual_num_portal_pairs = len(portal_pairs)
+        targets = targets or (self.actual_num_keys, self.actual_num_puddles, num_slides, self.actual_num_portal_pairs)
+        self.num_keys_target, self.num_puddles_target, self.num_slides_target, self.num_portal_pairs_target = targets
 
-        # Load images (or their fallbacks)
-        self.exit_img = load_scaled_image(EXIT_IMAGE_FILENAME, self.cell_size)
-        self.key_img = load_scaled_image(KEY_IMAGE_FILENAME, int(self.cell_size * 0.85)) 
-        self.mud_img = load_scaled_image(MUD_IMAGE_FILENAME, self.cell_size)
-        self.water_img = load_scaled_image(WATER_IMAGE_FILENAME, self.cell_size)
-        self.path_img = load_scaled_image(PATH_IMAGE_FILENAME, self.cell_size)
-
-        # Flags to determine if actual textures should be used or fallbacks
-        self.use_exit_texture = self.exit_img.get_at((0,0)) != pygame.Color(FALLBACK_IMAGE_COLOR)
-        self.use_key_texture = self.key_img.get_at((0,0)) != pygame.Color(FALLBACK_IMAGE_COLOR)
-        self.use_mud_texture = self.mud_img.get_at((0,0)) != pygame.Color(FALLBACK_IMAGE_COLOR)
-        self.use_water_texture = self.water_img.get_at((0,0)) != pygame.Color(FALLBACK_IMAGE_COLOR)
-        
-        # Path texture usage check (more robust)
-        is_path_fallback = self.path_img.get_at((0,0)) == pygame.Color(FALLBACK_IMAGE_COLOR)
-        path_file_exists = os.path.exists(os.path.join(IMAGE_FOLDER, PATH_IMAGE_FILENAME))
-        if is_path_fallback and not path_file_exists: # File genuinely missing
-            self.use_path_texture = False
-        elif is_path_fallback and path_file_exists: # File exists but loaded as fallback (error)
-            print(f"W: Path texture '{PATH_IMAGE_FILENAME}' loaded as fallback (load error), disabling texture.", file=sys.stderr)
-            self.use_path_texture = False
-        else: # Loaded successfully
-            self.use_path_texture = True
+        self._transition_table = None
+        self._reachability = None
+        self._corridor_graph = None
+        self._dead_end_mask = None
+        self._fingerprint = None
+        self.version = 0
+        self.journal = deque(maxlen=MAZE_JOURNAL_MAX_ENTRIES)
+        self._renderer = None
 
 
     def _generate_maze(self):
-        maze = [[1 for _ in range(self.width)] for _ in range(self.height)]
-        if self.width <= 2 or self.height <= 2: return maze # Basic border for tiny mazes
-        
-        def is_valid_carve_pos(x, y): # Check if within inner maze boundaries for carving
-            return 1 <= x < self.width - 1 and 1 <= y < self.height - 1
-
-        def carve(x, y):
-            maze[y][x] = 0 # Carve path
-            directions = [(0, 2), (2, 0), (0, -2), (-2, 0)] # N, E, S, W (jumping 2 cells)
-            random.shuffle(directions)
-            for dx, dy in directions:
-                next_x, next_y = x + dx, y + dy
-                if is_valid_carve_pos(next_x, next_y) and maze[next_y][next_x] == 1: # If next cell is wall
-                    maze[y + dy // 2][x + dx // 2] = 0 # Carve wall in between
-                    carve(next_x, next_y)
-        
-        carve(self.start_pos[0], self.start_pos[1]) # Start carving from start_pos
-
-        # Add loops based on loop_chance
-        for y_loop in range(1, self.height - 1, 2): # Iterate over potential path cells
-            for x_loop in range(1, self.width - 1, 2):
-                if maze[y_loop][x_loop] == 0 and random.random() < self.loop_chance: # If it's a path and chance met
-                    potential_walls_to_break = []
-                    # Check adjacent walls that could be broken to form a loop with another path cell
-                    # Check North wall (if it leads to another path cell)
-                    if y_loop > 1 and maze[y_loop - 1][x_loop] == 1 and y_loop - 2 > 0 and maze[y_loop-2][x_loop] == 0:
-                        potential_walls_to_break.append((x_loop, y_loop - 1))
-                    # Check South wall
-                    if y_loop < self.height - 2 and maze[y_loop + 1][x_loop] == 1 and y_loop + 2 < self.height -1 and maze[y_loop+2][x_loop] == 0:
-                        potential_walls_to_break.append((x_loop, y_loop + 1))
-                    # Check West wall
-                    if x_loop > 1 and maze[y_loop][x_loop - 1] == 1 and x_loop - 2 > 0 and maze[y_loop][x_loop-2] == 0:
-                        potential_walls_to_break.append((x_loop - 1, y_loop))
-                    # Check East wall
-                    if x_loop < self.width - 2 and maze[y_loop][x_loop + 1] == 1 and x_loop + 2 < self.width -1 and maze[y_loop][x_loop+2] == 0:
-                        potential_walls_to_break.append((x_loop + 1, y_loop))
-                    
-                    if potential_walls_to_break:
-                        wall_x, wall_y = random.choice(potential_walls_to_break)
-                        maze[wall_y][wall_x] = 0 # Break the wall to create a loop
-        
-        # Ensure exit is a path cell (it might be a wall if not carved to)
-        if 0 <= self.exit_pos[1] < self.height and 0 <= self.exit_pos[0] < self.width:
-            maze[self.exit_pos[1]][self.exit_pos[0]] = 0 
-
-        # Ensure exit is accessible from at least one adjacent path cell
-        ex, ey = self.exit_pos
-        can_reach_exit = False; open_candidates = []
-        for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]: # Check N, S, W, E neighbors
-            nx, ny = ex + dx, ey + dy
-            if is_valid_carve_pos(nx,ny): # Check if neighbor is within valid carving area
-                if maze[ny][nx] == 0: can_reach_exit = True; break # Already connected
-                elif maze[ny][nx] == 1 : open_candidates.append((nx, ny)) # Potential wall to open
-        
-        if not can_reach_exit and open_candidates: # If exit is walled off, open one wall
-            open_x, open_y = random.choice(open_candidates)
-            maze[open_y][open_x] = 0
-        elif not can_reach_exit and not open_candidates:
-             # This is an edge case: exit is on border and surrounded by border, or maze is too small.
-             # Might happen if exit_pos is (0,y), (x,0) etc. and maze generation didn't reach it.
-             # For now, accept it; pathfinders should fail gracefully.
-            # print(f"W: Exit at {self.exit_pos} might be completely inaccessible.", file=sys.stderr)
-            pass
-        return maze
+        # Walls live in the grid's flag bytes (CELL_WALL == 1), carved in place without recursion
+        carve_maze(self.grid.flags, self.width, self.height, self.start_pos, self.exit_pos, self.loop_chance, self.rng)
 
-    def _get_valid_placement_spots(self, exclude_additional=None):
-        spots = []
-        excluded = {self.start_pos, self.exit_pos}
-        if exclude_additional:
-            for item_set in exclude_additional: # exclude_additional is a list of sets
-                excluded.update(item_set)
-
-        for y in range(1, self.height - 1):
-            for x in range(1, self.width - 1):
-                pos = (x, y)
-                if self.maze_data[y][x] == 0 and pos not in excluded:
-                    spots.append(pos)
-        random.shuffle(spots) # Shuffle to make placement more random
-        return spots
+    @property
+    def maze_data(self):
+        """Row lists of 1 (wall) / 0 (path), kept for code that predates the flat grid."""
+        if self._maze_data is None:
+            flags, width = self.grid.flags, self.width
+            self._maze_data = [[1 if flags[y * width + x] & CELL_WALL else 0 for x in range(width)] for y in range(self.height)]
+        return self._maze_data
 
     def _place_slides(self, target_num):
+        self._slides = [] # Cells of each placed slide, in placement order
         placed_count = 0; attempts = 0; max_attempts = 50 * target_num + 30
         while placed_count < target_num and attempts < max_attempts:
             attempts += 1
-            valid_starts = self._get_valid_placement_spots(exclude_additional=[self.water_cells, self.portal_locations])
-            if not valid_starts: break
+            if not self.free_cells: break
 
-            start_x, start_y = random.choice(valid_starts)
-            direction = random.choice([(1,0),(-1,0),(0,1),(0,-1)])
-            length = random.randint(MIN_SLIDE_LENGTH, MAX_SLIDE_LENGTH)
+            start_x, start_y = self.free_cells.choice(self.rng)
+            direction = self.rng.choice([(1,0),(-1,0),(0,1),(0,-1)])
+            length = self.rng.randint(MIN_SLIDE_LENGTH, MAX_SLIDE_LENGTH)
             
             current_slide_cells = []
             possible = True
             for i in range(length):
-                cx, cy = start_x + direction[0]*i, start_y + direction[1]*i
-                pos = (cx,cy)
-                if not (1 <= cx < self.width-1 and 1 <= cy < self.height-1) or \
-                   self.maze_data[cy][cx] == 1 or \
-                   pos in self.water_cells or \
-                   pos in self.portal_locations or \
-                   pos == self.start_pos or pos == self.exit_pos: # Avoid start/exit for slides
+                pos = (start_x + direction[0]*i, start_y + direction[1]*i)
+                if pos not in self.free_cells: # Wall, border, start/exit or already water/portal
                     possible = False; break
                 current_slide_cells.append(pos)
             
             if possible and len(current_slide_cells) >= MIN_SLIDE_LENGTH:
                 self.water_cells.update(current_slide_cells)
+                self._slides.append(current_slide_cells)
+                for pos in current_slide_cells: self.free_cells.discard(pos)
                 placed_count += 1
         return placed_count
 
@@ -199,10 +192,9 @@ class Maze:
 
         for pair_id in range(target_num_pairs):
             for _ in range(30): # More attempts to find pairs
-                valid_spots = self._get_valid_placement_spots(exclude_additional=[self.water_cells, self.portal_locations])
-                if len(valid_spots) < 2: break 
+                if len(self.free_cells) < 2: break 
 
-                pos1, pos2 = random.sample(valid_spots, 2)
+                pos1, pos2 = self.free_cells.sample(self.rng, 2)
                 
                 # Ensure portals are not too close (e.g., Manhattan distance > 2)
                 if abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1]) > 2 :
@@ -214,6 +206,8 @@ class Maze:
                     self.portals[pos2] = {**portal_data, 'target': pos1}
                     self.portal_locations.add(pos1)
                     self.portal_locations.add(pos2)
+                    self.free_cells.discard(pos1)
+                    self.free_cells.discard(pos2)
                     placed_pairs += 1
                     break 
             else: 
@@ -221,164 +215,185 @@ class Maze:
                 pass
         return placed_pairs
 
-    def _load_portal_animations(self):
-        if self.actual_num_portal_pairs == 0:
-            self.min_loaded_portal_frames = 0
-            return
-
-        min_frames_for_any_animated_pair = MAX_PORTAL_ANIMATION_FRAMES 
-
-        for pair_id in range(self.actual_num_portal_pairs):
-            frames = []
-            use_texture_for_this_pair = True 
-            for frame_idx in range(MAX_PORTAL_ANIMATION_FRAMES):
-                filename = f"{PORTAL_IMAGE_PREFIX}{pair_id}_{frame_idx}.png"
-                image_path_check = os.path.join(IMAGE_FOLDER, filename)
-                
-                img = load_scaled_image(filename, self.cell_size)
-                is_fallback = img.get_at((0,0)) == pygame.Color(FALLBACK_IMAGE_COLOR)
-                
-                if is_fallback and not os.path.exists(image_path_check):
-                    if frame_idx == 0: use_texture_for_this_pair = False # Missing first frame, fallback for pair
-                    # print(f"I: Portal anim '{filename}' not found. Sequence for pair {pair_id} may be shorter or fallback.", file=sys.stderr)
-                    break 
-                elif is_fallback and os.path.exists(image_path_check):
-                    print(f"W: Portal animation frame '{filename}' failed to load (file exists). Falling back to color for pair {pair_id}.", file=sys.stderr)
-                    use_texture_for_this_pair = False
-                    frames.clear(); break
-                frames.append(img)
-
-            self.portal_pair_frames[pair_id] = frames
-            self.portal_pair_use_texture[pair_id] = use_texture_for_this_pair and bool(frames)
-
-            if use_texture_for_this_pair and frames:
-                min_frames_for_any_animated_pair = min(min_frames_for_any_animated_pair, len(frames))
-            elif not frames : self.portal_pair_use_texture[pair_id] = False
-
-        if all(not self.portal_pair_use_texture.get(pid, False) for pid in range(self.actual_num_portal_pairs)):
-             self.min_loaded_portal_frames = 0
-        elif self.actual_num_portal_pairs > 0 :
-            valid_frame_counts = [len(self.portal_pair_frames[pid]) 
-                                  for pid in range(self.actual_num_portal_pairs) 
-                                  if self.portal_pair_use_texture.get(pid) and self.portal_pair_frames.get(pid)]
-            if valid_frame_counts: self.min_loaded_portal_frames = min(valid_frame_counts)
-            else: self.min_loaded_portal_frames = 0
-        else: self.min_loaded_portal_frames = 0
-
+    def _is_directed(self):
+        # A carved maze without slides or portals is undirected and connected, so every cell is reachable
+        return bool(self.water_cells or self.portals)
+
+    def _keep_exit_reachable(self):
+        """Drops the most recently placed slides until the exit can be reached from the start again."""
+        if not self._is_directed(): return
+        while self._slides and not self.is_reachable(self.start_pos, self.exit_pos):
+            for x, y in self._slides.pop():
+                self.water_cells.discard((x, y))
+                self.grid.clear_flag(x, y, CELL_WATER)
+            self.actual_num_slides -= 1
+            self._transition_table = None
+            self._reachability = None
 
     def _place_keys(self, target_num):
-        valid_spots = self._get_valid_placement_spots(exclude_additional=[self.water_cells, self.portal_locations])
-        num_to_place = min(target_num, len(valid_spots))
-        if num_to_place > 0: self.keys = random.sample(valid_spots, num_to_place)
-        else: self.keys = []
+        reachability = self.get_reachability() if self._is_directed() else None
+        if reachability is not None:
+            # Only cells on some start -> cell -> exit route can hold a key
+            for i in reachability.cells_off_route(self.start_pos, self.exit_pos, self.free_cells.cells):
+                self.free_cells.discard(self.grid.pos(i))
+        num_to_place = min(target_num, len(self.free_cells))
+        self.keys = self.free_cells.sample(self.rng, num_to_place) if num_to_place > 0 else []
+        if reachability is not None:
+            # All keys must lie on one route: each pair has to be reachable one way or the other
+            chain = []
+            for pos in self.keys:
+                if all(reachability.is_reachable(pos, other) or reachability.is_reachable(other, pos) for other in chain):
+                    chain.append(pos)
+            self.keys = chain
+        for pos in self.keys: self.free_cells.discard(pos)
         return len(self.keys)
 
     def _place_puddles(self, target_num):
-        valid_spots = self._get_valid_placement_spots(exclude_additional=[set(self.keys), self.water_cells, self.portal_locations])
-        num_to_place = min(target_num, len(valid_spots))
-        if num_to_place > 0: self.mud_puddles = set(random.sample(valid_spots, num_to_place))
-        else: self.mud_puddles = set()
+        num_to_place = min(target_num, len(self.free_cells))
+        self.mud_puddles = set(self.free_cells.sample(self.rng, num_to_place)) if num_to_place > 0 else set()
+        for pos in self.mud_puddles: self.free_cells.discard(pos)
         return len(self.mud_puddles)
 
     def is_wall(self, x, y):
-        return not (0 <= x < self.width and 0 <= y < self.height) or self.maze_data[y][x] == 1
-    
-    def is_key(self, x, y): return (x,y) in self.keys
-    def is_mud(self, x, y): return (x,y) in self.mud_puddles
-    def is_water(self, x, y): return (x,y) in self.water_cells
-    def is_portal(self, x, y): return (x,y) in self.portal_locations
-    def get_portal_target(self, x, y): return self.portals.get((x,y), {}).get('target')
+        return not (0 <= x < self.width and 0 <= y < self.height) or self.grid.flags[y * self.width + x] & CELL_WALL != 0
+
+    def is_key(self, x, y): return 0 <= x < self.width and 0 <= y < self.height and self.grid.flags[y * self.width + x] & CELL_KEY != 0
+    def is_mud(self, x, y): return 0 <= x < self.width and 0 <= y < self.height and self.grid.flags[y * self.width + x] & CELL_MUD != 0
+    def is_water(self, x, y): return 0 <= x < self.width and 0 <= y < self.height and self.grid.flags[y * self.width + x] & CELL_WATER != 0
+    def is_portal(self, x, y): return 0 <= x < self.width and 0 <= y < self.height and self.grid.flags[y * self.width + x] & CELL_PORTAL != 0
+    def get_portal_target(self, x, y):
+        if not self.is_portal(x, y): return None
+        return self.grid.get_portal_target(x, y)
+
+    def get_transition_table(self):
+        """CSR table of every move (slides and portals resolved), shared by all solvers of this maze."""
+        if self._transition_table is None:
+            self._transition_table = build_transition_table(self)
+        return self._transition_table
+
+    def get_reachability(self):
+        """reachability.ReachabilityIndex over the transition table; survives mud and key changes."""
+        if self._reachability is None:
+            self._reachability = build_reachability(self)
+        return self._reachability
+
+    def get_corridor_graph(self):
+        """corridors.CorridorGraph of the transition table with start, exit and keys kept as nodes."""
+        if self._corridor_graph is None:
+            self._corridor_graph = build_corridor_graph(self, (self.start_pos, self.exit_pos, *self.keys))
+        return self._corridor_graph
+
+    def get_dead_end_mask(self):
+        """dead_ends.fill_dead_ends with start, exit and keys kept: 1 per flat cell index no route between them needs."""
+        if self._dead_end_mask is None:
+            self._dead_end_mask = fill_dead_ends(self, (self.start_pos, self.exit_pos, *self.keys))
+        return self._dead_end_mask
+
+    def is_reachable(self, from_pos, to_pos):
+        return self.get_reachability().is_reachable(from_pos, to_pos)
+
+    def fingerprint(self):
+        """Stable SHA-256 hex digest of the maze content: size, start/exit, terrain flags and portal links."""
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            digest.update(struct.pack('<6i', self.width, self.height, *self.start_pos, *self.exit_pos))
+            digest.update(self.grid.flags)
+            for pos in sorted(self.portal_locations):
+                digest.update(struct.pack('<4i', *pos, *self.portals[pos]['target']))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def _record_change(self, kind, pos, affects_moves):
+        self.version += 1
+        self.journal.append((self.version, kind, pos))
+        self._fingerprint = None
+        if kind == CHANGE_MUD: self._corridor_graph = None # set_mud patched the table's costs; corridor edges sum them
+        elif affects_moves: self._transition_table = self._corridor_graph = None # Walls and water reroute slides far away, so rebuild rather than patch
+        if kind in (CHANGE_WALL, CHANGE_WATER): self._reachability = self._dead_end_mask = None # Mud only changes costs
+
+    def changes_since(self, version):
+        """
+        Journal entries (version, kind, (x, y)) recorded after `version`, oldest first, or None when
+        the journal no longer reaches back that far and the caller has to rebuild from scratch.
+        """
+        if version >= self.version: return []
+        if not self.journal or self.journal[0][0] > version + 1: return None
+        return [entry for entry in self.journal if entry[0] > version]
 
     def remove_key(self, x, y):
         key_pos = (x, y)
         if key_pos in self.keys: 
             self.keys.remove(key_pos)
+            self.grid.clear_flag(x, y, CELL_KEY)
+            self._record_change(CHANGE_KEY_REMOVED, key_pos, affects_moves=False)
             return True
         return False
 
+    def _check_editable(self, x, y):
+        """Raises ValueError for positions off the grid: the flat index would land on some other cell."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise ValueError(f"Position ({x}, {y}) is outside the {self.width}x{self.height} maze")
+
+    def _check_terrain_target(self, x, y, terrain):
+        """
+        Raises ValueError unless (x, y) can take `terrain`: the start, the exit, keys and portals are
+        referenced by position elsewhere (and must stay standable), and mud or water on a wall would
+        leave a cell that is both.
+        """
+        if (x, y) in (self.start_pos, self.exit_pos) or (x, y) in self.keys or (x, y) in self.portals:
+            raise ValueError(f"Cannot put {terrain} on ({x}, {y}): it is the start, the exit, a key or a portal")
+        if terrain != "a wall" and self.is_wall(x, y):
+            raise ValueError(f"Cannot put {terrain} on ({x}, {y}): it is a wall")
+
+    def set_wall(self, x, y, is_wall=True):
+        """
+        Turns an inner cell into a wall or opens it up. Start, exit, keys and portals cannot be
+        walled in: keys/portals would keep pointing at them and no solver could finish.
+        """
+        self._check_editable(x, y)
+        if self.is_wall(x, y) == is_wall: return False
+        if is_wall: self._check_terrain_target(x, y, "a wall")
+        if is_wall: self.grid.set_flag(x, y, CELL_WALL)
+        else: self.grid.clear_flag(x, y, CELL_WALL)
+        if self._maze_data is not None: self._maze_data[y][x] = 1 if is_wall else 0
+        self._record_change(CHANGE_WALL, (x, y), affects_moves=True)
+        return True
+
+    def set_mud(self, x, y, is_mud=True):
+        self._check_editable(x, y)
+        if self.is_mud(x, y) == is_mud: return False
+        if is_mud: self._check_terrain_target(x, y, "mud")
+        if is_mud:
+            self.grid.set_flag(x, y, CELL_MUD); self.mud_puddles.add((x, y))
+        else:
+            self.grid.clear_flag(x, y, CELL_MUD); self.mud_puddles.discard((x, y))
+        if self._transition_table is not None: # Mud only changes what stepping onto (x, y) costs
+            self._transition_table.add_entry_cost(x, y, (1 if is_mud else -1) * (self.MUD_COST_FOR_ALGORITHM - 1))
+        self._record_change(CHANGE_MUD, (x, y), affects_moves=True)
+        return True
+
+    def set_water(self, x, y, is_water=True):
+        self._check_editable(x, y)
+        if self.is_water(x, y) == is_water: return False
+        if is_water: self._check_terrain_target(x, y, "water")
+        if is_water:
+            self.grid.set_flag(x, y, CELL_WATER); self.water_cells.add((x, y))
+        else:
+            self.grid.clear_flag(x, y, CELL_WATER); self.water_cells.discard((x, y))
+        self._record_change(CHANGE_WATER, (x, y), affects_moves=True)
+        return True
+
+    def get_renderer(self):
+        if self._renderer is None:
+            from maze_renderer import MazeRenderer # pygame is only needed once something is drawn
+            self._renderer = MazeRenderer(self)
+        return self._renderer
+
     def update(self, dt):
-        if self.min_loaded_portal_frames > 0: 
-            self.portal_animation_timer += dt
-            if self.portal_animation_timer >= PORTAL_ANIMATION_SPEED:
-                self.portal_animation_timer %= PORTAL_ANIMATION_SPEED # More robust reset
-                self.portal_current_frame_index = (self.portal_current_frame_index + 1) % self.min_loaded_portal_frames
-
-    def draw(self, surface):
-        # Draw base maze: walls and paths/mud/water
-        for y_draw in range(self.height):
-            for x_draw in range(self.width):
-                rect = pygame.Rect(x_draw * self.cell_size, y_draw * self.cell_size, self.cell_size, self.cell_size)
-                pos = (x_draw, y_draw)
-
-                if self.maze_data[y_draw][x_draw] == 1: 
-                    pygame.draw.rect(surface, WALL_COLOR, rect)
-                elif pos in self.water_cells:
-                    if self.use_water_texture: surface.blit(self.water_img, rect)
-                    else: pygame.draw.rect(surface, WATER_COLOR, rect) # Fallback color
-                elif pos in self.mud_puddles:
-                    if self.use_mud_texture: surface.blit(self.mud_img, rect)
-                    else: pygame.draw.rect(surface, MUD_COLOR, rect) # Fallback color
-                else: # Path cell (could be start, exit, or just empty path)
-                    if self.use_path_texture: surface.blit(self.path_img, rect)
-                    else: pygame.draw.rect(surface, PATH_COLOR, rect) # Fallback color
-        
-        # Draw Portals on top
-        for pos, data in self.portals.items():
-            rect = pygame.Rect(pos[0] * self.cell_size, pos[1] * self.cell_size, self.cell_size, self.cell_size)
-            pair_id = data['pair_id']
-            
-            if self.portal_pair_use_texture.get(pair_id) and \
-               self.portal_pair_frames.get(pair_id) and \
-               self.min_loaded_portal_frames > 0:
-                
-                frames_for_this_pair = self.portal_pair_frames[pair_id]
-                current_idx_for_pair = self.portal_current_frame_index % len(frames_for_this_pair)
-                img_to_draw = frames_for_this_pair[current_idx_for_pair]
-                surface.blit(img_to_draw, rect)
-            else: # Fallback drawing for portal
-                pygame.draw.rect(surface, data.get('color', PORTAL_COLORS_FALLBACK[0]), rect)
-                inner_rect = rect.inflate(-self.cell_size // 4, -self.cell_size // 4)
-                # Simple pulsing effect for fallback
-                alpha = 80 + (pygame.time.get_ticks() // 20) % 70 # Gentle pulse
-                try:
-                    pygame.draw.ellipse(surface, (*DMG_PRIMARY_GREEN[:3], alpha), inner_rect)
-                except TypeError: # For Pygames that don't handle alpha in tuple well for draw
-                     ellipse_color = pygame.Color(*DMG_PRIMARY_GREEN[:3])
-                     ellipse_color.a = alpha
-                     pygame.draw.ellipse(surface, ellipse_color, inner_rect)
-
-
-        # Draw Exit
-        exit_rect = pygame.Rect(self.exit_pos[0] * self.cell_size, self.exit_pos[1] * self.cell_size, self.cell_size, self.cell_size)
-        if self.use_exit_texture:
-            surface.blit(self.exit_img, exit_rect)
-        else: # Themed Fallback drawing for exit
-            pygame.draw.rect(surface, EXIT_COLOR, exit_rect)
-            # Simple door icon
-            door_knob_radius = self.cell_size // 8
-            pygame.draw.rect(surface, DMG_DARK_BG, exit_rect.inflate(-self.cell_size//3, -self.cell_size//6)) # Door panel
-            pygame.draw.circle(surface, DMG_ACCENT_GREEN, 
-                               (exit_rect.centerx + self.cell_size//5, exit_rect.centery), 
-                               door_knob_radius) # Knob
-
-        # Draw Keys
-        key_img_to_draw = self.key_img
-        key_draw_size = key_img_to_draw.get_size()
-        key_offset_x = (self.cell_size - key_draw_size[0]) // 2
-        key_offset_y = (self.cell_size - key_draw_size[1]) // 2
-
-        for kx, ky in self.keys:
-            key_pos_on_screen = (kx * self.cell_size + key_offset_x, ky * self.cell_size + key_offset_y)
-            if self.use_key_texture:
-                surface.blit(key_img_to_draw, key_pos_on_screen)
-            else: # Themed Fallback drawing for key
-                center_x = kx * self.cell_size + self.cell_size // 2
-                center_y = ky * self.cell_size + self.cell_size // 2
-                radius = int(self.cell_size * 0.38)
-                # Key shape
-                pygame.draw.circle(surface, KEY_COLOR, (center_x, center_y - radius // 2), radius // 2) # Head
-                pygame.draw.rect(surface, KEY_COLOR, pygame.Rect(center_x - radius//6, center_y - radius//3, radius//3, radius * 1.2)) # Shaft
-                pygame.draw.rect(surface, KEY_COLOR, pygame.Rect(center_x - radius//3, center_y + radius *0.6, radius*2//3, radius//4)) # Bit
+        """True if the animation moved on and the maze needs drawing again."""
+        return self._renderer is not None and self._renderer.update(dt) # Portal animation only runs once drawn
 
+    def draw(self, surface, camera=None):
+        self.get_renderer().draw(surface, camera)
 
     def get_total_keys_placed(self): return self.actual_num_keys if hasattr(self, 'actual_num_keys') else len(self.keys)
\ No newline at end of file
@@ -0,0 +1,231 @@
+from itertools import permutations
+import numpy as np
+from constants import MAZE_FAST_GENERATION_MIN_CELLS
+
+CARVE_DIRECTIONS = [(0, 2), (2, 0), (0, -2), (-2, 0)] # N, E, S, W (jumping 2 cells)
+CARVE_ORDERS = [tuple(CARVE_DIRECTIONS[d] for d in order) for order in permutations(range(4))] # All 24 shuffles
+EXIT_DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+
+def carve_maze(walls, width, height, start_pos, exit_pos, loop_chance, rng, fast=None):
+    """
+    Fills `walls` (row-major bytearray, 1 = wall) and carves a randomized-DFS maze into it in place.
+    Uses an explicit stack instead of recursion, so the maze size is only bounded by memory.
+    rng is anything with the `random` module API (the module itself or a random.Random).
+    fast: True draws the DFS shuffles and loop rolls with NumPy in bulk (same distribution, different
+    random stream), False replays the classic generator call for call; None picks by maze size.
+    """
+    walls[:] = b'\x01' * (width * height)
+    if width <= 2 or height <= 2: return walls # Basic border for tiny mazes
+
+    if fast is None:
+        fast = width * height >= MAZE_FAST_GENERATION_MIN_CELLS
+    if fast:
+        np_rng = np.random.default_rng(rng.getrandbits(64))
+        _carve_passages_fast(walls, width, height, start_pos, np_rng)
+        if loop_chance > 0: _add_loops_vectorized(walls, width, height, loop_chance, np_rng)
+    else:
+        _carve_passages(walls, width, height, start_pos, rng)
+        if loop_chance > 0: _add_loops(walls, width, height, loop_chance, rng)
+
+    _open_exit(walls, width, height, exit_pos, rng)
+    return walls
+
+
+def _carve_passages(walls, width, height, start_pos, rng):
+    # Each stack frame mirrors one call of the old recursive carve(): the cell and its shuffled directions
+    sx, sy = start_pos
+    walls[sy * width + sx] = 0
+    directions = list(CARVE_DIRECTIONS)
+    rng.shuffle(directions)
+    stack = [(sx, sy, directions, 0)]
+    while stack:
+        x, y, directions, next_dir = stack[-1]
+        while next_dir < 4:
+            dx, dy = directions[next_dir]
+            next_dir += 1
+            nx, ny = x + dx, y + dy
+            if 1 <= nx < width - 1 and 1 <= ny < height - 1 and walls[ny * width + nx] == 1:
+                stack[-1] = (x, y, directions, next_dir)
+                walls[(y + dy // 2) * width + x + dx // 2] = 0 # Carve wall in between
+                walls[ny * width + nx] = 0
+                child_directions = list(CARVE_DIRECTIONS)
+                rng.shuffle(child_directions)
+                stack.append((nx, ny, child_directions, 0))
+                break
+        else:
+            stack.pop()
+
+
+def _carve_passages_fast(walls, width, height, start_pos, np_rng):
+    # One pre-drawn shuffle per cell; the stack holds flat indices and progress[] how many directions each cell tried
+    orders = np_rng.integers(0, len(CARVE_ORDERS), size=width * height, dtype=np.uint8).tobytes()
+    progress = bytearray(width * height)
+    sx, sy = start_pos
+    start = sy * width + sx
+    walls[start] = 0
+    stack = [start]
+    max_x, max_y = width - 1, height - 1
+    while stack:
+        i = stack[-1]
+        k = progress[i]
+        if k == 4:
+            stack.pop()
+            continue
+        y, x = divmod(i, width)
+        order = CARVE_ORDERS[orders[i]]
+        while k < 4:
+            dx, dy = order[k]
+            k += 1
+            nx, ny = x + dx, y + dy
+            if 0 < nx < max_x and 0 < ny < max_y:
+                n = ny * width + nx
+                if walls[n] == 1:
+                    walls[(i + n) >> 1] = 0 # Carve wall in between
+                    walls[n] = 0
+                    stack.append(n)
+                    break
+        progress[i] = k
+
+
+def _add_loops(walls, width, height, loop_chance, rng):
+    for y in range(1, height - 1, 2): # Iterate over potential path cells
+        for x in range(1, width - 1, 2):
+            i = y * width + x
+            if walls[i] == 0 and rng.random() < loop_chance:
+                candidates = []
+                # A wall is breakable if the cell two steps away is a path (so a loop is formed)
+                if y > 1 and walls[i - width] == 1 and y - 2 > 0 and walls[i - 2 * width] == 0:
+                    candidates.append(i - width)
+                if y < height - 2 and walls[i + width] == 1 and y + 2 < height - 1 and walls[i + 2 * width] == 0:
+                    candidates.append(i + width)
+                if x > 1 and walls[i - 1] == 1 and x - 2 > 0 and walls[i - 2] == 0:
+                    candidates.append(i - 1)
+                if x < width - 2 and walls[i + 1] == 1 and x + 2 < width - 1 and walls[i + 2] == 0:
+                    candidates.append(i + 1)
+                if candidates:
+                    walls[rng.choice(candidates)] = 0
+
+
+def _add_loops_vectorized(walls, width, height, loop_chance, np_rng):
+    """
+    Same per-cell rule as _add_loops (each open odd cell rolls loop_chance and breaks one random
+    breakable wall), evaluated for all cells at once against the carved layout.
+    """
+    grid = np.frombuffer(walls, dtype=np.uint8).reshape(height, width)
+    ys = np.arange(1, height - 1, 2)
+    xs = np.arange(1, width - 1, 2)
+    yy, xx = np.meshgrid(ys, xs, indexing='ij')
+
+    rolls = (grid[yy, xx] == 0) & (np_rng.random(yy.shape) < loop_chance)
+
+    def breakable(dx, dy, in_range):
+        mask = in_range.copy()
+        wall_y, wall_x = np.clip(yy + dy, 0, height - 1), np.clip(xx + dx, 0, width - 1)
+        far_y, far_x = np.clip(yy + 2 * dy, 0, height - 1), np.clip(xx + 2 * dx, 0, width - 1)
+        mask &= (grid[wall_y, wall_x] == 1) & (grid[far_y, far_x] == 0)
+        return mask
+
+    offsets = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+    candidates = np.stack([
+        breakable(0, -1, (yy > 1) & (yy - 2 > 0)),
+        breakable(0, 1, (yy < height - 2) & (yy + 2 < height - 1)),
+        breakable(-1, 0, (xx > 1) & (xx - 2 > 0)),
+        breakable(1, 0, (xx < width - 2) & (xx + 2 < width - 1)),
+    ])
+    candidates &= rolls
+    counts = candidates.sum(axis=0)
+    chosen_rank = np.floor(np_rng.random(counts.shape) * counts).astype(np.int64)
+    # Pick the chosen_rank-th breakable wall of each cell
+    chosen_dir = np.argmax(np.cumsum(candidates, axis=0) > chosen_rank, axis=0)
+    has_candidate = counts > 0
+    for d, (dx, dy) in enumerate(offsets):
+        sel = has_candidate & (chosen_dir == d)
+        grid[yy[sel] + dy, xx[sel] + dx] = 0
+
+
+def _open_exit(walls, width, height, exit_pos, rng):
+    ex, ey = exit_pos
+    # Ensure exit is a path cell (it might be a wall if not carved to)
+    if 0 <= ey < height and 0 <= ex < width:
+        walls[ey * width + ex] = 0
+
+    # Ensure exit is accessible from at least one adjacent path cell
+    open_candidates = []
+    for dx, dy in EXIT_DIRECTIONS:
+        nx, ny = ex + dx, ey + dy
+        if 1 <= nx < width - 1 and 1 <= ny < height - 1:
+            if walls[ny * width + nx] == 0: return # Already connected
+            open_candidates.append(ny * width + nx)
+    # An exit on the border with no inner neighbour stays inaccessible; pathfinders fail gracefully
+    if open_candidates:
+        walls[rng.choice(open_candidates)] = 0
+
+
+class EllerRowGenerator:
+    """
+    Streams a maze of odd `width` top to bottom, one grid row at a time, with Eller's algorithm.
+    Only the set membership of the current cell row is kept, so memory is O(width) and the maze
+    can be extended forever. Row 0 is the top border, odd rows hold cells and even rows the walls
+    between two cell rows. loop_chance opens walls between cells that are already connected.
+    """
+    def __init__(self, width, rng, loop_chance=0.0, join_chance=0.5, extend_chance=0.35):
+        self.width = width
+        self.rng = rng
+        self.loop_chance = loop_chance
+        self.join_chance = join_chance
+        self.extend_chance = extend_chance
+        self.num_cells = (width - 1) // 2
+        self.cell_sets = [None] * self.num_cells # Set id of every cell column, None = not connected from above
+        self.members = {} # set id -> cell columns of the current row in that set
+        self.next_set_id = 0
+        self.row = 0 # Global index of the next row to emit
+
+    def next_row(self):
+        y = self.row
+        self.row += 1
+        if y == 0: return bytearray(b'\x01') * self.width
+        return self._cell_row() if y % 2 == 1 else self._separator_row()
+
+    def next_rows(self, count):
+        rows = bytearray()
+        for _ in range(count): rows += self.next_row()
+        return rows
+
+    def _cell_row(self):
+        row = bytearray(b'\x01') * self.width
+        sets, members = self.cell_sets, self.members
+        for i in range(self.num_cells):
+            row[2 * i + 1] = 0
+            if sets[i] is None:
+                sets[i] = self.next_set_id
+                members[self.next_set_id] = [i]
+                self.next_set_id += 1
+        for i in range(self.num_cells - 1):
+            a, b = sets[i], sets[i + 1]
+            if a != b:
+                if self.rng.random() < self.join_chance:
+                    row[2 * i + 2] = 0
+                    if len(members[a]) < len(members[b]): a, b = b, a # Relabel the smaller set
+                    for j in members[b]: sets[j] = a
+                    members[a].extend(members.pop(b))
+            elif self.rng.random() < self.loop_chance:
+                row[2 * i + 2] = 0
+        return row
+
+    def _separator_row(self):
+        row = bytearray(b'\x01') * self.width
+        extended = [False] * self.num_cells
+        new_members = {}
+        for set_id, cols in self.members.items():
+            # Every set goes down at least once so no region is sealed off
+            down = [c for c in cols if self.rng.random() < self.extend_chance]
+            if not down: down = [self.rng.choice(cols)]
+            new_members[set_id] = down
+            for c in down:
+                row[2 * c + 1] = 0
+                extended[c] = True
+        for i in range(self.num_cells):
+            if not extended[i]: self.cell_sets[i] = None
+        self.members = new_members
+        return row
@@ -0,0 +1,144 @@
+from array import array
+
+# Per-cell terrain bitflags stored in MazeGrid.flags
+CELL_WALL = 1
+CELL_MUD = 2
+CELL_WATER = 4
+CELL_PORTAL = 8
+CELL_KEY = 16
+
+NO_PORTAL_TARGET = -1
+
+
+class MazeGrid:
+    """
+    Flat, array-backed storage for a maze: one byte of terrain bitflags per cell
+    (row-major, index = y * width + x) plus an int32 side table holding the flat
+    index of each portal's target cell (NO_PORTAL_TARGET elsewhere).
+    """
+    def __init__(self, width, height, flags=None):
+        self.width = width
+        self.height = height
+        # flags may be any writable byte buffer of width * height cells (e.g. a memoryview over a memmap)
+        self.flags = bytearray(width * height) if flags is None else flags
+        self.portal_targets = array('i', [NO_PORTAL_TARGET]) * (width * height)
+
+    @classmethod
+    def from_features(cls, maze_data, keys=(), mud_puddles=(), water_cells=(), portals=None):
+        """Builds a grid from a list-of-lists wall layout (1 = wall) and the terrain containers Maze places."""
+        height = len(maze_data)
+        width = len(maze_data[0]) if height else 0
+        grid = cls(width, height)
+        for y, row in enumerate(maze_data):
+            base = y * width
+            for x, cell in enumerate(row):
+                if cell == 1: grid.flags[base + x] = CELL_WALL
+        grid.add_features(keys, mud_puddles, water_cells, portals)
+        return grid
+
+    def add_features(self, keys=(), mud_puddles=(), water_cells=(), portals=None):
+        """Sets the terrain flags (and portal targets) for positions placed on top of the wall layout."""
+        flags, width = self.flags, self.width
+        for x, y in mud_puddles: flags[y * width + x] |= CELL_MUD
+        for x, y in water_cells: flags[y * width + x] |= CELL_WATER
+        for x, y in keys: flags[y * width + x] |= CELL_KEY
+        for (x, y), data in (portals or {}).items():
+            target = data.get('target')
+            if target is None: continue
+            self.set_portal(x, y, target[0], target[1])
+
+    def index(self, x, y):
+        return y * self.width + x
+
+    def pos(self, index):
+        return (index % self.width, index // self.width)
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def has_flag(self, x, y, flag):
+        return self.flags[y * self.width + x] & flag != 0
+
+    def set_flag(self, x, y, flag):
+        self.flags[y * self.width + x] |= flag
+
+    def clear_flag(self, x, y, flag):
+        self.flags[y * self.width + x] &= ~flag & 0xFF
+
+    def set_portal(self, x, y, target_x, target_y):
+        idx = y * self.width + x
+        self.flags[idx] |= CELL_PORTAL
+        self.portal_targets[idx] = target_y * self.width + target_x
+
+    def get_portal_target(self, x, y):
+        target = self.portal_targets[y * self.width + x]
+        if target == NO_PORTAL_TARGET: return None
+        return (target % self.width, target // self.width)
+
+    def as_numpy(self):
+        """Zero-copy NumPy views: (flags as uint8 [height, width], portal_targets as int32 [height, width])."""
+        import numpy as np
+        flags_view = np.frombuffer(self.flags, dtype=np.uint8).reshape(self.height, self.width)
+        targets_view = np.frombuffer(self.portal_targets, dtype=np.int32).reshape(self.height, self.width)
+        return flags_view, targets_view
+
+    def nbytes(self):
+        return len(self.flags) + len(self.portal_targets) * self.portal_targets.itemsize
+
+
+class FreeCellIndex:
+    """
+    Set of free cells (flat indices) supporting O(1) random sampling and removal: `cells` is a dense
+    array and `slots[i]` the position of cell i in it (-1 once removed), so discard() swaps the last
+    cell into the hole. Used by Maze feature placement so no attempt rescans the grid.
+    """
+    def __init__(self, width, height, cells):
+        self.width = width
+        self.cells = array('i', cells)
+        self.slots = array('i', [-1]) * (width * height)
+        for slot, i in enumerate(self.cells): self.slots[i] = slot
+
+    @classmethod
+    def from_grid(cls, grid, exclude=()):
+        """Every inner (non-border) path cell of the grid, minus the `exclude` positions."""
+        import numpy as np
+        width, height = grid.width, grid.height
+        index = cls(width, height, ())
+        if width > 2 and height > 2:
+            flags_view, _ = grid.as_numpy()
+            inner_free = np.zeros((height, width), dtype=bool)
+            inner_free[1:-1, 1:-1] = flags_view[1:-1, 1:-1] & CELL_WALL == 0
+            cells = np.flatnonzero(inner_free).astype(np.int32)
+            slots = np.full(width * height, -1, dtype=np.int32)
+            slots[cells] = np.arange(len(cells), dtype=np.int32)
+            index.cells = array('i', cells.tobytes())
+            index.slots = array('i', slots.tobytes())
+        for x, y in exclude: index.discard((x, y))
+        return index
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, pos):
+        x, y = pos
+        i = y * self.width + x
+        return 0 <= x < self.width and 0 <= i < len(self.slots) and self.slots[i] != -1
+
+    def discard(self, pos):
+        i = pos[1] * self.width + pos[0]
+        slot = self.slots[i]
+        if slot == -1: return
+        last = self.cells.pop()
+        if last != i:
+            self.cells[slot] = last
+            self.slots[last] = slot
+        self.slots[i] = -1
+
+    def choice(self, rng):
+        i = self.cells[rng.randrange(len(self.cells))]
+        return (i % self.width, i // self.width)
+
+    def sample(self, rng, k):
+        """k distinct free cells (k <= len(self)); rng.sample only touches k entries of the array."""
+        width = self.width
+        return [(i % width, i // width) for i in rng.sample(self.cells, k)]
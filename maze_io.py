@@ -0,0 +1,85 @@
+import json
+import struct
+import numpy as np
+from constants import CELL_SIZE
+from maze import Maze
+from maze_grid import MazeGrid
+
+# File layout: MAZE_FILE_MAGIC, uint32 header length, UTF-8 JSON header, zero padding up to a
+# MAZE_FILE_ALIGNMENT boundary, then the raw flag grid (one byte per cell, row-major).
+# np.load can only memory-map plain .npy files (members of an .npz are zip entries), so the flag
+# grid is stored uncompressed at a known offset and mapped with np.memmap instead.
+MAZE_FILE_MAGIC = b'MAZEBIN1'
+MAZE_FILE_VERSION = 1
+MAZE_FILE_ALIGNMENT = 64
+
+
+def save_maze(maze, path):
+    """Writes the maze (flag grid plus key/portal tables and generation parameters) to a single binary file."""
+    portal_pairs = {}
+    for pos, data in maze.portals.items():
+        portal_pairs.setdefault(data['pair_id'], [list(pos), list(data['target'])])
+    header = {
+        'version': MAZE_FILE_VERSION,
+        'width': maze.width,
+        'height': maze.height,
+        'seed': maze.seed,
+        'loop_chance': maze.loop_chance,
+        'start_pos': list(maze.start_pos),
+        'exit_pos': list(maze.exit_pos),
+        'keys': [list(pos) for pos in maze.keys],
+        'portal_pairs': [portal_pairs[pair_id] for pair_id in sorted(portal_pairs)],
+        'num_slides': maze.actual_num_slides,
+        'targets': [maze.num_keys_target, maze.num_puddles_target, maze.num_slides_target, maze.num_portal_pairs_target],
+        'fingerprint': maze.fingerprint(),
+    }
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    prefix_len = len(MAZE_FILE_MAGIC) + 4 + len(header_bytes)
+    padding = -prefix_len % MAZE_FILE_ALIGNMENT
+    with open(path, 'wb') as f:
+        f.write(MAZE_FILE_MAGIC)
+        f.write(struct.pack('<I', len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b'\0' * padding)
+        f.write(maze.grid.flags)
+
+
+def read_maze_header(path):
+    """Returns (header dict, byte offset of the flag grid) without touching the grid itself."""
+    with open(path, 'rb') as f:
+        if f.read(len(MAZE_FILE_MAGIC)) != MAZE_FILE_MAGIC:
+            raise ValueError(f"'{path}' is not a maze file")
+        (header_len,) = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(header_len).decode('utf-8'))
+    if header.get('version') != MAZE_FILE_VERSION:
+        raise ValueError(f"Unsupported maze file version {header.get('version')} in '{path}'")
+    prefix_len = len(MAZE_FILE_MAGIC) + 4 + header_len
+    return header, prefix_len + (-prefix_len % MAZE_FILE_ALIGNMENT)
+
+
+def load_maze(path, cell_size=CELL_SIZE, mmap=True, verify=False):
+    """
+    Loads a maze written by save_maze. With mmap the flag grid is mapped copy-on-write, so nothing
+    is read until a cell is touched and edits such as remove_key never reach the file.
+    verify recomputes the fingerprint and raises ValueError if it does not match the header.
+    """
+    header, offset = read_maze_header(path)
+    width, height = header['width'], header['height']
+    if mmap:
+        flags = memoryview(np.memmap(path, dtype=np.uint8, mode='c', offset=offset, shape=(width * height,)))
+    else:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            flags = bytearray(f.read(width * height))
+    if len(flags) != width * height:
+        raise ValueError(f"Truncated maze file '{path}'")
+
+    maze = Maze.from_grid(MazeGrid(width, height, flags), cell_size, header['start_pos'], header['exit_pos'],
+                          keys=header['keys'], portal_pairs=header['portal_pairs'], num_slides=header['num_slides'],
+                          loop_chance=header['loop_chance'], seed=header['seed'], targets=header['targets'])
+    if verify:
+        if maze.fingerprint() != header['fingerprint']:
+            raise ValueError(f"Fingerprint mismatch in '{path}'")
+    else:
+        maze._fingerprint = header['fingerprint']
+    return maze
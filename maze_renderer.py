@@ -0,0 +1,249 @@
+import pygame
+import sys
+from collections import OrderedDict
+from constants import (
+    WALL_COLOR, PATH_COLOR, EXIT_COLOR, KEY_COLOR, MUD_COLOR, WATER_COLOR, PORTAL_COLORS_FALLBACK,
+    IMAGE_FOLDER,
+    EXIT_IMAGE_FILENAME, KEY_IMAGE_FILENAME, MUD_IMAGE_FILENAME, WATER_IMAGE_FILENAME,
+    PATH_IMAGE_FILENAME, PORTAL_IMAGE_PREFIX,
+    PORTAL_ANIMATION_SPEED, MAX_PORTAL_ANIMATION_FRAMES,
+    DMG_PRIMARY_GREEN, DMG_DARK_BG, DMG_ACCENT_GREEN, # Theme colors for fallbacks
+    RENDER_CHUNK_PIXELS, RENDER_CHUNK_CACHE_CHUNKS
+)
+from assets import get_image, get_frame_sequence, asset_exists, is_fallback
+from camera import Camera
+
+
+class MazeRenderer:
+    """
+    Draws a Maze with pygame. Owns every texture and the portal animation state, so the Maze
+    itself stays a pure grid/terrain model. Textures come from the shared asset cache on the first
+    draw(), pre-scaled for every zoom level a camera asks for.
+    Terrain, the exit and keys are pre-rendered into background chunks of about
+    RENDER_CHUNK_PIXELS that follow the maze journal (only changed cells are repainted). A frame
+    blits the chunks in view plus the animated portals in view, so its cost depends on the
+    camera, not on the maze size.
+    """
+    def __init__(self, maze):
+        self.maze = maze
+        self.cell_size = maze.cell_size
+        self.textures_loaded = False
+
+        self.portal_pair_frames = {}
+        self.portal_pair_use_texture = {}
+        self.portal_animation_timer = 0.0
+        self.portal_current_frame_index = 0
+        self.min_loaded_portal_frames = 0
+
+        self._tilesets = {} # cell size -> textures scaled for it
+        self._chunks = OrderedDict() # (cell size, chunk x, chunk y) -> background Surface, least recently used first
+        self._background_version = -1 # maze.version the chunks were last synced to
+        self._whole_maze_camera = None
+
+    def _load_textures(self):
+        tileset = self._tileset(self.cell_size)
+
+        # Flags to determine if actual textures should be used or fallbacks
+        self.use_exit_texture = not is_fallback(tileset['exit'])
+        self.use_key_texture = not is_fallback(tileset['key'])
+        self.use_mud_texture = not is_fallback(tileset['mud'])
+        self.use_water_texture = not is_fallback(tileset['water'])
+
+        # Path texture usage check (more robust)
+        is_path_fallback = is_fallback(tileset['path'])
+        path_file_exists = asset_exists(IMAGE_FOLDER, PATH_IMAGE_FILENAME)
+        if is_path_fallback and not path_file_exists: # File genuinely missing
+            self.use_path_texture = False
+        elif is_path_fallback and path_file_exists: # File exists but loaded as fallback (error)
+            print(f"W: Path texture '{PATH_IMAGE_FILENAME}' loaded as fallback (load error), disabling texture.", file=sys.stderr)
+            self.use_path_texture = False
+        else: # Loaded successfully
+            self.use_path_texture = True
+
+        self._load_portal_animations(tileset)
+        self.textures_loaded = True
+
+    def _portal_filenames(self, pair_id):
+        return [f"{PORTAL_IMAGE_PREFIX}{pair_id}_{frame_idx}.png" for frame_idx in range(MAX_PORTAL_ANIMATION_FRAMES)]
+
+    def _load_portal_animations(self, tileset):
+        num_pairs = self.maze.actual_num_portal_pairs
+        if num_pairs == 0:
+            self.min_loaded_portal_frames = 0
+            return
+
+        for pair_id in range(num_pairs):
+            frames = tileset['portals'][pair_id]
+            if not frames:
+                _, broken = get_frame_sequence(self._portal_filenames(pair_id), self.cell_size)
+                if broken: print(f"W: Portal animation frame '{broken}' failed to load (file exists). Falling back to color for pair {pair_id}.", file=sys.stderr)
+            self.portal_pair_frames[pair_id] = frames
+            self.portal_pair_use_texture[pair_id] = bool(frames)
+
+        valid_frame_counts = [len(self.portal_pair_frames[pid])
+                              for pid in range(num_pairs)
+                              if self.portal_pair_use_texture.get(pid) and self.portal_pair_frames.get(pid)]
+        self.min_loaded_portal_frames = min(valid_frame_counts) if valid_frame_counts else 0
+
+    def update(self, dt):
+        """Advances the portal animation; True if that changed the frame being shown."""
+        if self.min_loaded_portal_frames > 0:
+            self.portal_animation_timer += dt
+            if self.portal_animation_timer >= PORTAL_ANIMATION_SPEED:
+                self.portal_animation_timer %= PORTAL_ANIMATION_SPEED # More robust reset
+                self.portal_current_frame_index = (self.portal_current_frame_index + 1) % self.min_loaded_portal_frames
+                return True
+        return False
+
+    def _tileset(self, cell_size):
+        """Textures for cells of cell_size, from the process-wide asset cache (one disk read per file and size)."""
+        tileset = self._tilesets.get(cell_size)
+        if tileset is None:
+            portals = {}
+            for pair_id in range(self.maze.actual_num_portal_pairs):
+                frames, broken = get_frame_sequence(self._portal_filenames(pair_id), cell_size)
+                portals[pair_id] = [] if broken else frames # A broken frame sends the whole pair to the fallback
+            tileset = self._tilesets[cell_size] = {
+                'exit': get_image(EXIT_IMAGE_FILENAME, cell_size),
+                'key': get_image(KEY_IMAGE_FILENAME, max(1, int(cell_size * 0.85))),
+                'mud': get_image(MUD_IMAGE_FILENAME, cell_size),
+                'water': get_image(WATER_IMAGE_FILENAME, cell_size),
+                'path': get_image(PATH_IMAGE_FILENAME, cell_size),
+                'portals': portals,
+            }
+        return tileset
+
+    def _chunk_cells(self, cell_size):
+        return max(1, RENDER_CHUNK_PIXELS // cell_size)
+
+    def _render_chunk(self, cell_size, chunk_x, chunk_y):
+        maze = self.maze
+        chunk_cells = self._chunk_cells(cell_size)
+        x0, y0 = chunk_x * chunk_cells, chunk_y * chunk_cells
+        x1, y1 = min(maze.width, x0 + chunk_cells), min(maze.height, y0 + chunk_cells)
+        chunk = pygame.Surface(((x1 - x0) * cell_size, (y1 - y0) * cell_size))
+        if pygame.display.get_surface() is not None: chunk = chunk.convert()
+        chunk.fill(DMG_DARK_BG) # What the game clears its maze surface to, so translucent textures blend the same
+        tileset = self._tileset(cell_size)
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                self._draw_cell(chunk, tileset, cell_size, x, y, pygame.Rect((x - x0) * cell_size, (y - y0) * cell_size, cell_size, cell_size))
+        return chunk
+
+    def _get_chunk(self, cell_size, chunk_x, chunk_y):
+        key = (cell_size, chunk_x, chunk_y)
+        chunk = self._chunks.get(key)
+        if chunk is None: chunk = self._chunks[key] = self._render_chunk(cell_size, chunk_x, chunk_y)
+        else: self._chunks.move_to_end(key)
+        return chunk
+
+    def _sync_background(self):
+        maze = self.maze
+        changes = maze.changes_since(self._background_version)
+        if changes is None: # The journal no longer covers what we have
+            self._chunks.clear()
+        elif self._chunks:
+            cell_sizes = set(key[0] for key in self._chunks)
+            for _, _, (x, y) in changes:
+                for cell_size in cell_sizes:
+                    chunk_cells = self._chunk_cells(cell_size)
+                    chunk = self._chunks.get((cell_size, x // chunk_cells, y // chunk_cells))
+                    if chunk is None: continue
+                    rect = pygame.Rect(x % chunk_cells * cell_size, y % chunk_cells * cell_size, cell_size, cell_size)
+                    chunk.fill(DMG_DARK_BG, rect)
+                    self._draw_cell(chunk, self._tileset(cell_size), cell_size, x, y, rect)
+        self._background_version = maze.version
+
+    def _draw_cell(self, surface, tileset, cell_size, x, y, rect):
+        """Terrain, exit and key of cell (x, y) into `rect` of `surface`."""
+        maze = self.maze
+        self._draw_terrain(surface, tileset, x, y, rect)
+        if (x, y) == maze.exit_pos: self._draw_exit(surface, tileset, cell_size, rect)
+        if maze.is_key(x, y): self._draw_key(surface, tileset, cell_size, rect)
+
+    def _draw_terrain(self, surface, tileset, x, y, rect):
+        maze = self.maze
+        if maze.is_wall(x, y):
+            pygame.draw.rect(surface, WALL_COLOR, rect)
+        elif maze.is_water(x, y):
+            if self.use_water_texture: surface.blit(tileset['water'], rect)
+            else: pygame.draw.rect(surface, WATER_COLOR, rect) # Fallback color
+        elif maze.is_mud(x, y):
+            if self.use_mud_texture: surface.blit(tileset['mud'], rect)
+            else: pygame.draw.rect(surface, MUD_COLOR, rect) # Fallback color
+        else: # Path cell (could be start, exit, or just empty path)
+            if self.use_path_texture: surface.blit(tileset['path'], rect)
+            else: pygame.draw.rect(surface, PATH_COLOR, rect) # Fallback color
+
+    def _draw_exit(self, surface, tileset, cell_size, exit_rect):
+        if self.use_exit_texture:
+            surface.blit(tileset['exit'], exit_rect)
+        else: # Themed Fallback drawing for exit
+            pygame.draw.rect(surface, EXIT_COLOR, exit_rect)
+            # Simple door icon
+            door_knob_radius = cell_size // 8
+            pygame.draw.rect(surface, DMG_DARK_BG, exit_rect.inflate(-cell_size//3, -cell_size//6)) # Door panel
+            pygame.draw.circle(surface, DMG_ACCENT_GREEN,
+                               (exit_rect.centerx + cell_size//5, exit_rect.centery),
+                               door_knob_radius) # Knob
+
+    def _draw_key(self, surface, tileset, cell_size, rect):
+        if self.use_key_texture:
+            key_draw_size = tileset['key'].get_size()
+            surface.blit(tileset['key'], (rect.x + (cell_size - key_draw_size[0]) // 2,
+                                          rect.y + (cell_size - key_draw_size[1]) // 2))
+        else: # Themed Fallback drawing for key
+            center_x = rect.x + cell_size // 2
+            center_y = rect.y + cell_size // 2
+            radius = int(cell_size * 0.38)
+            # Key shape
+            pygame.draw.circle(surface, KEY_COLOR, (center_x, center_y - radius // 2), radius // 2) # Head
+            pygame.draw.rect(surface, KEY_COLOR, pygame.Rect(center_x - radius//6, center_y - radius//3, radius//3, radius * 1.2)) # Shaft
+            pygame.draw.rect(surface, KEY_COLOR, pygame.Rect(center_x - radius//3, center_y + radius *0.6, radius*2//3, radius//4)) # Bit
+
+    def draw(self, surface, camera=None):
+        """Draws what `camera` sees onto `surface`; without one the whole maze at its own cell size."""
+        if not self.textures_loaded: self._load_textures()
+        if self._background_version != self.maze.version: self._sync_background()
+        if camera is None:
+            if self._whole_maze_camera is None or (self._whole_maze_camera.world_width, self._whole_maze_camera.world_height) != (self.maze.width, self.maze.height):
+                self._whole_maze_camera = Camera.whole_maze(self.maze)
+            camera = self._whole_maze_camera
+        cell_size = camera.cell_size
+        chunk_cells = self._chunk_cells(cell_size)
+        chunk_pixels = chunk_cells * cell_size
+        ox, oy = camera.offset
+        x0, y0, x1, y1 = camera.visible_cells()
+        visible_chunks = 0
+        for chunk_y in range(y0 // chunk_cells, (y1 - 1) // chunk_cells + 1):
+            for chunk_x in range(x0 // chunk_cells, (x1 - 1) // chunk_cells + 1):
+                surface.blit(self._get_chunk(cell_size, chunk_x, chunk_y), (chunk_x * chunk_pixels - ox, chunk_y * chunk_pixels - oy))
+                visible_chunks += 1
+        while len(self._chunks) > max(RENDER_CHUNK_CACHE_CHUNKS, 2 * visible_chunks): self._chunks.popitem(last=False)
+
+        # Portals are animated, so they are the only cells composited every frame
+        portal_frames = self._tileset(cell_size)['portals']
+        for pos, data in self.maze.portals.items():
+            if not (x0 <= pos[0] < x1 and y0 <= pos[1] < y1): continue
+            rect = camera.cell_rect(*pos)
+            pair_id = data['pair_id']
+
+            if self.portal_pair_use_texture.get(pair_id) and \
+               portal_frames.get(pair_id) and \
+               self.min_loaded_portal_frames > 0:
+
+                frames_for_this_pair = portal_frames[pair_id]
+                current_idx_for_pair = self.portal_current_frame_index % len(frames_for_this_pair)
+                img_to_draw = frames_for_this_pair[current_idx_for_pair]
+                surface.blit(img_to_draw, rect)
+            else: # Fallback drawing for portal
+                pygame.draw.rect(surface, data.get('color', PORTAL_COLORS_FALLBACK[0]), rect)
+                inner_rect = rect.inflate(-cell_size // 4, -cell_size // 4)
+                # Simple pulsing effect for fallback
+                alpha = 80 + (pygame.time.get_ticks() // 20) % 70 # Gentle pulse
+                try:
+                    pygame.draw.ellipse(surface, (*DMG_PRIMARY_GREEN[:3], alpha), inner_rect)
+                except TypeError: # For Pygames that don't handle alpha in tuple well for draw
+                     ellipse_color = pygame.Color(*DMG_PRIMARY_GREEN[:3])
+                     ellipse_color.a = alpha
+                     pygame.draw.ellipse(surface, ellipse_color, inner_rect)
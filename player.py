@@ -1,17 +1,16 @@
 # player.py
 import pygame
-import os
 import sys
 import math
 from constants import (
     CELL_SIZE, PLAYER_MOVE_SPEED, PLAYER_ANIMATION_SPEED,
-    FALLBACK_IMAGE_COLOR, IMAGE_FOLDER,
+    IMAGE_FOLDER,
     PLAYER_IDLE_IMAGE, PLAYER_WIN_IMAGE, PLAYER_WALK_PREFIX,
     KEY_PICKUP_SOUND, PLAYER_MUD_MULTIPLIER,
     DMG_PRIMARY_GREEN, DMG_DARK_BG, DMG_LIGHT_TEXT, # Theme colors
     DMG_ACCENT_GREEN
 )
-from utils import load_scaled_image, load_sound
+from assets import get_image, get_frame_sequence, get_sound, asset_exists, is_fallback
 from maze import Maze
 
 class Player:
@@ -30,48 +29,41 @@ class Player:
         self.just_slid = False
         self.just_teleported = False
         self.move_count = 0
-        self.key_pickup_sound = load_sound(KEY_PICKUP_SOUND)
+        self.key_pickup_sound = get_sound(KEY_PICKUP_SOUND)
         self.current_image = self.idle_img_right
 
     def _load_sprites(self):
-        self.idle_img_right = load_scaled_image(PLAYER_IDLE_IMAGE, self.cell_size)
-        if self.idle_img_right.get_at((0,0)) == pygame.Color(FALLBACK_IMAGE_COLOR) and not os.path.exists(os.path.join(IMAGE_FOLDER,PLAYER_IDLE_IMAGE)):
+        # Sprites come from the shared asset cache, so creating a Player does no file I/O after the first
+        self.idle_img_right = get_image(PLAYER_IDLE_IMAGE, self.cell_size)
+        self.idle_img_left = get_image(PLAYER_IDLE_IMAGE, self.cell_size, flip=True)
+        if is_fallback(self.idle_img_right) and not asset_exists(IMAGE_FOLDER, PLAYER_IDLE_IMAGE):
             print(f"W: Player idle image '{PLAYER_IDLE_IMAGE}' not found. Using fallback.", file=sys.stderr)
             self.idle_img_right = pygame.Surface((self.cell_size, self.cell_size), pygame.SRCALPHA)
             self.idle_img_right.fill(DMG_ACCENT_GREEN)
             pygame.draw.circle(self.idle_img_right, DMG_LIGHT_TEXT, (self.cell_size//2, self.cell_size//2), self.cell_size//3)
-        self.idle_img_left = pygame.transform.flip(self.idle_img_right, True, False)
+            self.idle_img_left = pygame.transform.flip(self.idle_img_right, True, False)
 
 
-        self.walk_frames_right = []
         MAX_PLAYER_WALK_FRAMES = 8 
-        for i in range(MAX_PLAYER_WALK_FRAMES):
-            filename = f"{PLAYER_WALK_PREFIX}{i}.png"
-            image_path = os.path.join(IMAGE_FOLDER, filename)
-
-            if not os.path.exists(image_path): 
-                if i == 0: 
-                    print(f"W: Player walk frame '{filename}' (start of sequence) not found. Walk animation may be missing.", file=sys.stderr)
-                break 
-            frame = load_scaled_image(filename, self.cell_size)
-
-            if frame.get_at((0,0)) == pygame.Color(FALLBACK_IMAGE_COLOR):
-                print(f"W: Error loading player walk frame '{filename}' (file exists but failed to load). Stopping sequence.", file=sys.stderr)
-                break 
-
-            self.walk_frames_right.append(frame)
-
-
-
-        if not self.walk_frames_right:
+        walk_filenames = [f"{PLAYER_WALK_PREFIX}{i}.png" for i in range(MAX_PLAYER_WALK_FRAMES)]
+        frames, broken = get_frame_sequence(walk_filenames, self.cell_size)
+        if not frames and not broken:
+            print(f"W: Player walk frame '{walk_filenames[0]}' (start of sequence) not found. Walk animation may be missing.", file=sys.stderr)
+        if broken:
+            print(f"W: Error loading player walk frame '{broken}' (file exists but failed to load). Stopping sequence.", file=sys.stderr)
+
+        if frames:
+            self.walk_frames_right = list(frames)
+            self.walk_frames_left = list(get_frame_sequence(walk_filenames, self.cell_size, flip=True)[0])
+        else:
             print(f"W: No player walk frames loaded. Using idle image for walking animation.", file=sys.stderr)
-            self.walk_frames_right.append(self.idle_img_right)
-        self.walk_frames_left = [pygame.transform.flip(img, True, False) for img in self.walk_frames_right]
+            self.walk_frames_right = [self.idle_img_right]
+            self.walk_frames_left = [self.idle_img_left]
 
 
         win_size = int(self.cell_size * 2.2)
-        self.win_image = load_scaled_image(PLAYER_WIN_IMAGE, win_size)
-        if self.win_image.get_at((0,0)) == pygame.Color(FALLBACK_IMAGE_COLOR):
+        self.win_image = get_image(PLAYER_WIN_IMAGE, win_size)
+        if is_fallback(self.win_image):
             print(f"W: Player win image '{PLAYER_WIN_IMAGE}' not found or failed to load. Using fallback.", file=sys.stderr)
             self.win_image = pygame.Surface((win_size, win_size), pygame.SRCALPHA)
             center_x, center_y = win_size // 2, win_size // 2
@@ -197,10 +189,11 @@ class Player:
 
         self.update_animation(dt)
 
-    def draw(self, surface: pygame.Surface):
-        draw_x = self.x * self.cell_size
-        draw_y = self.y * self.cell_size
-        surface.blit(self.current_image, (draw_x, draw_y))
+    def draw(self, surface: pygame.Surface, camera=None):
+        if camera is None:
+            surface.blit(self.current_image, (self.x * self.cell_size, self.y * self.cell_size))
+        else:
+            surface.blit(camera.scaled_sprite(self.current_image, self.cell_size), camera.cell_to_view(self.x, self.y))
 
     def get_pos(self) -> tuple[int, int]:
         return (self.x, self.y)
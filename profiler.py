@@ -0,0 +1,175 @@
+import csv
+import json
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+import pygame
+from constants import (
+    PROFILER_HISTORY_FRAMES, PROFILER_MAX_RECORDED_FRAMES, PROFILER_GRAPH_HEIGHT, PROFILER_GRAPH_MAX_MS,
+    PROFILER_TEXT_REFRESH, PROFILER_SECTION_COLORS, FPS,
+    DMG_DARK_BG, DMG_LIGHT_TEXT, DMG_DIM_TEXT, DMG_WARN_TEXT, DMG_UI_BORDER
+)
+
+OTHER_SECTION = "other" # Frame time no section claimed
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile (q in 0-100) of an already sorted list."""
+    if not sorted_values: return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class FrameProfiler:
+    """
+    Per-frame timings split by named sections. Sections nest; each one is charged only its own
+    (exclusive) time, so a frame's sections add up to its total. Nothing is measured until the
+    HUD is first shown; from then on every frame is kept (up to PROFILER_MAX_RECORDED_FRAMES)
+    for export(). The HUD graph is a persistent surface scrolled one column per frame.
+    """
+    def __init__(self):
+        self.visible = False
+        self.recording = False
+        self.sections = [] # Names in the order they first appeared
+        self.history = deque(maxlen=PROFILER_HISTORY_FRAMES) # (frame ms, {section: ms})
+        self.recorded = [] # (seconds since recording started, frame ms, {section: ms})
+        self._record_start = 0.0
+        self._frame_start = None
+        self._frame_sections = {}
+        self._stack = [] # [name, start, time spent in child sections]
+        self._graph = None
+        self._text_panel = None
+        self._text_refreshed = 0.0
+        self._backdrop = None
+
+    def toggle(self):
+        self.visible = not self.visible
+        if self.visible and not self.recording:
+            self.recording = True
+            self._record_start = time.perf_counter()
+
+    def begin_frame(self):
+        if not self.recording: return
+        self._frame_start = time.perf_counter()
+        self._frame_sections = {}
+
+    @contextmanager
+    def section(self, name):
+        if not self.recording or self._frame_start is None:
+            yield
+            return
+        entry = [name, time.perf_counter(), 0.0]
+        self._stack.append(entry)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - entry[1]
+            if self._stack: self._stack[-1][2] += elapsed
+            self._frame_sections[name] = self._frame_sections.get(name, 0.0) + (elapsed - entry[2]) * 1000
+
+    def end_frame(self):
+        if not self.recording or self._frame_start is None: return
+        now = time.perf_counter()
+        frame_ms = (now - self._frame_start) * 1000
+        sections = self._frame_sections
+        sections[OTHER_SECTION] = max(0.0, frame_ms - sum(sections.values()))
+        for name in sections:
+            if name not in self.sections: self.sections.append(name)
+        self.history.append((frame_ms, sections))
+        if len(self.recorded) < PROFILER_MAX_RECORDED_FRAMES:
+            self.recorded.append((self._frame_start - self._record_start, frame_ms, sections))
+        self._frame_start = None
+        if self.visible: self._add_graph_column(frame_ms, sections)
+
+    def summary(self, frames=None):
+        """{'frame' or section: {'mean', 'p50', 'p95', 'p99', 'max'}} in ms over `frames` (default: the history)."""
+        frames = list(self.history) if frames is None else frames
+        columns = {'frame': [frame_ms for frame_ms, _ in frames]}
+        for name in self.sections: columns[name] = [sections.get(name, 0.0) for _, sections in frames]
+        result = {}
+        for name, values in columns.items():
+            values.sort()
+            result[name] = {
+                'mean': sum(values) / len(values) if values else 0.0,
+                'p50': percentile(values, 50), 'p95': percentile(values, 95), 'p99': percentile(values, 99),
+                'max': values[-1] if values else 0.0,
+            }
+        return result
+
+    def _color(self, name):
+        return PROFILER_SECTION_COLORS[self.sections.index(name) % len(PROFILER_SECTION_COLORS)]
+
+    def _add_graph_column(self, frame_ms, sections):
+        if self._graph is None:
+            self._graph = pygame.Surface((PROFILER_HISTORY_FRAMES, PROFILER_GRAPH_HEIGHT), pygame.SRCALPHA)
+            self._graph.fill((0, 0, 0, 0))
+        graph = self._graph
+        graph.scroll(-1, 0)
+        x = PROFILER_HISTORY_FRAMES - 1
+        graph.fill((0, 0, 0, 0), (x, 0, 1, PROFILER_GRAPH_HEIGHT))
+        scale = PROFILER_GRAPH_HEIGHT / PROFILER_GRAPH_MAX_MS
+        bottom = PROFILER_GRAPH_HEIGHT
+        for name in self.sections: # Stacked bottom-up in a stable order
+            height = sections.get(name, 0.0) * scale
+            if height <= 0 or bottom <= 0: continue
+            top = max(0, int(round(bottom - height)))
+            if top < bottom: graph.fill(self._color(name), (x, top, 1, bottom - top))
+            bottom = top
+        if frame_ms > PROFILER_GRAPH_MAX_MS: graph.fill(DMG_WARN_TEXT, (x, 0, 1, 2)) # Clipped spike marker
+
+    def _render_text_panel(self, font):
+        stats = self.summary()
+        frame = stats['frame']
+        lines = [(f"frame  mean {frame['mean']:.1f}  p95 {frame['p95']:.1f}  p99 {frame['p99']:.1f}  max {frame['max']:.1f} ms", DMG_LIGHT_TEXT)]
+        for name in self.sections:
+            s = stats[name]
+            lines.append((f"{name:<8} {s['mean']:5.2f}  p95 {s['p95']:5.2f}  max {s['max']:6.2f}", self._color(name)))
+        # Numbers change every refresh, so they skip the shared text cache
+        surfaces = [font.render(text, True, color) for text, color in lines]
+        panel = pygame.Surface((max(s.get_width() for s in surfaces), sum(s.get_height() for s in surfaces)), pygame.SRCALPHA)
+        y = 0
+        for surface in surfaces:
+            panel.blit(surface, (0, y))
+            y += surface.get_height()
+        return panel
+
+    def draw(self, surface, topleft, font):
+        if not self.visible or not self.history: return
+        now = time.perf_counter()
+        if self._text_panel is None or now - self._text_refreshed >= PROFILER_TEXT_REFRESH:
+            self._text_panel = self._render_text_panel(font)
+            self._text_refreshed = now
+        padding = 6
+        width = max(PROFILER_HISTORY_FRAMES, self._text_panel.get_width()) + 2 * padding
+        height = PROFILER_GRAPH_HEIGHT + self._text_panel.get_height() + 3 * padding
+        panel_rect = pygame.Rect(topleft, (width, height))
+        if self._backdrop is None or self._backdrop.get_size() != panel_rect.size:
+            self._backdrop = pygame.Surface(panel_rect.size, pygame.SRCALPHA)
+            self._backdrop.fill((*DMG_DARK_BG, 215))
+        surface.blit(self._backdrop, panel_rect)
+        pygame.draw.rect(surface, DMG_UI_BORDER, panel_rect, 1)
+        graph_rect = pygame.Rect(panel_rect.left + padding, panel_rect.top + padding, PROFILER_HISTORY_FRAMES, PROFILER_GRAPH_HEIGHT)
+        budget_y = graph_rect.bottom - int(PROFILER_GRAPH_HEIGHT * (1000.0 / FPS) / PROFILER_GRAPH_MAX_MS)
+        pygame.draw.line(surface, DMG_DIM_TEXT, (graph_rect.left, budget_y), (graph_rect.right - 1, budget_y)) # One frame at FPS
+        if self._graph is not None: surface.blit(self._graph, graph_rect)
+        surface.blit(self._text_panel, (graph_rect.left, graph_rect.bottom + padding))
+
+    def export(self, path):
+        """Writes the recorded frames as CSV (one row per frame) or, for .json paths, frames plus summary."""
+        names = list(self.sections)
+        if path.lower().endswith('.json'):
+            data = {
+                'sections': names,
+                'summary': self.summary([(frame_ms, sections) for _, frame_ms, sections in self.recorded]),
+                'frames': [{'t': round(t, 4), 'frame_ms': round(frame_ms, 3), **{n: round(sections.get(n, 0.0), 3) for n in names}}
+                           for t, frame_ms, sections in self.recorded],
+            }
+            with open(path, "w", encoding="utf-8") as f: json.dump(data, f, indent=1)
+        else:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(['t', 'frame_ms', *names])
+                for t, frame_ms, sections in self.recorded:
+                    writer.writerow([f"{t:.4f}", f"{frame_ms:.3f}", *(f"{sections.get(n, 0.0):.3f}" for n in names)])
@@ -0,0 +1,107 @@
+from array import array
+from maze_grid import CELL_WALL
+
+NO_COMPONENT = -1
+
+
+class ReachabilityIndex:
+    """
+    Strongly connected components of a maze's move graph (slides and portals included) plus the
+    transitive closure of their condensation. components[i] is the component of cell i
+    (NO_COMPONENT for walls); closure[c] is a bitset (Python int) of every component reachable
+    from c, itself included. Any "can I get from A to B" question is two lookups and a shift.
+    """
+    def __init__(self, width, components, closure):
+        self.width = width
+        self.components = components
+        self.closure = closure
+        self.num_components = len(closure)
+
+    def component(self, pos):
+        x, y = pos
+        return self.components[y * self.width + x]
+
+    def is_reachable(self, from_pos, to_pos):
+        source, target = self.component(from_pos), self.component(to_pos)
+        if source == NO_COMPONENT or target == NO_COMPONENT: return False
+        return (self.closure[source] >> target) & 1 == 1
+
+    def all_reachable(self, from_pos, targets):
+        return all(self.is_reachable(from_pos, target) for target in targets)
+
+    def cells_off_route(self, from_pos, to_pos, cells):
+        """The flat indices among `cells` that are not on any from_pos -> cell -> to_pos route."""
+        import numpy as np
+        source, target = self.component(from_pos), self.component(to_pos)
+        on_route = np.zeros(self.num_components + 1, dtype=bool) # Last slot catches NO_COMPONENT (-1)
+        if source != NO_COMPONENT and target != NO_COMPONENT:
+            reachable = self.closure[source]
+            for c in range(self.num_components):
+                on_route[c] = (reachable >> c) & 1 and (self.closure[c] >> target) & 1
+        cells = np.frombuffer(cells, dtype=np.int32)
+        components = np.frombuffer(self.components, dtype=np.int32)[cells]
+        return cells[~on_route[components]].tolist()
+
+    def same_component(self, pos_a, pos_b):
+        component = self.component(pos_a)
+        return component != NO_COMPONENT and component == self.component(pos_b)
+
+
+def build_reachability(maze):
+    """Labels the components of maze.get_transition_table() with an iterative Tarjan, then ORs closures sinks-first."""
+    table = maze.get_transition_table()
+    flags = maze.grid.flags
+    offsets, targets = table.offsets, table.targets
+    num_cells = maze.width * maze.height
+
+    order_index = [-1] * num_cells # DFS discovery order (lists index faster than arrays here)
+    low = [0] * num_cells
+    components = array('i', [NO_COMPONENT]) * num_cells
+    on_stack = [False] * num_cells
+    stack = []
+    finished = [] # Cells in the order their component was closed, so components come out grouped
+    counter = 0
+    num_components = 0
+
+    for root in range(num_cells):
+        if order_index[root] != -1 or flags[root] & CELL_WALL: continue
+        order_index[root] = low[root] = counter; counter += 1
+        stack.append(root); on_stack[root] = True
+        work = [(root, offsets[root])]
+        while work:
+            v, e = work[-1]
+            end = offsets[v + 1]
+            while e < end:
+                w = targets[e]
+                e += 1
+                if order_index[w] == -1:
+                    work[-1] = (v, e)
+                    order_index[w] = low[w] = counter; counter += 1
+                    stack.append(w); on_stack[w] = True
+                    work.append((w, offsets[w]))
+                    break
+                if on_stack[w] and order_index[w] < low[v]: low[v] = order_index[w]
+            else:
+                work.pop()
+                if low[v] == order_index[v]:
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        components[w] = num_components
+                        finished.append(w)
+                        if w == v: break
+                    num_components += 1
+                if work:
+                    u = work[-1][0]
+                    if low[v] < low[u]: low[u] = low[v]
+
+    # Tarjan closes components in reverse topological order: every edge leaving component c
+    # points to a lower id, whose closure is already complete when c's cells come up
+    closure = [1 << c for c in range(num_components)]
+    for v in finished:
+        c = components[v]
+        for e in range(offsets[v], offsets[v + 1]):
+            d = components[targets[e]]
+            if d != c: closure[c] |= closure[d]
+
+    return ReachabilityIndex(maze.width, components, closure)
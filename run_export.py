@@ -0,0 +1,174 @@
+# run_export.py
+import argparse
+import os
+import random
+import shutil
+import struct
+import subprocess
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+from constants import (
+    CELL_SIZE, FPS, MAZE_WIDTH, MAZE_HEIGHT, MAZE_LOOP_CHANCE, DMG_DARK_BG,
+    BASE_PUDDLES, PUDDLES_PER_KEY_INCREASE, BASE_SLIDES, SLIDES_PER_KEY_INCREASE, MAX_PORTAL_PAIRS
+)
+from camera import Camera
+from maze import Maze
+
+# Renders an AlgorithmRunner session off-screen at a fixed simulated frame rate, with no waiting
+# between frames, and writes it as numbered PNGs (output is a directory) or, through ffmpeg,
+# as an animated file (.gif, .mp4, .webm, ...).
+#   python run_export.py BFS runs/bfs --size 101 101 --keys 2 --seed 7
+#   python run_export.py Q-Learn qlearn.mp4 --maze saved.maze --frame-step 4
+
+
+def _init_headless():
+    """Brings up just enough of pygame to draw: the dummy video driver (unless a display is already open) and fonts."""
+    if pygame.display.get_surface() is None:
+        if not pygame.display.get_init(): os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        pygame.display.init()
+        pygame.display.set_mode((1, 1)) # convert()/convert_alpha() need a display surface
+    pygame.font.init()
+
+
+def _png_chunk(tag, data):
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+
+def _write_png(path, rgb, size):
+    """
+    Writes raw RGB bytes as a PNG with fast (level 1) compression, roughly twice as quick as
+    pygame.image.save. zlib releases the GIL, so several frames can be encoded at once.
+    """
+    width, height = size
+    stride = width * 3
+    scanlines = b''.join(b'\0' + rgb[y * stride:(y + 1) * stride] for y in range(height)) # Filter type 0 on every row
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(_png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(_png_chunk(b'IDAT', zlib.compress(scanlines, 1)))
+        f.write(_png_chunk(b'IEND', b''))
+
+
+class _PngSequenceWriter:
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.count = 0
+        self._workers = os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(self._workers)
+        self._pending = deque()
+
+    def write(self, surface):
+        path = os.path.join(self.directory, f"frame_{self.count:05d}.png")
+        self._pending.append(self._executor.submit(_write_png, path, pygame.image.tobytes(surface, "RGB"), surface.get_size()))
+        self.count += 1
+        while len(self._pending) > 2 * self._workers: self._pending.popleft().result() # Bounds the frames held in memory
+
+    def close(self):
+        try:
+            while self._pending: self._pending.popleft().result()
+        finally:
+            self._executor.shutdown()
+
+
+class _FfmpegWriter:
+    """Pipes raw RGB frames into ffmpeg, which picks the container and codec from the file extension."""
+    def __init__(self, path, size, fps):
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None: raise RuntimeError(f"Writing '{path}' needs ffmpeg on the PATH; export to a directory for PNG frames instead.")
+        command = [ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24",
+                   "-s", f"{size[0]}x{size[1]}", "-r", f"{fps:g}", "-i", "-"]
+        if not path.lower().endswith(".gif"): # Most video codecs want yuv420p, which needs even dimensions
+            command += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p"]
+        self.process = subprocess.Popen(command + [path], stdin=subprocess.PIPE)
+        self.count = 0
+
+    def write(self, surface):
+        self.process.stdin.write(pygame.image.tobytes(surface, "RGB"))
+        self.count += 1
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait() != 0: raise RuntimeError(f"ffmpeg exited with status {self.process.returncode}")
+
+
+def export_run(maze, solver_name, out_path, fps=FPS, speed=1.0, frame_step=1, cell_size=None, max_frames=None, heatmap=False):
+    """
+    Runs `solver_name` (a key of game.SOLVER_CLASSES) on `maze` the way the game does, advancing
+    1/fps of simulated time per frame, and writes every frame_step-th frame to out_path. The
+    whole maze is drawn at cell_size (default: the maze's own); heatmap=True shows expansion counts
+    instead of the visited/frontier overlay. Returns the number of frames written.
+    """
+    _init_headless()
+    from game import AlgorithmRunner, SOLVER_CLASSES # After pygame is up: game pulls in the UI modules
+    if solver_name not in SOLVER_CLASSES:
+        raise ValueError(f"Unknown solver '{solver_name}'. Choose from: {', '.join(SOLVER_CLASSES)}")
+    cell_size = cell_size or maze.cell_size
+    camera = Camera(maze.width * cell_size, maze.height * cell_size, cell_size, ())
+    camera.set_world(maze.width, maze.height)
+    frame = pygame.Surface((camera.view_width, camera.view_height))
+    if os.path.splitext(out_path)[1]: writer = _FfmpegWriter(out_path, frame.get_size(), fps / frame_step)
+    else: writer = _PngSequenceWriter(out_path)
+
+    runner = AlgorithmRunner(SOLVER_CLASSES[solver_name](maze), maze, [speed])
+    runner.show_heatmap = heatmap
+    runner.start_solving_process()
+    dt = 1.0 / fps
+    step = 0
+    try:
+        while True:
+            done = runner.is_done()
+            if step % frame_step == 0 or done: # Frames that are not kept are simulated but never drawn
+                frame.fill(DMG_DARK_BG)
+                maze.draw(frame, camera)
+                runner.draw(frame, camera)
+                writer.write(frame)
+            if done or (max_frames is not None and writer.count >= max_frames): break
+            if hasattr(maze, 'update'): maze.update(dt * speed)
+            runner.update(dt)
+            step += 1
+    finally:
+        writer.close()
+    return writer.count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a solver run off-screen to PNG frames or an animated file.")
+    parser.add_argument("solver", help="Solver name as shown in the game, e.g. BFS, A*, Q-Learn")
+    parser.add_argument("out", help="Directory for a PNG sequence, or a file such as run.gif / run.mp4 (needs ffmpeg)")
+    parser.add_argument("--maze", help="Maze file written by maze_io.save_maze (default: generate one)")
+    parser.add_argument("--size", type=int, nargs=2, metavar=("W", "H"), default=(MAZE_WIDTH, MAZE_HEIGHT))
+    parser.add_argument("--keys", type=int, default=0)
+    parser.add_argument("--seed", type=int, help="Seeds maze generation and the randomized solvers")
+    parser.add_argument("--fps", type=float, default=FPS, help="Simulated frames per second")
+    parser.add_argument("--speed", type=float, default=1.0, help="Game speed multiplier")
+    parser.add_argument("--frame-step", type=int, default=1, help="Keep every Nth simulated frame")
+    parser.add_argument("--cell-size", type=int, help="Pixels per cell in the output (default: %d)" % CELL_SIZE)
+    parser.add_argument("--max-frames", type=int)
+    parser.add_argument("--heatmap", action="store_true", help="Draw per-cell expansion counts instead of visited/frontier cells")
+    args = parser.parse_args(argv)
+
+    if args.seed is not None: random.seed(args.seed)
+    if args.maze:
+        from maze_io import load_maze
+        maze = load_maze(args.maze)
+    else:
+        keys = args.keys if args.solver != "SPO" else 0 # Same rule as the game: SPO runs without keys
+        maze = Maze(args.size[0], args.size[1], CELL_SIZE, keys, BASE_PUDDLES + PUDDLES_PER_KEY_INCREASE * keys,
+                    BASE_SLIDES + SLIDES_PER_KEY_INCREASE * keys, min(keys // 2, MAX_PORTAL_PAIRS), MAZE_LOOP_CHANCE, seed=args.seed)
+    started = time.perf_counter()
+    try:
+        count = export_run(maze, args.solver, args.out, args.fps, args.speed, max(1, args.frame_step), args.cell_size, args.max_frames, args.heatmap)
+    except (ValueError, RuntimeError) as e:
+        print(f"Export failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Wrote {count} frames to '{args.out}' in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+import numpy as np
+import pygame
+from collections import deque
+from constants import VISITED_NODE_COLOR_ALGO, FRONTIER_NODE_COLOR_ALGO, HEATMAP_COLOR_STOPS, HEATMAP_ALPHA
+from solvers.base_solver import VIZ_RESET, VIZ_VISIT, VIZ_PUSH, VIZ_POP
+
+
+def _over(top, bottom):
+    """RGBA of `top` alpha-composited over `bottom` (both 0-255 RGBA tuples)."""
+    top_a, bottom_a = top[3] / 255, bottom[3] / 255
+    alpha = top_a + bottom_a * (1 - top_a)
+    if alpha == 0: return (0, 0, 0, 0)
+    rgb = [(t * top_a + b * bottom_a * (1 - top_a)) / alpha for t, b in zip(top[:3], bottom[:3])]
+    return (*(round(c) for c in rgb), round(alpha * 255))
+
+
+def _draw_cell_layer(layer, cell_size, surface, camera):
+    """Blits a one-pixel-per-cell layer scaled up to cells: all of it at cell_size, or just the cells in the camera's view."""
+    if camera is None:
+        width, height = layer.get_size()
+        surface.blit(pygame.transform.scale(layer, (width * cell_size, height * cell_size)), (0, 0))
+        return
+    x0, y0, x1, y1 = camera.visible_cells()
+    if x1 <= x0 or y1 <= y0: return
+    cell_size = camera.cell_size
+    cells = layer.subsurface((x0, y0, x1 - x0, y1 - y0))
+    surface.blit(pygame.transform.scale(cells, ((x1 - x0) * cell_size, (y1 - y0) * cell_size)), camera.cell_to_view(x0, y0))
+
+
+class SearchOverlay:
+    """
+    Persistent SRCALPHA layer with the visited / frontier cells of a search, one pixel per cell.
+    Solvers that keep a viz_log only cost the cells their last steps touched; others are redrawn
+    from their viz sets only when those change. A frame scales the cells in view up to the
+    camera's cell size and blits them once.
+    """
+    def __init__(self, width, height, cell_size):
+        self.cell_size = cell_size # Cell size draw() uses without a camera
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        # Cell colours by (visited, on frontier); frontier is painted over visited like the old per-node blits
+        self._colors = {
+            (False, False): (0, 0, 0, 0),
+            (True, False): VISITED_NODE_COLOR_ALGO,
+            (False, True): FRONTIER_NODE_COLOR_ALGO,
+            (True, True): _over(FRONTIER_NODE_COLOR_ALGO, VISITED_NODE_COLOR_ALGO),
+        }
+        self.reset()
+
+    def reset(self):
+        self.surface.fill((0, 0, 0, 0))
+        self.visited = set()
+        self.frontier_counts = {} # pos -> number of pending frontier entries (heaps may hold duplicates)
+        self._signature = None
+
+    def _paint(self, pos):
+        self.surface.set_at(pos, self._colors[(pos in self.visited, pos in self.frontier_counts)])
+
+    def sync(self, solver):
+        log = getattr(solver, 'viz_log', None)
+        if log is not None:
+            self._apply_log(log)
+            del log[:]
+        else:
+            self._rebuild_if_changed(solver)
+
+    def _apply_log(self, log):
+        visited, frontier_counts = self.visited, self.frontier_counts
+        for kind, pos in log:
+            if kind == VIZ_RESET:
+                self.reset()
+                visited, frontier_counts = self.visited, self.frontier_counts
+                continue
+            if kind == VIZ_VISIT:
+                visited.add(pos)
+            elif kind == VIZ_PUSH:
+                frontier_counts[pos] = frontier_counts.get(pos, 0) + 1
+            elif kind == VIZ_POP:
+                count = frontier_counts.get(pos, 0) - 1
+                if count > 0: frontier_counts[pos] = count
+                else: frontier_counts.pop(pos, None)
+            self._paint(pos)
+
+    def _rebuild_if_changed(self, solver):
+        visited = getattr(solver, 'viz_visited_nodes', None) or ()
+        frontier = getattr(solver, 'viz_frontier', None)
+        if not isinstance(frontier, deque): frontier = getattr(solver, 'viz_frontier_heap', None) or ()
+        signature = (id(visited), len(visited), id(frontier), len(frontier))
+        if signature == self._signature: return
+        self.reset()
+        self._signature = signature
+        self.visited = set(visited)
+        for item in frontier:
+            pos = item if isinstance(frontier, deque) else (item[2] if len(item) > 2 else None) # Heaps hold (priority, count, pos)
+            if isinstance(pos, tuple) and len(pos) == 2: self.frontier_counts[pos] = 1
+        for pos in self.visited | set(self.frontier_counts): self._paint(pos)
+
+    def draw(self, surface, camera=None):
+        _draw_cell_layer(self.surface, self.cell_size, surface, camera)
+
+
+class ExpansionHeatmap:
+    """
+    A solver's expansion_counts as one colour-mapped SRCALPHA layer, one pixel per cell. The layer
+    is rebuilt through surfarray only when the counts change; cells never expanded stay clear.
+    Counts are log scaled so a few hot cells do not flatten everything else into the coldest colour.
+    """
+    def __init__(self, width, height, cell_size):
+        self.cell_size = cell_size # Cell size draw() uses without a camera
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.max_count = 0
+        self._signature = None
+        # Colour per level 0-255; level 0 (never expanded) is transparent
+        stops = np.linspace(0, 255, len(HEATMAP_COLOR_STOPS))
+        levels = np.arange(256)
+        self._lut = np.zeros((256, 4), dtype=np.uint8)
+        for channel in range(3):
+            self._lut[:, channel] = np.interp(levels, stops, [color[channel] for color in HEATMAP_COLOR_STOPS])
+        self._lut[1:, 3] = HEATMAP_ALPHA
+
+    def sync(self, counts):
+        signature = (id(counts), int(counts.sum()))
+        if signature == self._signature: return # Counts only grow between resets, so an equal sum means no change
+        self._signature = signature
+        self.max_count = int(counts.max())
+        if self.max_count > 0:
+            levels = np.log1p(counts) * (254 / np.log1p(self.max_count))
+            levels = np.where(counts > 0, levels.astype(np.uint8) + 1, 0)
+        else:
+            levels = np.zeros(counts.shape, dtype=np.uint8)
+        colors = self._lut[levels.T] # surfarray indexes (x, y)
+        pygame.surfarray.pixels3d(self.surface)[...] = colors[..., :3]
+        pygame.surfarray.pixels_alpha(self.surface)[...] = colors[..., 3]
+
+    def draw(self, surface, camera=None):
+        _draw_cell_layer(self.surface, self.cell_size, surface, camera)
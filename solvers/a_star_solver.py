@@ -1,11 +1,16 @@
 import heapq
-from .base_solver import BaseSolver 
+from .base_solver import BaseSolver, VIZ_RESET, VIZ_VISIT, VIZ_PUSH, VIZ_POP
+from .bidirectional import bidirectional_astar
 
 class AStarSolver(BaseSolver):
-    def __init__(self, maze_instance): 
+    def __init__(self, maze_instance, optimal_key_order=False, use_corridors=True, bidirectional=False):
         super().__init__(maze_instance)
+        self.optimal_key_order = optimal_key_order
+        self.use_corridors = use_corridors
+        self.bidirectional = bidirectional
         self.viz_frontier_heap = []
         self.viz_visited_nodes = set()
+        self.viz_log = []
         self.viz_came_from = {}
         self._viz_heap_count = 0
         self._viz_initialized_astar = False 
@@ -14,14 +19,23 @@ class AStarSolver(BaseSolver):
         self.belief_data_map = None 
         self.belief_get_neighbors_func = None 
 
-    def _get_neighbors_and_costs_for_astar(self, current_pos):
+    def _get_successors_for_astar(self, current_pos):
         if self.use_belief_data and self.belief_get_neighbors_func:
-            return self.belief_get_neighbors_func(current_pos, set()) 
+            return [(n['pos'], n['cost']) for n in self.belief_get_neighbors_func(current_pos, set())]
         else: 
-            return super().get_neighbors_and_costs(current_pos)
+            return self.get_successors(current_pos)
 
 
+    def _successors_for(self, endpoints):
+        """Successor function for a search between endpoints, and the CorridorGraph it walks (None for cells)."""
+        graph = None if self.use_belief_data else self._corridor_graph_for(endpoints)
+        if graph is None: return self._get_successors_for_astar, graph
+        return (lambda pos: self._without_dead_ends(graph.successors(pos))), graph
+
     def _core_search_logic(self, start_node, target_node):
+        if self.bidirectional and not self.use_belief_data and self.can_search_backward():
+            return self._bidirectional_search(start_node, target_node)
+        get_successors, graph = self._successors_for((start_node, target_node))
         self.came_from = {start_node: None}
         self.cost_so_far = {start_node: 0}
 
@@ -33,20 +47,21 @@ class AStarSolver(BaseSolver):
                         start_node))
         
         nodes_this_segment = 0
+        counts = self.expansion_counts
         
         while local_heap:
             f_val, _, current_node = heapq.heappop(local_heap)
 
             nodes_this_segment += 1
+            if counts is not None: counts[current_node[1], current_node[0]] += 1
 
             if current_node == target_node:
                 path = self.reconstruct_path_from_came_from(target_node, start_node) 
+                if graph is not None: path = graph.expand_path(path)
                 cost = self.cost_so_far.get(target_node, float('inf'))
                 return path, cost, nodes_this_segment, True
 
-            for neighbor_info in self._get_neighbors_and_costs_for_astar(current_node):
-                neighbor_node = neighbor_info['pos']
-                cost_to_neighbor_action = neighbor_info['cost']
+            for neighbor_node, cost_to_neighbor_action in get_successors(current_node):
 
                 new_g_cost_for_neighbor = self.cost_so_far.get(current_node, float('inf')) + cost_to_neighbor_action
 
@@ -59,6 +74,68 @@ class AStarSolver(BaseSolver):
         
         return [], float('inf'), nodes_this_segment, False
 
+    def _bidirectional_search(self, start_node, target_node):
+        """
+        _core_search_logic as bidirectional_astar, on the corridor graph when it covers both ends. A portal
+        can beat the Manhattan distance, so on mazes with portals the search runs without a heuristic
+        (bidirectional Dijkstra): still exact, but then its cost can be lower than forward A*'s, which
+        keeps the inadmissible Manhattan guide.
+        """
+        get_successors, graph = self._successors_for((start_node, target_node))
+        get_predecessors = self.get_predecessors if graph is None else (lambda pos: self._without_dead_ends(graph.predecessors(pos)))
+        heuristic = None if self.maze.portals else self.manhattan_heuristic
+        path, cost, nodes = bidirectional_astar(start_node, target_node, get_successors, get_predecessors,
+                                                heuristic, self.expansion_counts)
+        if graph is not None: path = graph.expand_path(path)
+        return path, cost, nodes, bool(path)
+
+    def _core_search_logic_multi(self, start_node, targets):
+        """
+        One A* toward all targets at once, guided by the Manhattan distance to the nearest. After the first
+        target is popped, nodes with the same f are still expanded so an equally cheap target listed earlier
+        wins the tie, as with one search per target.
+        """
+        if self.bidirectional and len(targets) == 1: # One target: nothing to share, so search it from both ends
+            path, cost, nodes, found = self._core_search_logic(start_node, targets[0])
+            return (targets[0] if found else None), path, cost, nodes, found
+        rank = {target: i for i, target in enumerate(targets)}
+        def heuristic(pos):
+            return min(abs(pos[0] - tx) + abs(pos[1] - ty) for tx, ty in rank)
+
+        get_successors, graph = self._successors_for((start_node, *targets))
+        self.came_from = {start_node: None}
+        self.cost_so_far = {start_node: 0}
+        local_heap = [(heuristic(start_node), 0, start_node)]
+        heap_entry_count = 0
+        nodes_this_segment = 0
+        counts = self.expansion_counts
+        best_target = None
+
+        while local_heap:
+            f_val, _, current_node = heapq.heappop(local_heap)
+            if best_target is not None and f_val > self.cost_so_far[best_target]: break
+
+            nodes_this_segment += 1
+            if counts is not None: counts[current_node[1], current_node[0]] += 1
+
+            if current_node in rank:
+                if best_target is None or (self.cost_so_far[current_node] == self.cost_so_far[best_target]
+                                           and rank[current_node] < rank[best_target]):
+                    best_target = current_node
+
+            for neighbor_node, cost_to_neighbor_action in get_successors(current_node):
+                new_g_cost_for_neighbor = self.cost_so_far[current_node] + cost_to_neighbor_action
+                if new_g_cost_for_neighbor < self.cost_so_far.get(neighbor_node, float('inf')):
+                    self.cost_so_far[neighbor_node] = new_g_cost_for_neighbor
+                    heap_entry_count += 1
+                    heapq.heappush(local_heap, (new_g_cost_for_neighbor + heuristic(neighbor_node), heap_entry_count, neighbor_node))
+                    self.came_from[neighbor_node] = current_node
+
+        if best_target is None: return None, [], float('inf'), nodes_this_segment, False
+        path = self.reconstruct_path_from_came_from(best_target, start_node)
+        if graph is not None: path = graph.expand_path(path)
+        return best_target, path, self.cost_so_far[best_target], nodes_this_segment, True
+
     def solve_step_visualize(self):
         if not self._viz_initialized_astar:
             self._viz_target = self.exit_pos
@@ -72,6 +149,8 @@ class AStarSolver(BaseSolver):
             heapq.heappush(self.viz_frontier_heap, 
                            (initial_g_cost + initial_h_cost, self._viz_heap_count, self.start_pos))
             
+            self.viz_log.append((VIZ_RESET, None))
+            self.viz_log.append((VIZ_PUSH, self.start_pos))
             self.viz_came_from = {self.start_pos: None}
             self.viz_visited_nodes = set() 
             self.viz_cost_so_far_g = {self.start_pos: 0} # Track g-costs for viz
@@ -85,11 +164,13 @@ class AStarSolver(BaseSolver):
             self._viz_initialized_astar = False; return True
 
         _, _, current_viz_pos = heapq.heappop(self.viz_frontier_heap)
+        self.viz_log.append((VIZ_POP, current_viz_pos))
 
         if current_viz_pos in self.viz_visited_nodes : 
             return False if self.viz_frontier_heap else True 
 
         self.viz_visited_nodes.add(current_viz_pos)
+        self.viz_log.append((VIZ_VISIT, current_viz_pos))
         self.nodes_expanded += 1
 
         if current_viz_pos == self._viz_target:
@@ -97,9 +178,7 @@ class AStarSolver(BaseSolver):
             self.path_found = True
             self._viz_initialized_astar = False; return True
 
-        for neighbor_info in self.get_neighbors_and_costs(current_viz_pos): # Use standard get_neighbors
-            neighbor_pos = neighbor_info['pos']
-            action_cost = neighbor_info['cost']
+        for neighbor_pos, action_cost in self.get_successors(current_viz_pos):
             
             new_g_cost = self.viz_cost_so_far_g.get(current_viz_pos, float('inf')) + action_cost
 
@@ -112,6 +191,7 @@ class AStarSolver(BaseSolver):
                 
                 self._viz_heap_count += 1
                 heapq.heappush(self.viz_frontier_heap, (f_cost_neighbor, self._viz_heap_count, neighbor_pos))
+                self.viz_log.append((VIZ_PUSH, neighbor_pos))
         
         if self.nodes_expanded > self.width * self.height * 1.5: 
              self._viz_initialized_astar = False
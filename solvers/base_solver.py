@@ -1,8 +1,19 @@
 from abc import ABC, abstractmethod
 import heapq 
-from constants import MUD_COST_ALGO, PORTAL_COST_ALGO, SLIDE_CELL_COST_ALGO
+import numpy as np
+from .key_order import plan_key_order
+
+# Search-overlay events a solver appends to viz_log while visualizing: (kind, pos), or (VIZ_RESET, None)
+VIZ_RESET = 'reset'
+VIZ_VISIT = 'visit'
+VIZ_PUSH = 'push'
+VIZ_POP = 'pop'
 
 class BaseSolver(ABC):
+    # False for solvers that never read moves through get_successors/is_dead_end (SPO plans on its
+    # belief map); prune_dead_ends is then ignored and no pruned cells are reported
+    supports_dead_end_view = True
+
     def __init__(self, maze_instance):
         self.maze = maze_instance # Keep a reference to the full Maze object
         if self.maze:
@@ -27,6 +38,34 @@ class BaseSolver(ABC):
         self.came_from = {}
         self.cost_so_far = {} # Cost from start_node of the current core search segment
 
+        # Frontier-based solvers make this a list of VIZ_* events so the runner can draw incrementally;
+        # None means the runner redraws from viz_visited_nodes / viz_frontier whenever they change
+        self.viz_log = None
+
+        # (height, width) count of expansions per cell over every search since solve_all_stages() started;
+        # None unless track_expansions() asked for it (the heatmap view), so plain solves pay nothing
+        self.expansion_counts = None
+
+        # Solvers that leave solve_all_stages to BaseSolver can set this to plan the key order up front
+        # (one search per start/key, then an exact ordering) instead of choosing the nearest key each round
+        self.optimal_key_order = False
+
+        # Cost-ordered searches can opt in to running on the maze's corridor graph (corridors.py) whenever
+        # their endpoints are nodes of it, then expand the node path back into cells
+        self.use_corridors = False
+
+        # Search the maze's dead-end-filled view (Maze.get_dead_end_mask): filled cells act as walls
+        self.prune_dead_ends = False
+
+        # BFS and A* can run each start-to-target segment as a bidirectional search (solvers/bidirectional.py)
+        self.bidirectional = False
+
+    def track_expansions(self, enabled=True):
+        self.expansion_counts = np.zeros((self.height, self.width), dtype=np.int32) if enabled else None
+
+    def _reset_expansion_counts(self):
+        if self.expansion_counts is not None: self.expansion_counts.fill(0)
+
     def _get_slide_endpoint_and_cost_factor(self, water_entry_x, water_entry_y, entry_dx, entry_dy):
         # ... (logic trượt nước) ...
         cx, cy = water_entry_x, water_entry_y 
@@ -43,32 +82,56 @@ class BaseSolver(ABC):
                 cx, cy = next_cx, next_cy
                 slid_cells_count += 1
 
+    def get_successors(self, current_pos):
+        """
+        [(next_pos, cost), ...] for every move out of current_pos.
+        Read straight from the maze's precomputed transition table (slides/portals already resolved).
+        """
+        return self._without_dead_ends(self.maze.get_transition_table().successors(current_pos[0], current_pos[1]))
+
+    def get_predecessors(self, current_pos):
+        """[(previous_pos, cost), ...] for every move that lands on current_pos; needs can_search_backward()."""
+        return self._without_dead_ends(self.maze.get_transition_table().predecessors(current_pos[0], current_pos[1]))
+
+    def can_search_backward(self):
+        """False for mazes whose moves are resolved on demand (TiledMaze): a slide can land from too far away to look up."""
+        return hasattr(self.maze.get_transition_table(), 'predecessors')
+
+    def _dead_end_mask(self):
+        return self.maze.get_dead_end_mask() if self.prune_dead_ends and self.supports_dead_end_view else None
+
+    def is_dead_end(self, pos):
+        """True if pos is filled in the dead-end view this solver searches."""
+        filled = self._dead_end_mask()
+        return filled is not None and filled[pos[1] * self.width + pos[0]] == 1
+
+    def _without_dead_ends(self, successors):
+        filled = self._dead_end_mask()
+        if filled is None: return successors
+        width = self.width
+        return [(pos, cost) for pos, cost in successors if not filled[pos[1] * width + pos[0]]]
+
+    def targets_reachable(self, from_pos, targets):
+        """
+        O(1) per target via the maze's reachability index, so hopeless searches are never started.
+        Mazes without an index (TiledMaze) answer True and leave it to the search.
+        """
+        reachability = self.maze.get_reachability()
+        return reachability is None or reachability.all_reachable(from_pos, targets)
+
+    def sequence_reachable(self, positions):
+        """True if every position can be reached from the one before it (fixed-order solvers)."""
+        return all(self.targets_reachable(a, (b,)) for a, b in zip(positions, positions[1:]))
+
+    def _corridor_graph_for(self, positions):
+        """The maze's CorridorGraph when use_corridors is on and every position is one of its nodes, else None."""
+        if not self.use_corridors: return None
+        graph = self.maze.get_corridor_graph()
+        if graph is None or not all(graph.is_node(pos) for pos in positions): return None
+        return graph
+
     def get_neighbors_and_costs(self, current_pos):
-        x, y = current_pos
-        potential_neighbors = []
-        for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]: 
-            next_x, next_y = x + dx, y + dy
-            if self.maze.is_wall(next_x, next_y):
-                continue
-            cost_to_step_onto_next_tile = 1
-            if self.maze.is_mud(next_x, next_y): 
-                cost_to_step_onto_next_tile = self.maze.MUD_COST_FOR_ALGORITHM
-            if self.maze.is_water(next_x, next_y):
-                land_pos, num_slid_cells = self._get_slide_endpoint_and_cost_factor(next_x, next_y, dx, dy)
-                slide_travel_cost = num_slid_cells * self.maze.SLIDE_CELL_COST_FOR_ALGORITHM
-                total_move_cost = cost_to_step_onto_next_tile + slide_travel_cost
-                potential_neighbors.append({'pos': land_pos, 'cost': total_move_cost})
-            elif self.maze.is_portal(next_x, next_y):
-                portal_target_pos = self.maze.get_portal_target(next_x, next_y)
-                if portal_target_pos:
-                    portal_usage_cost = self.maze.PORTAL_COST_FOR_ALGORITHM
-                    total_move_cost = cost_to_step_onto_next_tile + portal_usage_cost
-                    potential_neighbors.append({'pos': portal_target_pos, 'cost': total_move_cost})
-                else: 
-                    potential_neighbors.append({'pos': (next_x, next_y), 'cost': cost_to_step_onto_next_tile})
-            else: 
-                potential_neighbors.append({'pos': (next_x, next_y), 'cost': cost_to_step_onto_next_tile})
-        return potential_neighbors
+        return [{'pos': pos, 'cost': cost} for pos, cost in self.get_successors(current_pos)]
 
     def reconstruct_path_from_came_from(self, target_node, start_node_of_segment):
         # ... (logic tái tạo đường đi) ...
@@ -89,24 +152,21 @@ class BaseSolver(ABC):
 
     def solve_all_stages(self): 
 
+        self._reset_expansion_counts()
         self.path = [self.start_pos] 
         self.total_cost = 0
         self.nodes_expanded = 0 
         self.path_found = False 
+        if self.optimal_key_order and self.maze.keys:
+            self._solve_with_key_order(); return
         current_pos_in_sequence = self.start_pos
         keys_to_collect = list(self.maze.keys) 
         while keys_to_collect:
-            best_key_to_target = None
-            path_to_chosen_key = []
-            cost_to_chosen_key = float('inf')
-            nodes_for_current_evaluation_round = 0
-            for key_loc in keys_to_collect:
-                temp_path, temp_cost, temp_nodes, temp_found = self._core_search_logic(current_pos_in_sequence, key_loc) 
-                nodes_for_current_evaluation_round += temp_nodes 
-                if temp_found and temp_cost < cost_to_chosen_key:
-                    cost_to_chosen_key = temp_cost
-                    best_key_to_target = key_loc
-                    path_to_chosen_key = temp_path
+            # A key or the exit out of reach now stays out of reach, so the run can only fail
+            if not self.targets_reachable(current_pos_in_sequence, keys_to_collect + [self.exit_pos]):
+                self.path_found = False; return
+            best_key_to_target, path_to_chosen_key, cost_to_chosen_key, nodes_for_current_evaluation_round, _ = \
+                self._core_search_logic_multi(current_pos_in_sequence, keys_to_collect)
             self.nodes_expanded += nodes_for_current_evaluation_round 
             if best_key_to_target is None: 
                 self.path_found = False; return 
@@ -124,6 +184,94 @@ class BaseSolver(ABC):
         else:
             self.path_found = False 
 
+    def _core_search_logic_multi(self, start_node, targets):
+        """
+        (target, path, cost, nodes_expanded, found) for the cheapest of targets to reach from start_node,
+        ties going to the one listed first. This default runs _core_search_logic once per target; solvers
+        that expand in cost order override it with one search that stops at the first target settled.
+        """
+        best_target, best_path, best_cost, nodes = None, [], float('inf'), 0
+        for target in targets:
+            path, cost, target_nodes, found = self._core_search_logic(start_node, target)
+            nodes += target_nodes
+            if found and cost < best_cost:
+                best_target, best_path, best_cost = target, path, cost
+        return best_target, best_path, best_cost, nodes, best_target is not None
+
+    def _search_to_targets(self, source, targets):
+        """
+        Dijkstra from source until every position in targets is settled (or the reachable area runs out).
+        Returns (cost to each reached target, came_from over the searched area, the CorridorGraph searched
+        or None). Costs are the same on the corridor graph, so it is used whenever every endpoint is one of
+        its nodes, use_corridors or not; came_from then links nodes, to be expanded with expand_path.
+        """
+        graph = self.maze.get_corridor_graph()
+        if graph is not None and not all(graph.is_node(pos) for pos in (source, *targets)): graph = None
+        get_successors = (lambda pos: self._without_dead_ends(graph.successors(pos))) if graph is not None else self.get_successors
+        remaining = set(targets)
+        came_from = {source: None}
+        cost_so_far = {source: 0}
+        reached = {}
+        heap = [(0, 0, source)]
+        entry_count = 0
+        settled = set()
+        counts = self.expansion_counts
+        while heap and remaining:
+            cost, _, current = heapq.heappop(heap)
+            if current in settled: continue
+            settled.add(current)
+            self.nodes_expanded += 1
+            if counts is not None: counts[current[1], current[0]] += 1
+            if current in remaining:
+                remaining.discard(current)
+                reached[current] = cost
+            for neighbor, move_cost in get_successors(current):
+                new_cost = cost + move_cost
+                if new_cost < cost_so_far.get(neighbor, float('inf')):
+                    cost_so_far[neighbor] = new_cost
+                    came_from[neighbor] = current
+                    entry_count += 1
+                    heapq.heappush(heap, (new_cost, entry_count, neighbor))
+        return reached, came_from, graph
+
+    def _solve_with_key_order(self):
+        """
+        solve_all_stages with optimal_key_order: k + 1 searches (from the start and from every key, each
+        stopping once all keys and the exit are settled) fill the leg cost matrix, plan_key_order picks
+        the cheapest order, and the legs are read back from the searches' came_from maps.
+        """
+        keys = list(self.maze.keys)
+        nodes = [self.start_pos, *keys, self.exit_pos]
+        if not self.targets_reachable(self.start_pos, keys + [self.exit_pos]):
+            self.path_found = False; return
+        dist, searches = [], []
+        for source in nodes[:-1]:
+            reached, came_from, graph = self._search_to_targets(source, nodes[1:])
+            dist.append([reached.get(node, float('inf')) for node in nodes])
+            searches.append(came_from)
+        order, total = plan_key_order(dist, len(keys))
+        if total == float('inf'):
+            self.path_found = False; return
+        route = [0, *order, len(nodes) - 1]
+        for a, b in zip(route, route[1:]):
+            leg = self.reconstruct_path_from_came_from_dict(nodes[b], nodes[a], searches[a]) if nodes[a] != nodes[b] else [nodes[a]]
+            if graph is not None: leg = graph.expand_path(leg)
+            self.path.extend(leg[1:])
+        self.total_cost = total
+        self.path_found = True
+
+    def reconstruct_path_from_came_from_dict(self, target_node, start_node_of_segment, came_from_dict):
+        """Path start_node_of_segment .. target_node following came_from_dict back from the target ([] if it breaks)."""
+        path_segment = []
+        curr = target_node
+        while curr != start_node_of_segment:
+            if curr is None or curr not in came_from_dict: return []
+            path_segment.append(curr)
+            curr = came_from_dict[curr]
+        path_segment.append(start_node_of_segment)
+        path_segment.reverse()
+        return path_segment
+
     def calculate_total_cost(self, path_nodes):
         """
         Calculates the actual cost of a given path segment, considering terrain.
@@ -151,6 +299,7 @@ class BaseSolver(ABC):
         pass
 
     def get_solver_results(self):
+        filled = self._dead_end_mask()
         return {
             "name": self.__class__.__name__.replace("Solver", ""), # THÊM DÒNG NÀY ĐỂ CÓ TÊN
             "path_found": self.path_found,
@@ -158,4 +307,5 @@ class BaseSolver(ABC):
             "cost": self.total_cost,
             "nodes_expanded": self.nodes_expanded,
             "steps": len(self.path) - 1 if self.path_found and self.path else 0, # THÊM DÒNG NÀY
+            "cells_pruned": filled.count(1) if filled is not None else 0,
         }
\ No newline at end of file
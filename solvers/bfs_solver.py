@@ -1,11 +1,15 @@
 from collections import deque
-from .base_solver import BaseSolver
+from .base_solver import BaseSolver, VIZ_RESET, VIZ_VISIT, VIZ_PUSH, VIZ_POP
+from .bidirectional import bidirectional_bfs
 
 class BFSSolver(BaseSolver):
-    def __init__(self, maze_instance):
+    def __init__(self, maze_instance, optimal_key_order=False, bidirectional=False):
         super().__init__(maze_instance)
+        self.optimal_key_order = optimal_key_order
+        self.bidirectional = bidirectional
         self.viz_frontier = deque()
         self.viz_visited_nodes = set()
+        self.viz_log = []
         self.viz_came_from = {}   
         self._viz_initialized_bfs = False 
 
@@ -13,25 +17,29 @@ class BFSSolver(BaseSolver):
         """
         Finds a path from start_node to target_node using BFS.
         Calculates the cost of the path found. BFS finds shortest path in terms of "hops".
+        With bidirectional set, the path is another fewest-hops one whose cost can differ.
         """
+        if self.bidirectional and self.can_search_backward():
+            path, cost, nodes = bidirectional_bfs(start_node, target_node, self.get_successors, self.get_predecessors, self.expansion_counts)
+            return path, cost, nodes, bool(path)
         queue = deque([start_node])
         segment_came_from = {start_node: None}
         segment_cost_to_reach = {start_node: 0}
         
         nodes_expanded_this_segment = 0
+        counts = self.expansion_counts
 
         while queue:
             current_node = queue.popleft()
             nodes_expanded_this_segment += 1
+            if counts is not None: counts[current_node[1], current_node[0]] += 1
 
             if current_node == target_node:
                 path = self.reconstruct_path_from_came_from_dict(target_node, start_node, segment_came_from)
                 cost = segment_cost_to_reach.get(target_node, float('inf'))
                 return path, cost, nodes_expanded_this_segment, True
 
-            for neighbor_info in self.get_neighbors_and_costs(current_node):
-                neighbor_node = neighbor_info['pos']
-                action_cost = neighbor_info['cost'] 
+            for neighbor_node, action_cost in self.get_successors(current_node):
 
                 if neighbor_node not in segment_came_from: 
                     segment_came_from[neighbor_node] = current_node
@@ -76,6 +84,8 @@ class BFSSolver(BaseSolver):
 
             self.viz_frontier.clear()
             self.viz_frontier.append(self.start_pos)
+            self.viz_log.append((VIZ_RESET, None))
+            self.viz_log.append((VIZ_PUSH, self.start_pos))
             self.viz_came_from = {self.start_pos: None} 
             self.viz_visited_nodes.clear()            
             
@@ -89,11 +99,13 @@ class BFSSolver(BaseSolver):
             return True 
 
         current_viz_pos = self.viz_frontier.popleft()
+        self.viz_log.append((VIZ_POP, current_viz_pos))
 
         if current_viz_pos in self.viz_visited_nodes:
             return False
 
         self.viz_visited_nodes.add(current_viz_pos) 
+        self.viz_log.append((VIZ_VISIT, current_viz_pos))
         self.nodes_expanded += 1
 
         if current_viz_pos == self._viz_target:
@@ -102,11 +114,11 @@ class BFSSolver(BaseSolver):
             self._viz_initialized_bfs = False 
             return True 
 
-        for neighbor_info in self.get_neighbors_and_costs(current_viz_pos):
-            neighbor_pos = neighbor_info['pos']
+        for neighbor_pos, _ in self.get_successors(current_viz_pos):
             if neighbor_pos not in self.viz_came_from:
                 self.viz_came_from[neighbor_pos] = current_viz_pos 
                 self.viz_frontier.append(neighbor_pos)            
+                self.viz_log.append((VIZ_PUSH, neighbor_pos))
 
         if self.nodes_expanded > (self.width * self.height * 2): #
              self._viz_initialized_bfs = False
@@ -0,0 +1,104 @@
+# solvers/bidirectional.py
+# Searches that grow one tree from the start along successors and one from the target along
+# predecessors (the transition table read backwards, so slide landings and portal exits lead back
+# to the cells the move started from) until they meet. Each side only has to reach about half way,
+# so on open mazes both the expansions and the stored frontier shrink.
+import heapq
+
+
+def _join(meet, parents_forward, parents_backward):
+    """Start .. meet .. target from the two parent maps ({node: (parent, cost of that edge)}); returns (path, cost)."""
+    path, cost = [], 0
+    node = meet
+    while node is not None:
+        path.append(node)
+        parent, edge_cost = parents_forward[node]
+        cost += edge_cost
+        node = parent
+    path.reverse()
+    node = meet
+    while True:
+        parent, edge_cost = parents_backward[node]
+        if parent is None: break
+        path.append(parent)
+        cost += edge_cost
+        node = parent
+    return path, cost
+
+
+def bidirectional_bfs(start, target, successors, predecessors, counts=None):
+    """
+    Fewest-moves path, expanding a whole level of whichever side has the smaller frontier at a time.
+    Any meeting found while a level is expanded has the same, minimal, number of moves, so the first
+    one ends the search. Ties are not broken by cost: the path can differ from the one forward BFS
+    finds, with the same number of moves but different mud, so its cost (and the key BFSSolver picks
+    by that cost) can differ too. Returns (path, cost of that path, nodes expanded); path is [] if none.
+    """
+    if start == target: return [start], 0, 0
+    parents_forward = {start: (None, 0)}
+    parents_backward = {target: (None, 0)}
+    frontier_forward, frontier_backward = [start], [target]
+    nodes_expanded = 0
+    while frontier_forward and frontier_backward:
+        if len(frontier_forward) <= len(frontier_backward):
+            frontier, parents, other, step, forward = frontier_forward, parents_forward, parents_backward, successors, True
+        else:
+            frontier, parents, other, step, forward = frontier_backward, parents_backward, parents_forward, predecessors, False
+        next_frontier = []
+        for node in frontier:
+            nodes_expanded += 1
+            if counts is not None: counts[node[1], node[0]] += 1
+            for neighbor, move_cost in step(node):
+                if neighbor in parents: continue
+                parents[neighbor] = (node, move_cost)
+                if neighbor in other:
+                    return (*_join(neighbor, parents_forward, parents_backward), nodes_expanded)
+                next_frontier.append(neighbor)
+        if forward: frontier_forward = next_frontier
+        else: frontier_backward = next_frontier
+    return [], float('inf'), nodes_expanded
+
+
+def bidirectional_astar(start, target, successors, predecessors, heuristic=None, counts=None):
+    """
+    Cheapest path by bidirectional A* with average potentials: p(v) = (heuristic(v, target) -
+    heuristic(v, start)) / 2 guides the forward side and -p(v) the backward one, which keeps both
+    searches on the same reduced edge costs. That lets the plain bidirectional Dijkstra rule apply:
+    once the two lowest keys add up to mu, the cheapest meeting seen so far, nothing cheaper is left.
+    The rule only holds for a consistent heuristic; heuristic=None gives zero potentials, i.e. plain
+    bidirectional Dijkstra, which is exact on any costs. Keys are doubled to stay whole numbers.
+    Each step is taken on the side with the smaller open list.
+    Returns (path, cost, nodes expanded); path is [] if there is none.
+    """
+    if start == target: return [start], 0, 0
+    def potential(pos):
+        return heuristic(pos, target) - heuristic(pos, start) if heuristic is not None else 0
+    sides = []
+    for source, step, sign in ((start, successors, 1), (target, predecessors, -1)):
+        sides.append({'g': {source: 0}, 'parents': {source: (None, 0)}, 'heap': [(sign * potential(source), 0, source)],
+                      'step': step, 'sign': sign})
+    forward, backward = sides
+    entry_count = 0
+    nodes_expanded = 0
+    mu, meet = float('inf'), None
+    while forward['heap'] and backward['heap']:
+        if forward['heap'][0][0] + backward['heap'][0][0] >= 2 * mu: break
+        side, other = (forward, backward) if len(forward['heap']) <= len(backward['heap']) else (backward, forward)
+        key, _, node = heapq.heappop(side['heap'])
+        g, sign = side['g'], side['sign']
+        if key > 2 * g[node] + sign * potential(node): continue # Stale entry: node was reached more cheaply since
+        nodes_expanded += 1
+        if counts is not None: counts[node[1], node[0]] += 1
+        other_g = other['g']
+        for neighbor, move_cost in side['step'](node):
+            new_g = g[node] + move_cost
+            if new_g < g.get(neighbor, float('inf')):
+                g[neighbor] = new_g
+                side['parents'][neighbor] = (node, move_cost)
+                entry_count += 1
+                heapq.heappush(side['heap'], (2 * new_g + sign * potential(neighbor), entry_count, neighbor))
+                if neighbor in other_g and new_g + other_g[neighbor] < mu:
+                    mu, meet = new_g + other_g[neighbor], neighbor
+    if meet is None: return [], float('inf'), nodes_expanded
+    path, _ = _join(meet, forward['parents'], backward['parents'])
+    return path, mu, nodes_expanded
@@ -28,9 +28,12 @@ class CSPBacktrackingFCSolver(BaseSolver):
 
         memo_fc = {} 
 
+        counts = self.expansion_counts
+
         def solve_recursive_fc(current_path, current_target, collected_keys_on_path, nodes_count):
             nodes_count += 1
             current_node = current_path[-1]
+            if counts is not None: counts[current_node[1], current_node[0]] += 1
             
             path_tuple = tuple(current_path)
             memo_key = (path_tuple, current_target, tuple(sorted(list(collected_keys_on_path))))
@@ -52,11 +55,10 @@ class CSPBacktrackingFCSolver(BaseSolver):
                 memo_fc[memo_key] = None
                 return None, nodes_count
 
-            neighbors_data = self.get_neighbors_and_costs(current_node)
-            neighbors_data.sort(key=lambda n_info: self.manhattan_heuristic(n_info['pos'], current_target))
+            neighbors_data = self.get_successors(current_node)
+            neighbors_data.sort(key=lambda n_info: self.manhattan_heuristic(n_info[0], current_target))
 
-            for neighbor_info in neighbors_data:
-                neighbor_pos = neighbor_info['pos']
+            for neighbor_pos, _ in neighbors_data:
 
                 if len(current_path) > 1 and neighbor_pos == current_path[-2]:
                     continue
@@ -1,12 +1,14 @@
 import heapq
-from .base_solver import BaseSolver
+from .base_solver import BaseSolver, VIZ_RESET, VIZ_VISIT, VIZ_PUSH, VIZ_POP
 
 class GreedySolver(BaseSolver):
-    def __init__(self, maze_instance):
+    def __init__(self, maze_instance, optimal_key_order=False):
         super().__init__(maze_instance)
+        self.optimal_key_order = optimal_key_order
         # For solve_step_visualize
         self.viz_frontier_heap = [] 
         self.viz_visited_nodes = set()
+        self.viz_log = []
         self.viz_came_from = {}
         self._viz_heap_count = 0
         self._viz_initialized_greedy = False 
@@ -22,6 +24,7 @@ class GreedySolver(BaseSolver):
         
         nodes_this_segment = 0
         processed_nodes_in_segment = set()
+        counts = self.expansion_counts
 
         while local_heap:
             _, _, current_node = heapq.heappop(local_heap)
@@ -31,15 +34,14 @@ class GreedySolver(BaseSolver):
             processed_nodes_in_segment.add(current_node)
             
             nodes_this_segment += 1
+            if counts is not None: counts[current_node[1], current_node[0]] += 1
 
             if current_node == target_node:
                 path = self.reconstruct_path_from_came_from_dict(target_node, start_node, segment_came_from)
                 cost = segment_cost_to_reach.get(target_node, float('inf'))
                 return path, cost, nodes_this_segment, True
 
-            for neighbor_info in self.get_neighbors_and_costs(current_node):
-                neighbor_node = neighbor_info['pos']
-                cost_to_neighbor = neighbor_info['cost']
+            for neighbor_node, cost_to_neighbor in self.get_successors(current_node):
 
                 if neighbor_node not in processed_nodes_in_segment: 
                     if neighbor_node not in segment_came_from: 
@@ -75,6 +77,8 @@ class GreedySolver(BaseSolver):
             self._viz_heap_count = 0
             heapq.heappush(self.viz_frontier_heap, (self.manhattan_heuristic(self.start_pos, self._viz_target), self._viz_heap_count, self.start_pos))
             
+            self.viz_log.append((VIZ_RESET, None))
+            self.viz_log.append((VIZ_PUSH, self.start_pos))
             self.viz_came_from = {self.start_pos: None}
             self.viz_visited_nodes = set() 
 
@@ -87,11 +91,13 @@ class GreedySolver(BaseSolver):
             self._viz_initialized_greedy = False; return True
 
         _, _, current_viz_pos = heapq.heappop(self.viz_frontier_heap)
+        self.viz_log.append((VIZ_POP, current_viz_pos))
 
         if current_viz_pos in self.viz_visited_nodes : 
             return False if self.viz_frontier_heap else True
 
         self.viz_visited_nodes.add(current_viz_pos)
+        self.viz_log.append((VIZ_VISIT, current_viz_pos))
         self.nodes_expanded += 1
 
         if current_viz_pos == self._viz_target:
@@ -99,8 +105,7 @@ class GreedySolver(BaseSolver):
             self.path_found = True
             self._viz_initialized_greedy = False; return True
 
-        for neighbor_info in self.get_neighbors_and_costs(current_viz_pos):
-            neighbor_pos = neighbor_info['pos']
+        for neighbor_pos, _ in self.get_successors(current_viz_pos):
             if neighbor_pos not in self.viz_visited_nodes:
 
                 if neighbor_pos not in self.viz_came_from:
@@ -111,6 +116,7 @@ class GreedySolver(BaseSolver):
                 priority = self.manhattan_heuristic(neighbor_pos, self._viz_target)
 
                 heapq.heappush(self.viz_frontier_heap, (priority, self._viz_heap_count, neighbor_pos))
+                self.viz_log.append((VIZ_PUSH, neighbor_pos))
         
         if self.nodes_expanded > self.width * self.height * 1.5: 
              self._viz_initialized_greedy = False
@@ -0,0 +1,76 @@
+# solvers/key_order.py
+# Order in which to collect keys given all pairwise leg costs. Nodes are numbered 0 = start,
+# 1..k = keys, k + 1 = exit; dist[i][j] is the cheapest cost from node i to node j (inf if unreachable).
+from constants import KEY_ORDER_EXACT_MAX_KEYS
+
+INF = float('inf')
+
+
+def plan_key_order(dist, num_keys):
+    """(key node order, total cost from start through every key to the exit); exact up to KEY_ORDER_EXACT_MAX_KEYS keys."""
+    if num_keys <= KEY_ORDER_EXACT_MAX_KEYS: return held_karp_order(dist, num_keys)
+    order = two_opt(dist, num_keys, nearest_neighbour_order(dist, num_keys))
+    return order, route_cost(dist, num_keys, order)
+
+
+def route_cost(dist, num_keys, order):
+    nodes = [0, *order, num_keys + 1]
+    return sum(dist[a][b] for a, b in zip(nodes, nodes[1:]))
+
+
+def held_karp_order(dist, num_keys):
+    """
+    Bitmask DP over key subsets: best[mask][j] is the cheapest walk from the start that collects
+    exactly the keys in mask and stands on key j. O(2^k * k^2) time, O(2^k * k) memory.
+    """
+    exit_node = num_keys + 1
+    if num_keys == 0: return [], dist[0][exit_node]
+    full = (1 << num_keys) - 1
+    best = [[INF] * num_keys for _ in range(full + 1)]
+    parent = [[-1] * num_keys for _ in range(full + 1)]
+    for j in range(num_keys): best[1 << j][j] = dist[0][j + 1]
+    for mask in range(1, full + 1):
+        row = best[mask]
+        for j in range(num_keys):
+            cost = row[j]
+            if cost == INF: continue
+            leg = dist[j + 1]
+            for nxt in range(num_keys):
+                bit = 1 << nxt
+                if mask & bit: continue
+                candidate = cost + leg[nxt + 1]
+                if candidate < best[mask | bit][nxt]:
+                    best[mask | bit][nxt] = candidate
+                    parent[mask | bit][nxt] = j
+    total, last = min((best[full][j] + dist[j + 1][exit_node], j) for j in range(num_keys))
+    if total == INF: return [], INF
+    order, mask = [], full
+    while last != -1:
+        order.append(last + 1)
+        last, mask = parent[mask][last], mask & ~(1 << last)
+    order.reverse()
+    return order, total
+
+
+def nearest_neighbour_order(dist, num_keys):
+    order, current, remaining = [], 0, set(range(1, num_keys + 1))
+    while remaining:
+        current = min(remaining, key=lambda node: dist[current][node])
+        order.append(current)
+        remaining.remove(current)
+    return order
+
+
+def two_opt(dist, num_keys, order):
+    """Reverses sub-runs of the key order while that lowers the cost. Legs are directed (slides, portals), so each move is re-costed in full."""
+    best_cost = route_cost(dist, num_keys, order)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(order) - 1):
+            for j in range(i + 1, len(order)):
+                candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                cost = route_cost(dist, num_keys, candidate)
+                if cost < best_cost:
+                    order, best_cost, improved = candidate, cost, True
+    return order
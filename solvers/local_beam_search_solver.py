@@ -15,13 +15,14 @@ class LocalBeamSearchSolver(BaseSolver):
 
     def _core_search_logic(self, start_node, target_node):
         """
-        Triển khai Local Beam Search cho một chặng, sử dụng get_neighbors_and_costs.
+        Triển khai Local Beam Search cho một chặng, sử dụng get_successors.
         Trả về: (path_segment, total_cost_of_segment, nodes_expanded_in_segment, found_bool)
         """
 
         current_beams = [(self.heuristic(start_node, target_node), start_node, [start_node])]
         
         iterations = 0
+        counts = self.expansion_counts
 
 
         while iterations < self.max_iterations:
@@ -43,10 +44,10 @@ class LocalBeamSearchSolver(BaseSolver):
             for h_val_curr, current_pos_beam, current_path_beam in current_beams:
                 if len(current_path_beam) > self.maze.width * self.maze.height * 2: 
                     continue
+                if counts is not None: counts[current_pos_beam[1], current_pos_beam[0]] += 1
 
 
-                for neighbor_info in self.get_neighbors_and_costs(current_pos_beam):
-                    next_pos_after_effect = neighbor_info['pos']
+                for next_pos_after_effect, _ in self.get_successors(current_pos_beam):
                     if next_pos_after_effect in current_path_beam[-2:]: 
                         continue
 
@@ -80,6 +81,7 @@ class LocalBeamSearchSolver(BaseSolver):
         Override phương thức của BaseSolver.
         LocalBeamSearch tìm đường tuần tự đến các chìa khóa rồi đến lối ra.
         """
+        self._reset_expansion_counts()
         self.path = [self.start_pos]
         self.total_cost = 0
         self.nodes_expanded = 0 
@@ -88,6 +90,9 @@ class LocalBeamSearchSolver(BaseSolver):
         current_start_node_for_stage = self.start_pos
         keys_in_order = list(self.maze.keys) 
         all_targets_in_sequence = keys_in_order + [self.exit_pos]
+        if not self.sequence_reachable([self.start_pos] + all_targets_in_sequence):
+            self.path_found = False; self.path = []; self.total_cost = float('inf')
+            return False
 
         for target_node_for_stage in all_targets_in_sequence:
             path_segment, cost_segment, nodes_segment, found_segment = \
@@ -2,6 +2,7 @@ import random
 import numpy as np
 from collections import defaultdict
 from .base_solver import BaseSolver
+from transitions import DIRECTIONS
 from constants import MUD_COST_ALGO, PORTAL_COST_ALGO, SLIDE_CELL_COST_ALGO
 
 class QLearningSolver(BaseSolver):
@@ -23,6 +24,8 @@ class QLearningSolver(BaseSolver):
 
         self.q_table = defaultdict(lambda: [0.0] * 4)
         self.actions = [(0, -1), (0, 1), (-1, 0), (1, 0)] 
+        # Actions are unpacked as (dy, dx); map each to its DIRECTIONS index in the transition table
+        self._action_directions = [DIRECTIONS.index((dx, dy)) for dy, dx in self.actions]
 
         self.key_positions_ordered = sorted(list(self.maze.keys))
         self.num_total_keys_in_maze = len(self.key_positions_ordered)
@@ -68,28 +71,26 @@ class QLearningSolver(BaseSolver):
         done = False
         next_agent_pos_after_effects = (next_potential_x, next_potential_y)
         newly_collected_keys_set = set(current_collected_keys)
+        move = self.maze.get_transition_table().move(current_agent_pos[0], current_agent_pos[1], self._action_directions[action_index])
+        if move is not None and self.is_dead_end(move[0]): move = None # Filled dead ends act as walls
         
-        if self.maze.is_wall(next_potential_x, next_potential_y):
+        if move is None:
             reward = -100.0
             next_agent_pos_after_effects = current_agent_pos
         else:
+            next_agent_pos_after_effects = move[0]
             if self.maze.is_mud(next_potential_x, next_potential_y):
                 reward -= 2.0
 
             if self.maze.is_water(next_potential_x, next_potential_y):
-                land_pos, num_slid_cells = self._get_slide_endpoint_and_cost_factor(
-                     next_potential_x, next_potential_y, action_dx, action_dy 
-                )
-                next_agent_pos_after_effects = land_pos
+                # A slide lands in a straight line, so its length is the distance from the entry cell
+                num_slid_cells = self.manhattan_heuristic((next_potential_x, next_potential_y), next_agent_pos_after_effects)
                 reward -= 0.5 * num_slid_cells
 
             elif self.maze.is_portal(next_potential_x, next_potential_y):
-                portal_target = self.maze.get_portal_target(next_potential_x, next_potential_y)
-                if portal_target:
-                    next_agent_pos_after_effects = portal_target
-                    reward -= 0.05
-                    if prev_agent_pos is not None and next_agent_pos_after_effects == prev_agent_pos:
-                        reward -= 15.0
+                reward -= 0.05
+                if prev_agent_pos is not None and next_agent_pos_after_effects == prev_agent_pos:
+                    reward -= 15.0
             
             agent_final_x, agent_final_y = next_agent_pos_after_effects
             key_at_final_pos = (agent_final_x, agent_final_y)
@@ -117,7 +118,9 @@ class QLearningSolver(BaseSolver):
         self.viz_agent_pos = current_pos
 
         max_steps_per_episode = self.width * self.height 
+        counts = self.expansion_counts
         for step in range(max_steps_per_episode):
+            if counts is not None: counts[current_pos[1], current_pos[0]] += 1
             state = self._get_state_representation(current_pos, collected_keys)
             action_idx = self._choose_action(state)
 
@@ -166,9 +169,11 @@ class QLearningSolver(BaseSolver):
         
         max_solve_steps = self.width * self.height * 2 
         last_pos_solve = None 
+        counts = self.expansion_counts
 
         for step_solve in range(max_solve_steps):
             nodes_expanded_runtime += 1
+            if counts is not None: counts[current_pos[1], current_pos[0]] += 1
             current_state_repr = self._get_state_representation(current_pos, collected_keys_runtime)
             
             q_values = self.q_table[current_state_repr]
@@ -177,61 +182,26 @@ class QLearningSolver(BaseSolver):
 
             sorted_actions = np.argsort(q_values)[::-1]
             
-            action_taken_this_step = False
-            chosen_action_idx = -1
+            transition_table = self.maze.get_transition_table()
+            chosen_move = None
 
             for action_idx_try in sorted_actions:
-                action_dy_try, action_dx_try = self.actions[action_idx_try]
-                next_potential_x_try = current_pos[0] + action_dx_try
-                next_potential_y_try = current_pos[1] + action_dy_try
-
-                if self.maze.is_wall(next_potential_x_try, next_potential_y_try):
+                move_try = transition_table.move(current_pos[0], current_pos[1], self._action_directions[action_idx_try])
+                if move_try is None or self.is_dead_end(move_try[0]):
                     continue 
 
-                temp_actual_next_pos = (next_potential_x_try, next_potential_y_try)
-                if self.maze.is_water(next_potential_x_try, next_potential_y_try):
-                    land_pos_try, _ = self._get_slide_endpoint_and_cost_factor(
-                        next_potential_x_try, next_potential_y_try, action_dx_try, action_dy_try
-                    )
-                    temp_actual_next_pos = land_pos_try
-                elif self.maze.is_portal(next_potential_x_try, next_potential_y_try):
-                    portal_target_try = self.maze.get_portal_target(next_potential_x_try, next_potential_y_try)
-                    if portal_target_try:
-                        temp_actual_next_pos = portal_target_try
-                
+                temp_actual_next_pos = move_try[0]
                 if temp_actual_next_pos == last_pos_solve and len(sorted_actions) > 1 : 
                     if step_solve < max_solve_steps - 5 : 
                         continue 
 
-                chosen_action_idx = action_idx_try
-                action_taken_this_step = True
+                chosen_move = move_try
                 break 
             
-            if not action_taken_this_step:
+            if chosen_move is None:
                  return path, cost, nodes_expanded_runtime, False
 
-            action_dy, action_dx = self.actions[chosen_action_idx]
-            next_potential_x = current_pos[0] + action_dx
-            next_potential_y = current_pos[1] + action_dy
-            step_cost_this_action = 1
-
-            actual_next_pos = (next_potential_x, next_potential_y)
-            
-            if self.maze.is_mud(next_potential_x, next_potential_y):
-                step_cost_this_action = self.MUD_COST_ALGO
-
-            if self.maze.is_water(next_potential_x, next_potential_y):
-                land_pos, num_slid = self._get_slide_endpoint_and_cost_factor(
-                    next_potential_x, next_potential_y, action_dx, action_dy
-                )
-                actual_next_pos = land_pos
-                step_cost_this_action += num_slid * self.SLIDE_CELL_COST_ALGO
-            elif self.maze.is_portal(next_potential_x, next_potential_y):
-                portal_target = self.maze.get_portal_target(next_potential_x, next_potential_y)
-                if portal_target:
-                    actual_next_pos = portal_target
-                    step_cost_this_action += self.PORTAL_COST_ALGO
-            
+            actual_next_pos, step_cost_this_action = chosen_move
             cost += step_cost_this_action
             last_pos_solve = current_pos 
             current_pos = actual_next_pos
@@ -247,6 +217,7 @@ class QLearningSolver(BaseSolver):
 
 
     def solve_all_stages(self):
+        self._reset_expansion_counts()
         self.q_table.clear() 
         self.epsilon = getattr(self, '_original_epsilon', 1.0) 
         if not hasattr(self, '_original_epsilon'): self._original_epsilon = self.epsilon
@@ -259,6 +230,10 @@ class QLearningSolver(BaseSolver):
         self._current_episode = 0
         self.prev_agent_pos_in_episode = None
 
+        if not self.targets_reachable(self.start_pos, self.key_positions_ordered + [self.exit_pos]):
+            self._training_complete = True # No reward can ever be collected, training would only burn episodes
+            return self.path_found
+
         for episode in range(self.num_episodes):
             self._train_one_episode()
             self._current_episode = episode + 1
@@ -29,32 +29,7 @@ class SimulatedAnnealingSolver(BaseSolver):
         Lấy danh sách các vị trí (tuple (x,y)) của các ô hàng xóm hợp lệ.
         SA chỉ cần vị trí, không cần chi phí ở bước chọn hàng xóm.
         """
-        x, y = pos
-        neighbors_pos = []
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]: 
-            nx, ny = x + dx, y + dy
-            if not self.maze.is_wall(nx, ny):
-                neighbors_pos.append((nx, ny))
-        return neighbors_pos
-
-    def _calculate_segment_cost(self, path_segment):
-        """
-        Tính chi phí thực tế của một đoạn đường đi, có xét đến bùn.
-        """
-        if not path_segment or len(path_segment) < 2:
-            return 0
-        
-        cost = 0
-        # Chi phí được tính khi *bước vào* ô mới
-        for i in range(1, len(path_segment)):
-            node_x, node_y = path_segment[i]
-            
-            cost_to_step = 1 # Chi phí cơ bản
-            if self.maze.is_mud(node_x, node_y):
-                cost_to_step = self.maze.MUD_COST_FOR_ALGORITHM
-
-            cost += cost_to_step
-        return cost
+        return [next_pos for next_pos, _ in self.get_successors(pos)]
 
     def _core_search_logic(self, start_node, target_node):
         """
@@ -65,23 +40,25 @@ class SimulatedAnnealingSolver(BaseSolver):
         current_energy = self.manhattan_heuristic(current_pos, target_node) 
         
         path_segment = [current_pos] 
+        segment_cost = 0 # Accumulated from the transition table costs of accepted moves
         
         temp = self.initial_temp
         iterations = 0 
+        counts = self.expansion_counts
 
         while temp > self.min_temp and iterations < self.max_iterations_per_core_logic:
             if current_pos == target_node:
-                segment_cost = self._calculate_segment_cost(path_segment)
                 return path_segment, segment_cost, iterations, True 
 
             if len(path_segment) > self.max_steps_in_segment:
                 break 
 
-            neighbor_positions = self._get_valid_neighbor_positions(current_pos)
-            if not neighbor_positions:
+            moves = self.get_successors(current_pos)
+            if not moves:
                 break 
+            if counts is not None: counts[current_pos[1], current_pos[0]] += 1
 
-            next_pos = self.rand.choice(neighbor_positions) 
+            next_pos, move_cost = self.rand.choice(moves) 
             next_energy = self.manhattan_heuristic(next_pos, target_node)
             
             delta_energy = next_energy - current_energy
@@ -97,6 +74,7 @@ class SimulatedAnnealingSolver(BaseSolver):
             if accepted_move:
                 current_pos = next_pos
                 current_energy = next_energy
+                segment_cost += move_cost
                 path_segment.append(current_pos) 
             
             temp *= self.cooling_rate 
@@ -104,7 +82,6 @@ class SimulatedAnnealingSolver(BaseSolver):
         
 
         if current_pos == target_node:
-            segment_cost = self._calculate_segment_cost(path_segment)
             return path_segment, segment_cost, iterations, True
         
 
@@ -115,6 +92,7 @@ class SimulatedAnnealingSolver(BaseSolver):
         Override phương thức của BaseSolver để phù hợp với SA.
         SA tìm đường tuần tự đến các chìa khóa rồi đến lối ra.
         """
+        self._reset_expansion_counts()
         self.path = [self.start_pos] 
         self.total_cost = 0
         self.nodes_expanded = 0 
@@ -124,6 +102,11 @@ class SimulatedAnnealingSolver(BaseSolver):
 
         keys_in_order = list(self.maze.keys) 
         all_targets_in_sequence = keys_in_order + [self.exit_pos]
+        if not self.sequence_reachable([self.start_pos] + all_targets_in_sequence):
+            self.path_found = False
+            self.path = []
+            self.total_cost = float('inf')
+            return
 
         for target_node_for_stage in all_targets_in_sequence:
 
@@ -1,6 +1,5 @@
 # solvers/spo_solver.py
 import random
-import pygame
 import heapq
 from collections import deque # Có thể cần cho sub-planner
 from .base_solver import BaseSolver
@@ -15,6 +14,8 @@ BELIEF_PATH = 0
 # (Có thể thêm BELIEF_MUD, BELIEF_KEY, etc. nếu muốn agent ghi nhớ chi tiết hơn)
 
 class SPOSolver(BaseSolver):
+    supports_dead_end_view = False # Moves come from the belief map, not the maze's search view
+
     def __init__(self, maze_instance, observation_range=20, max_planning_steps=500000):
         super().__init__(maze_instance)
         self.observation_range = observation_range # Agent nhìn được bao xa (1 = chỉ các ô kề)
@@ -36,6 +37,8 @@ class SPOSolver(BaseSolver):
 
         # Cho việc visualize
         self.viz_belief_map_surface = None # Sẽ được tạo khi cần
+        self.belief_dirty = set() # Cells whose belief changed since draw_belief_map() last painted them
+        self._belief_map_agent_pos = None # Where the agent marker was painted
         self._spo_solve_complete = False
 
         # Sub-planner (ví dụ: A* hoặc BFS đơn giản để chạy trên belief map)
@@ -52,6 +55,7 @@ class SPOSolver(BaseSolver):
         
         # Luôn cập nhật ô hiện tại (nếu chưa)
         if self.belief_maze_data[y][x] == UNKNOWN:
+            self.belief_dirty.add((x, y))
             if self.maze.is_wall(x,y): # Điều này không nên xảy ra nếu agent di chuyển hợp lệ
                  self.belief_maze_data[y][x] = BELIEF_WALL
             else:
@@ -75,6 +79,7 @@ class SPOSolver(BaseSolver):
 
                 if 0 <= obs_x < self.width and 0 <= obs_y < self.height:
                     if self.belief_maze_data[obs_y][obs_x] == UNKNOWN: # Chỉ cập nhật nếu chưa biết
+                        self.belief_dirty.add((obs_x, obs_y))
                         if self.maze.is_wall(obs_x, obs_y):
                             self.belief_maze_data[obs_y][obs_x] = BELIEF_WALL
                         else:
@@ -155,6 +160,7 @@ class SPOSolver(BaseSolver):
         visited_in_plan = {start_pos}
         
         nodes_expanded_this_plan = 0
+        counts = self.expansion_counts # Replanning is where SPO spends its work, so the planner's pops are what get counted
 
         while q:
             nodes_expanded_this_plan +=1
@@ -162,6 +168,7 @@ class SPOSolver(BaseSolver):
                 return None, None, nodes_expanded_this_plan
 
             curr, path = q.popleft()
+            if counts is not None: counts[curr[1], curr[0]] += 1
 
             if curr in target_pos_list:
                 return path, curr, nodes_expanded_this_plan
@@ -295,12 +302,14 @@ class SPOSolver(BaseSolver):
             # Agent "đập đầu vào tường" THẬT. Belief map của nó sai.
             # Không di chuyển, không chi phí. Quan sát sẽ cập nhật.
             self.belief_maze_data[target_y][target_x] = BELIEF_WALL # Cập nhật ngay lập tức
+            self.belief_dirty.add((target_x, target_y))
             return 0 
 
         cost_of_this_step = 1 # Chi phí cơ bản để bước vào ô
         if self.maze.is_mud(target_x, target_y):
             cost_of_this_step = self.maze.MUD_COST_FOR_ALGORITHM
             self.belief_mud.add((target_x, target_y)) # Cập nhật belief nếu chưa
+            self.belief_dirty.add((target_x, target_y))
 
         final_pos_after_effects = (target_x, target_y)
 
@@ -331,6 +340,7 @@ class SPOSolver(BaseSolver):
             # Agent "thu thập" chìa khóa này (trong thực tế và trong belief)
             key_loc = self.agent_current_pos
             self.belief_keys.add(key_loc) # Đảm bảo nó trong belief_keys
+            self.belief_dirty.add(key_loc)
             if key_loc not in self.agent_keys_collected_belief:
                  self.agent_keys_collected_belief.add(key_loc)
                  # print(f"SPO: Collected key at {key_loc}")
@@ -341,6 +351,7 @@ class SPOSolver(BaseSolver):
 
 
     def solve_all_stages(self):
+        self._reset_expansion_counts()
         self.path = [self.start_pos] # Đường đi thực tế của agent
         self.total_cost = 0
         self.nodes_expanded = 0 # Số chu kỳ lập kế hoạch/hành động
@@ -457,44 +468,54 @@ class SPOSolver(BaseSolver):
 
         return True # Báo cho AlgorithmRunner là "xong" với bước visualize này
 
-    def draw_belief_map(self, surface, cell_size):
-        """Vẽ belief map của agent lên một surface riêng (ví dụ: ở góc màn hình)."""
+    def draw_belief_map(self, surface, cell_size, pos=(0, 0)):
+        """
+        Vẽ belief map của agent lên `surface` tại `pos`. The map lives in a persistent surface:
+        only cells in belief_dirty and the old/new agent cells are repainted, then it is blitted once.
+        """
+        import pygame # Only the visualization needs pygame; solving stays headless
         if self.viz_belief_map_surface is None or \
            self.viz_belief_map_surface.get_size() != (self.width * cell_size, self.height * cell_size):
             self.viz_belief_map_surface = pygame.Surface((self.width * cell_size, self.height * cell_size))
+            self.viz_belief_map_surface.fill((50,50,50)) # Nền cho belief map
+            dirty = ((c, r) for r in range(self.height) for c in range(self.width))
+        else:
+            dirty = self.belief_dirty
+            if self._belief_map_agent_pos != self.agent_current_pos: dirty.add(self._belief_map_agent_pos)
+        for cell in dirty: self._draw_belief_cell(self.viz_belief_map_surface, cell, cell_size)
+        self.belief_dirty = set()
 
-        self.viz_belief_map_surface.fill((50,50,50)) # Nền cho belief map
-
-        for r in range(self.height):
-            for c in range(self.width):
-                rect = pygame.Rect(c * cell_size, r * cell_size, cell_size, cell_size)
-                belief_val = self.belief_maze_data[r][c]
-                color = (100,100,100) # Màu cho UNKNOWN
-
-                if belief_val == BELIEF_WALL: color = (30,30,30)
-                elif belief_val == BELIEF_PATH: color = (180,180,180)
-                
-                pygame.draw.rect(self.viz_belief_map_surface, color, rect)
-                # Vẽ viền
-                pygame.draw.rect(self.viz_belief_map_surface, (80,80,80), rect, 1)
-
-                # Vẽ các đối tượng đã biết trên belief map
-                pos = (c,r)
-                if pos in self.belief_keys:
-                    pygame.draw.circle(self.viz_belief_map_surface, (255, 255, 0), rect.center, cell_size // 3)
-                if pos == self.belief_exit_pos:
-                    pygame.draw.rect(self.viz_belief_map_surface, (255, 153, 255), rect.inflate(-cell_size//4, -cell_size//4))
-                if pos in self.belief_mud:
-                    pygame.draw.ellipse(self.viz_belief_map_surface, (115, 38, 38), rect.inflate(-cell_size//5, -cell_size//5))
-                # (Thêm water, portal nếu muốn)
-        
         # Vẽ vị trí hiện tại của agent trên belief map
         agent_rect_belief = pygame.Rect(self.agent_current_pos[0] * cell_size, 
                                         self.agent_current_pos[1] * cell_size, 
                                         cell_size, cell_size)
         pygame.draw.ellipse(self.viz_belief_map_surface, (255,0,0), agent_rect_belief.inflate(-cell_size//3, -cell_size//3))
+        self._belief_map_agent_pos = self.agent_current_pos
 
-        surface.blit(self.viz_belief_map_surface, (0,0)) # Ví dụ vẽ ở góc trên trái
+        surface.blit(self.viz_belief_map_surface, pos)
+
+    def _draw_belief_cell(self, belief_surface, pos, cell_size):
+        import pygame
+        c, r = pos
+        rect = pygame.Rect(c * cell_size, r * cell_size, cell_size, cell_size)
+        belief_val = self.belief_maze_data[r][c]
+        color = (100,100,100) # Màu cho UNKNOWN
+
+        if belief_val == BELIEF_WALL: color = (30,30,30)
+        elif belief_val == BELIEF_PATH: color = (180,180,180)
+        
+        pygame.draw.rect(belief_surface, color, rect)
+        # Vẽ viền
+        pygame.draw.rect(belief_surface, (80,80,80), rect, 1)
+
+        # Vẽ các đối tượng đã biết trên belief map
+        if pos in self.belief_keys:
+            pygame.draw.circle(belief_surface, (255, 255, 0), rect.center, cell_size // 3)
+        if pos == self.belief_exit_pos:
+            pygame.draw.rect(belief_surface, (255, 153, 255), rect.inflate(-cell_size//4, -cell_size//4))
+        if pos in self.belief_mud:
+            pygame.draw.ellipse(belief_surface, (115, 38, 38), rect.inflate(-cell_size//5, -cell_size//5))
+        # (Thêm water, portal nếu muốn)
 
     # _core_search_logic không thực sự áp dụng cho SPO theo cách của các solver khác.
     # Toàn bộ logic nằm trong solve_all_stages.
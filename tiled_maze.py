@@ -0,0 +1,236 @@
+import json
+import random
+import struct
+from collections import OrderedDict, deque
+import numpy as np
+from constants import (
+    CELL_SIZE, MAZE_LOOP_CHANCE, PORTAL_COLORS_FALLBACK, MAZE_JOURNAL_MAX_ENTRIES,
+    MUD_COST_ALGO, PORTAL_COST_ALGO, SLIDE_CELL_COST_ALGO,
+    TILED_MAZE_TILE_SIZE, TILED_MAZE_CACHE_TILES,
+)
+from maze_grid import CELL_WALL, CELL_MUD, CELL_WATER, CELL_KEY
+from maze_generator import carve_maze
+from transitions import OnDemandTransitions
+
+# File layout: TILED_MAZE_MAGIC, uint32 header length, UTF-8 JSON header, zero padding up to a
+# TILED_MAZE_ALIGNMENT boundary, then tiles_x * tiles_y tiles in row-major tile order. Each tile is
+# tile_size * tile_size flag bytes (row-major, same bits as MazeGrid); edge tiles are padded with walls.
+TILED_MAZE_MAGIC = b'MAZETIL1'
+TILED_MAZE_VERSION = 1
+TILED_MAZE_ALIGNMENT = 4096
+
+CHANGE_KEY_REMOVED = 'key_removed'
+
+
+def _write_tiled_file(path, header, tiles):
+    """Writes the header, then every tile yielded by `tiles` (bytes-like, tile_size**2 long, row-major tile order)."""
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    prefix_len = len(TILED_MAZE_MAGIC) + 4 + len(header_bytes)
+    with open(path, 'wb') as f:
+        f.write(TILED_MAZE_MAGIC)
+        f.write(struct.pack('<I', len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b'\0' * (-prefix_len % TILED_MAZE_ALIGNMENT))
+        for tile in tiles: f.write(tile)
+
+
+def _base_header(width, height, tile_size, start_pos, exit_pos, keys, portal_pairs, seed, loop_chance):
+    return {
+        'version': TILED_MAZE_VERSION,
+        'width': width, 'height': height, 'tile_size': tile_size,
+        'tiles_x': -(-width // tile_size), 'tiles_y': -(-height // tile_size),
+        'start_pos': list(start_pos), 'exit_pos': list(exit_pos),
+        'keys': [list(pos) for pos in keys],
+        'portal_pairs': [[list(pos1), list(pos2)] for pos1, pos2 in portal_pairs],
+        'seed': seed, 'loop_chance': loop_chance,
+    }
+
+
+def write_tiled_maze_from_grid(maze, path, tile_size=TILED_MAZE_TILE_SIZE):
+    """Re-tiles an in-memory Maze into a tiled maze file (mainly to compare both backends)."""
+    portal_pairs = {}
+    for pos, data in maze.portals.items():
+        portal_pairs.setdefault(data['pair_id'], (pos, data['target']))
+    header = _base_header(maze.width, maze.height, tile_size, maze.start_pos, maze.exit_pos, maze.keys,
+                          [portal_pairs[pair_id] for pair_id in sorted(portal_pairs)], maze.seed, maze.loop_chance)
+    flags_view, _ = maze.grid.as_numpy()
+
+    def tiles():
+        for ty in range(header['tiles_y']):
+            for tx in range(header['tiles_x']):
+                tile = np.full((tile_size, tile_size), CELL_WALL, dtype=np.uint8)
+                block = flags_view[ty * tile_size:(ty + 1) * tile_size, tx * tile_size:(tx + 1) * tile_size]
+                tile[:block.shape[0], :block.shape[1]] = block
+                yield tile.tobytes()
+
+    _write_tiled_file(path, header, tiles())
+
+
+def generate_tiled_maze(path, width, height, tile_size=TILED_MAZE_TILE_SIZE, num_keys=0,
+                        loop_chance=MAZE_LOOP_CHANCE, seed=None):
+    """
+    Generates a maze straight into a tiled file, one tile in memory at a time. Each tile is carved as
+    its own DFS maze (seeded from (seed, tx, ty)) and joined to its left and upper neighbours through
+    one opening in the shared wall, so the whole maze stays connected. width and height are made odd
+    and tile_size even so every tile border falls on a wall line. Keys are sprinkled on random path cells.
+    """
+    if seed is None: seed = random.getrandbits(32)
+    width, height = width | 1, height | 1
+    tile_size += tile_size % 2
+    rng = random.Random(seed)
+    start_pos, exit_pos = (1, 1), (width - 2, height - 2)
+    keys = set()
+    while len(keys) < min(num_keys, (width // 2) * (height // 2) - 2):
+        pos = (rng.randrange(width // 2) * 2 + 1, rng.randrange(height // 2) * 2 + 1)
+        if pos != start_pos and pos != exit_pos: keys.add(pos)
+    keys = sorted(keys)
+    header = _base_header(width, height, tile_size, start_pos, exit_pos, keys, [], seed, loop_chance)
+
+    def tiles():
+        for ty in range(header['tiles_y']):
+            y0 = ty * tile_size
+            for tx in range(header['tiles_x']):
+                x0 = tx * tile_size
+                tile_rng = random.Random(f"{seed}:{tx}:{ty}")
+                # Carve the tile plus its right/bottom wall line, which belongs to the next tile
+                local_w = min(tile_size, width - 1 - x0) + 1
+                local_h = min(tile_size, height - 1 - y0) + 1
+                local = bytearray(local_w * local_h)
+                exit_local = (exit_pos[0] - x0, exit_pos[1] - y0)
+                if not (0 < exit_local[0] < local_w - 1 and 0 < exit_local[1] < local_h - 1): exit_local = (1, 1)
+                carve_maze(local, local_w, local_h, (1, 1), exit_local, loop_chance, tile_rng, fast=False)
+                # Join to the left and upper tiles through one random opening in the shared wall line
+                if local_w > 2 and local_h > 2:
+                    if tx > 0: local[(tile_rng.randrange(local_h // 2) * 2 + 1) * local_w] = 0
+                    if ty > 0: local[tile_rng.randrange(local_w // 2) * 2 + 1] = 0
+
+                tile = np.full((tile_size, tile_size), CELL_WALL, dtype=np.uint8)
+                carved = np.frombuffer(local, dtype=np.uint8).reshape(local_h, local_w)
+                rows, cols = min(tile_size, local_h), min(tile_size, local_w)
+                tile[:rows, :cols] = carved[:rows, :cols]
+                for kx, ky in keys:
+                    if x0 <= kx < x0 + tile_size and y0 <= ky < y0 + tile_size: tile[ky - y0, kx - x0] |= CELL_KEY
+                yield tile.tobytes()
+
+    _write_tiled_file(path, header, tiles())
+    return path
+
+
+class TiledMaze:
+    """
+    Maze backed by a tiled, memory-mapped flag file. Cell queries page tiles in on demand and keep
+    the most recently used TILED_MAZE_CACHE_TILES of them; keys and portals live in memory. Exposes
+    the same model interface solvers use on Maze, with moves resolved on demand instead of a
+    precomputed transition table.
+    """
+    def __init__(self, path, cell_size=CELL_SIZE, cache_tiles=TILED_MAZE_CACHE_TILES):
+        with open(path, 'rb') as f:
+            if f.read(len(TILED_MAZE_MAGIC)) != TILED_MAZE_MAGIC:
+                raise ValueError(f"'{path}' is not a tiled maze file")
+            (header_len,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(header_len).decode('utf-8'))
+        if header.get('version') != TILED_MAZE_VERSION:
+            raise ValueError(f"Unsupported tiled maze version {header.get('version')} in '{path}'")
+        prefix_len = len(TILED_MAZE_MAGIC) + 4 + header_len
+
+        self.path = path
+        self.width, self.height = header['width'], header['height']
+        self.tile_size = header['tile_size']
+        self.tiles_x, self.tiles_y = header['tiles_x'], header['tiles_y']
+        self.cell_size = cell_size
+        self.seed = header['seed']
+        self.loop_chance = header['loop_chance']
+        self.start_pos = tuple(header['start_pos'])
+        self.exit_pos = tuple(header['exit_pos'])
+        self._data = np.memmap(path, dtype=np.uint8, mode='r', offset=prefix_len + (-prefix_len % TILED_MAZE_ALIGNMENT),
+                               shape=(self.tiles_x * self.tiles_y * self.tile_size * self.tile_size,))
+
+        self.cache_tiles = max(1, cache_tiles)
+        self._tile_cache = OrderedDict() # tile id -> bytes, least recently used first
+        self._last_tile_id = -1
+        self._last_tile = None
+        self.tile_loads = 0
+
+        self.keys = [tuple(pos) for pos in header['keys']]
+        self._key_set = set(self.keys)
+        self.portals = {}
+        for pair_id, (pos1, pos2) in enumerate(header['portal_pairs']):
+            pos1, pos2 = tuple(pos1), tuple(pos2)
+            portal_data = {'pair_id': pair_id, 'color': PORTAL_COLORS_FALLBACK[pair_id % len(PORTAL_COLORS_FALLBACK)]}
+            self.portals[pos1] = {**portal_data, 'target': pos2}
+            self.portals[pos2] = {**portal_data, 'target': pos1}
+        self.portal_locations = set(self.portals)
+        self.actual_num_keys = len(self.keys)
+        self.actual_num_portal_pairs = len(header['portal_pairs'])
+
+        self.MUD_COST_FOR_ALGORITHM = MUD_COST_ALGO
+        self.PORTAL_COST_FOR_ALGORITHM = PORTAL_COST_ALGO
+        self.SLIDE_CELL_COST_FOR_ALGORITHM = SLIDE_CELL_COST_ALGO
+
+        self._transitions = OnDemandTransitions(self)
+        self.version = 0
+        self.journal = deque(maxlen=MAZE_JOURNAL_MAX_ENTRIES)
+
+    def _tile(self, tile_id):
+        if tile_id == self._last_tile_id: return self._last_tile
+        tile = self._tile_cache.get(tile_id)
+        if tile is None:
+            area = self.tile_size * self.tile_size
+            tile = self._data[tile_id * area:(tile_id + 1) * area].tobytes()
+            self.tile_loads += 1
+            self._tile_cache[tile_id] = tile
+            if len(self._tile_cache) > self.cache_tiles: self._tile_cache.popitem(last=False)
+        else:
+            self._tile_cache.move_to_end(tile_id)
+        self._last_tile_id, self._last_tile = tile_id, tile
+        return tile
+
+    def cell_flags(self, x, y):
+        """Flag byte of (x, y); cells outside the maze read as walls."""
+        if not (0 <= x < self.width and 0 <= y < self.height): return CELL_WALL
+        size = self.tile_size
+        tx, lx = divmod(x, size)
+        ty, ly = divmod(y, size)
+        return self._tile(ty * self.tiles_x + tx)[ly * size + lx]
+
+    def is_wall(self, x, y): return self.cell_flags(x, y) & CELL_WALL != 0
+    def is_key(self, x, y): return (x, y) in self._key_set
+    def is_mud(self, x, y): return self.cell_flags(x, y) & CELL_MUD != 0
+    def is_water(self, x, y): return self.cell_flags(x, y) & CELL_WATER != 0
+    def is_portal(self, x, y): return (x, y) in self.portals
+    def get_portal_target(self, x, y):
+        data = self.portals.get((x, y))
+        return data['target'] if data else None
+
+    def get_transition_table(self):
+        """Resolves moves on demand; a precomputed table would need the whole grid in memory."""
+        return self._transitions
+
+    def get_reachability(self):
+        """None: labeling components needs the whole grid, so solvers skip their fail-fast checks here."""
+        return None
+
+    def get_corridor_graph(self):
+        """None: contracting corridors needs the whole grid too, so solvers search cell by cell."""
+        return None
+
+    def get_dead_end_mask(self):
+        """None: dead-end filling needs the whole grid too, so nothing is pruned here."""
+        return None
+
+    def changes_since(self, version):
+        if version >= self.version: return []
+        if not self.journal or self.journal[0][0] > version + 1: return None
+        return [entry for entry in self.journal if entry[0] > version]
+
+    def remove_key(self, x, y):
+        key_pos = (x, y)
+        if key_pos in self._key_set:
+            self.keys.remove(key_pos)
+            self._key_set.discard(key_pos)
+            self.version += 1
+            self.journal.append((self.version, CHANGE_KEY_REMOVED, key_pos))
+            return True
+        return False
+
+    def get_total_keys_placed(self): return self.actual_num_keys
@@ -0,0 +1,174 @@
+from array import array
+from maze_grid import CELL_WALL, CELL_MUD, CELL_WATER, CELL_PORTAL, NO_PORTAL_TARGET
+
+# Move order shared by every solver: N, S, W, E as (dx, dy)
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+
+class TransitionTable:
+    """
+    Compressed (CSR) adjacency of a maze. The moves out of cell i are the edges
+    offsets[i] .. offsets[i + 1] - 1; each edge stores the flat index of the cell the
+    agent ends up on (slides and portals already resolved), the move cost and the
+    DIRECTIONS index that produced it.
+    """
+    def __init__(self, width, height, offsets, targets, costs, directions):
+        self.width = width
+        self.height = height
+        self.offsets = offsets
+        self.targets = targets
+        self.costs = costs
+        self.directions = directions
+        self._reverse = None # (offsets, sources, costs) by landing cell, built by the first predecessors() call
+
+    def num_edges(self):
+        return len(self.targets)
+
+    def successors(self, x, y):
+        """[((target_x, target_y), cost), ...] for every move out of (x, y)."""
+        width = self.width
+        i = y * width + x
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return [((t % width, t // width), c) for t, c in zip(self.targets[start:end], self.costs[start:end])]
+
+    def predecessors(self, x, y):
+        """[((source_x, source_y), cost), ...] for every move that ends on (x, y), slides and portals included."""
+        if self._reverse is None: self._reverse = self._build_reverse()
+        offsets, sources, costs = self._reverse
+        width = self.width
+        i = y * width + x
+        start, end = offsets[i], offsets[i + 1]
+        return [((s % width, s // width), c) for s, c in zip(sources[start:end], costs[start:end])]
+
+    def _build_reverse(self):
+        num_cells = self.width * self.height
+        offsets = array('i', [0]) * (num_cells + 1)
+        for t in self.targets: offsets[t + 1] += 1
+        for i in range(num_cells): offsets[i + 1] += offsets[i]
+        fill = array('i', offsets[:num_cells])
+        sources = array('i', [0]) * len(self.targets)
+        costs = array('i', [0]) * len(self.targets)
+        for i in range(num_cells):
+            for e in range(self.offsets[i], self.offsets[i + 1]):
+                slot = fill[self.targets[e]]
+                sources[slot] = i
+                costs[slot] = self.costs[e]
+                fill[self.targets[e]] += 1
+        return offsets, sources, costs
+
+    def successor_indices(self, index):
+        """(target_indices, costs) slices for the flat cell index."""
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.targets[start:end], self.costs[start:end]
+
+    def move(self, x, y, direction):
+        """Result of taking DIRECTIONS[direction] from (x, y): ((target_x, target_y), cost), or None if blocked."""
+        width = self.width
+        i = y * width + x
+        for e in range(self.offsets[i], self.offsets[i + 1]):
+            if self.directions[e] == direction:
+                t = self.targets[e]
+                return (t % width, t // width), self.costs[e]
+        return None
+
+    def add_entry_cost(self, x, y, extra):
+        """Adds `extra` to every move that steps onto (x, y) first (e.g. when mud is laid there)."""
+        width = self.width
+        for d, (dx, dy) in enumerate(DIRECTIONS):
+            sx, sy = x - dx, y - dy
+            if not (0 <= sx < width and 0 <= sy < self.height): continue
+            i = sy * width + sx
+            for e in range(self.offsets[i], self.offsets[i + 1]):
+                if self.directions[e] == d: self.costs[e] += extra
+        self._reverse = None
+
+
+def build_transition_table(maze):
+    """Resolves every move of every open cell once, using the maze's flag grid and algorithm costs."""
+    width, height = maze.width, maze.height
+    flags = maze.grid.flags
+    portal_targets = maze.grid.portal_targets
+    mud_cost = maze.MUD_COST_FOR_ALGORITHM
+    portal_cost = maze.PORTAL_COST_FOR_ALGORITHM
+    slide_cell_cost = maze.SLIDE_CELL_COST_FOR_ALGORITHM
+
+    def blocked(x, y):
+        return not (0 <= x < width and 0 <= y < height) or flags[y * width + x] & CELL_WALL != 0
+
+    offsets = array('i', [0]) * (width * height + 1)
+    targets = array('i')
+    costs = array('i')
+    directions = array('B')
+
+    for y in range(height):
+        for x in range(width):
+            i = y * width + x
+            if flags[i] & CELL_WALL == 0:
+                for d, (dx, dy) in enumerate(DIRECTIONS):
+                    nx, ny = x + dx, y + dy
+                    if blocked(nx, ny): continue
+                    n = ny * width + nx
+                    n_flags = flags[n]
+                    cost = mud_cost if n_flags & CELL_MUD else 1
+                    target = n
+                    if n_flags & CELL_WATER:
+                        # Slide until the next cell is a wall (stop on last water cell) or dry land (stop on it)
+                        cx, cy = nx, ny
+                        slid_cells = 0
+                        while True:
+                            sx, sy = cx + dx, cy + dy
+                            if blocked(sx, sy): break
+                            slid_cells += 1
+                            cx, cy = sx, sy
+                            if flags[sy * width + sx] & CELL_WATER == 0: break
+                        target = cy * width + cx
+                        cost += slid_cells * slide_cell_cost
+                    elif n_flags & CELL_PORTAL and portal_targets[n] != NO_PORTAL_TARGET:
+                        target = portal_targets[n]
+                        cost += portal_cost
+                    targets.append(target)
+                    costs.append(cost)
+                    directions.append(d)
+            offsets[i + 1] = len(targets)
+
+    return TransitionTable(width, height, offsets, targets, costs, directions)
+
+
+class OnDemandTransitions:
+    """
+    Same interface as TransitionTable, but every move is resolved from the maze's predicates when
+    asked. Used by mazes too large to precompute (TiledMaze); costs are identical to the table's.
+    """
+    def __init__(self, maze):
+        self.maze = maze
+        self.width = maze.width
+        self.height = maze.height
+
+    def successors(self, x, y):
+        result = []
+        for d in range(len(DIRECTIONS)):
+            move = self.move(x, y, d)
+            if move is not None: result.append(move)
+        return result
+
+    def move(self, x, y, direction):
+        maze = self.maze
+        dx, dy = DIRECTIONS[direction]
+        nx, ny = x + dx, y + dy
+        if maze.is_wall(nx, ny): return None
+        cost = maze.MUD_COST_FOR_ALGORITHM if maze.is_mud(nx, ny) else 1
+        if maze.is_water(nx, ny):
+            # Slide until the next cell is a wall (stop on last water cell) or dry land (stop on it)
+            cx, cy = nx, ny
+            slid_cells = 0
+            while True:
+                sx, sy = cx + dx, cy + dy
+                if maze.is_wall(sx, sy): break
+                slid_cells += 1
+                cx, cy = sx, sy
+                if not maze.is_water(sx, sy): break
+            return (cx, cy), cost + slid_cells * maze.SLIDE_CELL_COST_FOR_ALGORITHM
+        if maze.is_portal(nx, ny):
+            target = maze.get_portal_target(nx, ny)
+            if target is not None: return target, cost + maze.PORTAL_COST_FOR_ALGORITHM
+        return (nx, ny), cost
@@ -1,7 +1,11 @@
 import pygame
 import os
 import sys
-from constants import FALLBACK_IMAGE_COLOR, IMAGE_FOLDER, SOUNDS_FOLDER, UI_ROUND_RECT_RADIUS
+from collections import OrderedDict
+from constants import FALLBACK_IMAGE_COLOR, IMAGE_FOLDER, SOUNDS_FOLDER, UI_ROUND_RECT_RADIUS, TEXT_CACHE_MAX_ENTRIES
+
+_fonts = {} # (name, size) -> pygame Font, so SysFont lookups happen once per process
+_text_cache = OrderedDict() # (font, text, color, antialias) -> rendered Surface, least recently used first
 
 def load_scaled_image(filename, new_size):
     """Loads an image, scales it, and handles errors by returning a fallback surface."""
@@ -87,9 +91,27 @@ def draw_rounded_rect(surface, color, rect, radius, border_thickness=0, border_c
     else: 
         pygame.draw.rect(surface, color, rect, 0, border_radius=radius)
 
+def get_font(size, name=None):
+    """Shared SysFont for (name, size); creating fonts is slow, so callers should never do it per frame."""
+    font = _fonts.get((name, size))
+    if font is None:
+        font = _fonts[(name, size)] = pygame.font.SysFont(name, size)
+    return font
+
+def render_text(font, text, color, antialias=True):
+    """font.render() through an LRU cache of TEXT_CACHE_MAX_ENTRIES surfaces. Callers must not draw onto the result."""
+    key = (font, text, tuple(color), antialias)
+    text_surface = _text_cache.get(key)
+    if text_surface is not None:
+        _text_cache.move_to_end(key)
+        return text_surface
+    text_surface = _text_cache[key] = font.render(text, antialias, color)
+    if len(_text_cache) > TEXT_CACHE_MAX_ENTRIES: _text_cache.popitem(last=False)
+    return text_surface
+
 def draw_text(surface, text, font, color, center_pos, antialias=True, background_color=None, padding=0):
     """Draws text centered at a given position, optionally with a background."""
-    text_surface = font.render(text, antialias, color)
+    text_surface = render_text(font, text, color, antialias)
     text_rect = text_surface.get_rect(center=center_pos)
 
     if background_color: